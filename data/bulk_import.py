@@ -0,0 +1,180 @@
+import argparse
+import glob
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from data.data_access import DeckRepository
+from data.database.database import Database
+from data.paths import default_db_path
+from model.card_index import content_hash
+from model.deck import Deck
+from model.flashcard import Flashcard
+
+# Cards written per transaction; files are never split across two transactions
+# unless they alone exceed it
+BATCH_CARDS = 50_000
+
+# Row shape produced by workers: (front, back, familiarity, content_hash)
+CardRow = Tuple[str, str, int, str]
+
+
+@dataclass
+class ParsedFile:
+    path: str
+    name: str
+    cards: List[CardRow] = field(default_factory=list)
+    duplicates: int = 0
+    error: Optional[str] = None
+
+
+@dataclass
+class ImportReport:
+    """Outcome of a directory import"""
+    decks: Dict[str, int] = field(default_factory=dict)  # path -> deck id
+    cards: int = 0
+    duplicates: int = 0
+    errors: Dict[str, str] = field(default_factory=dict)  # path -> message
+    elapsed: float = 0.0
+
+    @property
+    def cards_per_sec(self) -> float:
+        return self.cards / self.elapsed if self.elapsed else 0.0
+
+
+def parse_deck_file(path: str) -> ParsedFile:
+    """Parse one deck file into card rows, dropping and counting duplicates like Deck.import_file
+
+    Runs in a worker process: the hashing needed for duplicate detection
+    is the bulk of the work, so it is done here rather than in the writer.
+    Any malformed line fails the whole file.
+    """
+    parsed = ParsedFile(path, os.path.splitext(os.path.basename(path))[0])
+    seen: Set[str] = set()
+    try:
+        with open(path, encoding="utf-8") as f:
+            for number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    front, back, familiarity = Flashcard.parse_line(line)
+                except (IndexError, ValueError) as e:
+                    raise ValueError(f"line {number}: {e!r}") from None
+                key = content_hash(front, back)
+                if key in seen:
+                    parsed.duplicates += 1
+                    continue
+                seen.add(key)
+                parsed.cards.append((front, back, familiarity, key))
+    except (OSError, UnicodeDecodeError, ValueError) as e:
+        parsed.cards = []
+        parsed.error = str(e)
+    return parsed
+
+
+class _Writer:
+    """The single SQLite writer, batching many files into each transaction"""
+
+    def __init__(self, db: Database, batch_cards: int):
+        self.db = db
+        self.deck_repo = DeckRepository(db)
+        self.card_repo = self.deck_repo.card_repo
+        self.batch_cards = batch_cards
+        self.pending = 0
+
+    def write(self, parsed: ParsedFile) -> int:
+        conn = self.db.conn
+        if not conn.in_transaction:
+            conn.execute("BEGIN")
+        deck_id = self.deck_repo.insert_deck(Deck(parsed.name))
+        self.card_repo.insert_card_rows(
+            (deck_id, front, back, 0, familiarity, key, 0, 0, None)
+            for front, back, familiarity, key in parsed.cards)
+        self.pending += len(parsed.cards)
+        if self.pending >= self.batch_cards:
+            self.commit()
+        return deck_id
+
+    def commit(self) -> None:
+        if self.db.conn.in_transaction:
+            self.db.conn.commit()
+        self.pending = 0
+
+
+def _parsed_files(paths: List[str], workers: int) -> Iterator[ParsedFile]:
+    """Parse files, in a process pool when workers > 1, yielding results as they finish
+
+    At most two files per worker are in flight, so parsed decks do not pile
+    up in memory when the writer is the bottleneck.
+    """
+    if workers <= 1:
+        for path in paths:
+            yield parse_deck_file(path)
+        return
+    queue = list(reversed(paths))
+    running: Set[Future] = set()
+    with ProcessPoolExecutor(workers) as pool:
+        while queue or running:
+            while queue and len(running) < 2 * workers:
+                running.add(pool.submit(parse_deck_file, queue.pop()))
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+
+def import_directory(db: Database, directory: str, pattern: str = "*.txt",
+                     workers: Optional[int] = None, batch_cards: int = BATCH_CARDS) -> ImportReport:
+    """Import every deck file in a directory as its own deck
+
+    Files are parsed in parallel; the calling process is the only writer.
+    A file that fails to parse is reported and not imported; the others
+    are unaffected.
+    """
+    workers = workers or os.cpu_count() or 1
+    paths = sorted(glob.glob(os.path.join(directory, pattern)))
+    report = ImportReport()
+    writer = _Writer(db, batch_cards)
+    started = time.perf_counter()
+    try:
+        for parsed in _parsed_files(paths, workers):
+            if parsed.error is not None:
+                report.errors[parsed.path] = parsed.error
+                continue
+            report.decks[parsed.path] = writer.write(parsed)
+            report.cards += len(parsed.cards)
+            report.duplicates += parsed.duplicates
+        writer.commit()
+    except BaseException:
+        if db.conn.in_transaction:
+            db.conn.rollback()
+        raise
+    report.elapsed = time.perf_counter() - started
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import a directory of deck files")
+    parser.add_argument("directory")
+    parser.add_argument("--db", default=None, help="database file (default: the app's own)")
+    parser.add_argument("--pattern", default="*.txt")
+    parser.add_argument("--workers", type=int, default=None, help="parser processes (default: all cores)")
+    args = parser.parse_args()
+
+    db = Database(args.db or default_db_path())
+    try:
+        report = import_directory(db, args.directory, args.pattern, args.workers)
+    finally:
+        db.conn.close()
+    for path, message in sorted(report.errors.items()):
+        print(f"ERROR {path}: {message}")
+    print(f"Imported {len(report.decks)} decks, {report.cards} cards "
+          f"({report.duplicates} duplicates skipped, {len(report.errors)} files failed) "
+          f"in {report.elapsed:.2f}s: {report.cards_per_sec:.0f} cards/s")
+    if report.errors:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
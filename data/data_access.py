@@ -1,79 +1,584 @@
 from datetime import datetime
-from typing import List, TYPE_CHECKING
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple, TYPE_CHECKING
+import numpy as np
+from model.study_modes import StudyMode
 from model.study_session_stats import StudySession
-from model.flashcard import Flashcard
-from data.database.database import Database
+from model.flashcard import Flashcard, new_uid
+from model.card_index import DuplicateReport
+from model.card_stats import CardStats, ReviewEntry, ReviewResult
+from model.deck_stats import DeckStats
+from data.database.database import NEW_UUID, Database
+from data.storage import CardStore, DeckStore, SessionStore, StatsStore, StorageBackend
 import sqlite3
 
 if TYPE_CHECKING:
     from model.deck import Deck
 
-class DeckRepository:
+
+# A fresh card uuid in the 16 hex digit form of a uid, evaluated inside SQLite
+NEW_CARD_UUID = "printf('%016x', random() & 9223372036854775807)"
+
+
+def to_epoch(value: Optional[datetime]) -> int:
+    """Convert a datetime to the integer epoch seconds stored in the database"""
+    return int(value.timestamp()) if value else 0
+
+
+def from_epoch(value: Optional[int]) -> Optional[datetime]:
+    return datetime.fromtimestamp(value) if value else None
+
+
+def uid_to_uuid(uid: int) -> str:
+    """Store a card uid in the row's uuid column as 16 hex digits"""
+    return format(uid, "016x")
+
+
+def uuid_to_uid(value: Optional[str]) -> Optional[int]:
+    """Card uid for a row uuid; 32-digit uuids made by the database fold into 63 bits"""
+    if not value:
+        return None
+    if len(value) == 16:
+        return int(value, 16)
+    return int(value[:16], 16) >> 1
+
+
+def card_from_row(row) -> Flashcard:
+    """Card for a row of the cards table"""
+    card = Flashcard(row['front'], row['back'], row['familiarity'], uuid_to_uid(row['uuid']))
+    card.id = row['id']
+    card.confidence = row['confidence']
+    card.level = row['level']
+    card.next_due = from_epoch(row['next_due'])
+    return card
+
+
+def session_from_row(row) -> StudySession:
+    """Session for a row of the study_sessions table"""
+    session = StudySession(StudyMode(row['mode']))
+    session.stats.start_time = from_epoch(row['started_at']) or session.stats.start_time
+    session.stats.end_time = from_epoch(row['ended_at'])
+    session.stats.correct_answers = row['correct_answers'] or 0
+    session.stats.total_answers = row['total_answers'] or 0
+    return session
+
+class DeckRepository(DeckStore):
     def __init__(self, db: Database):
         self.db = db
         self.card_repo = CardRepository(db)
 
     def save_deck(self, deck: 'Deck') -> int:
-        cursor = self.db.conn.execute("""
-            INSERT INTO decks (name, description, created_at, last_studied, category)
-            VALUES (?, ?, ?, ?, ?)
-        """, (deck.name, deck.description, deck.created_at, deck.last_studied, deck.category))
+        deck_id = self.insert_deck(deck)
         self.db.conn.commit()
-        return cursor.lastrowid
+        return deck_id
+
+    def insert_deck(self, deck: 'Deck') -> int:
+        """Insert a deck row within the caller's transaction and return its id"""
+        return self.db.conn.execute(f"""
+            INSERT INTO decks (name, description, created_at, last_studied, category,
+                               uuid, change_seq, modified_at, origin)
+            VALUES (?, ?, ?, ?, ?, {NEW_UUID}, ?, ?, ?)
+        """, (deck.name, deck.description, deck.created_at, deck.last_studied, deck.category,
+              *self.db.reserve_changes())).lastrowid
 
     def load_deck(self, deck_id: int) -> 'Deck':
+        from model.deck import Deck
+
         cursor = self.db.conn.execute("SELECT * FROM decks WHERE id = ?", (deck_id,))
         row = cursor.fetchone()
         if not row:
             raise ValueError(f"Deck {deck_id} not found")
             
         deck = Deck(row['name'], row['description'])
+        deck.id = deck_id
         deck.created_at = datetime.fromisoformat(row['created_at'])
         deck.last_studied = datetime.fromisoformat(row['last_studied']) if row['last_studied'] else None
         deck.category = row['category']
         
         # Load cards
-        deck.flashcards = self.card_repo.load_cards_for_deck(deck_id)
+        deck.add_cards(self.card_repo.load_cards_for_deck(deck_id), skip_duplicates=False)
         return deck
 
-class StudySessionRepository:
+    def get_deck_info(self, deck_id: int) -> Optional[sqlite3.Row]:
+        """A deck's own columns without its cards, or None"""
+        return self.db.conn.execute(
+            "SELECT id, name, description, created_at, last_studied, category "
+            "FROM decks WHERE id = ?", (deck_id,)).fetchone()
+
+    def count_decks(self) -> int:
+        return self.db.conn.execute("SELECT COUNT(*) FROM decks").fetchone()[0]
+
+    def list_decks_after(self, after_id: Optional[int], limit: int) -> List[sqlite3.Row]:
+        """One keyset page of (id, name, category) rows ordered by id"""
+        return self.db.conn.execute(
+            "SELECT id, name, category FROM decks WHERE id > ? ORDER BY id LIMIT ?",
+            (after_id or 0, limit)).fetchall()
+
+    def deck_id_before(self, offset: int) -> Optional[int]:
+        """Id of the deck preceding position `offset`, for jumping to a page"""
+        if offset <= 0:
+            return None
+        row = self.db.conn.execute(
+            "SELECT id FROM decks ORDER BY id LIMIT 1 OFFSET ?", (offset - 1,)).fetchone()
+        return row[0] if row else None
+
+class StudySessionRepository(SessionStore):
+    # SQL expression giving the local-time bucket label of a session, per bucket size
+    BUCKETS = {
+        'day': "date(started_at, 'unixepoch', 'localtime')",
+        'week': "date(started_at, 'unixepoch', 'localtime', '-6 days', 'weekday 1')",
+        'month': "strftime('%Y-%m-01', started_at, 'unixepoch', 'localtime')",
+    }
+    # Aggregates shared by the bucketed and single-row queries
+    _TOTALS = """
+        COUNT(*) AS sessions,
+        SUM(correct_answers) AS correct_answers,
+        SUM(total_answers) AS total_answers,
+        CAST(SUM(correct_answers) AS REAL) / NULLIF(SUM(total_answers), 0) AS accuracy,
+        AVG(CASE WHEN total_answers > 0
+                 THEN CAST(correct_answers AS REAL) / total_answers ELSE 0 END) AS average_accuracy,
+        SUM(CASE WHEN ended_at IS NOT NULL THEN ended_at - started_at ELSE 0 END) / 60.0
+            AS study_minutes,
+        SUM(cards_reviewed) AS cards_reviewed
+    """
+
     def __init__(self, db: Database):
         self.db = db
 
     def save_session(self, session: StudySession, deck_id: int) -> int:
-        cursor = self.db.conn.execute("""
+        stats = session.stats
+        cursor = self.db.conn.execute(f"""
             INSERT INTO study_sessions 
-            (deck_id, mode, start_time, end_time, correct_answers, total_answers)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (deck_id, session.mode, session.stats.start_time, 
-              session.stats.end_time, session.stats.correct_answers,
-              session.stats.total_answers))
+            (deck_id, mode, start_time, end_time, correct_answers, total_answers,
+             started_at, ended_at, cards_reviewed, uuid, change_seq, modified_at, origin)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, {NEW_UUID}, ?, ?, ?)
+        """, (deck_id, session.mode.value, stats.start_time, stats.end_time,
+              stats.correct_answers, stats.total_answers,
+              to_epoch(stats.start_time), to_epoch(stats.end_time) or None,
+              len(session.reviewed_cards), *self.db.reserve_changes()))
         self.db.conn.commit()
         return cursor.lastrowid
 
     def get_sessions_for_deck(self, deck_id: int) -> List[StudySession]:
         cursor = self.db.conn.execute(
-            "SELECT * FROM study_sessions WHERE deck_id = ?", (deck_id,))
-        return [self._map_to_session(row) for row in cursor.fetchall()]
+            "SELECT * FROM study_sessions WHERE deck_id = ? ORDER BY started_at", (deck_id,))
+        return [session_from_row(row) for row in cursor.fetchall()]
+
+    def aggregate_sessions(self, bucket: str = 'day', deck_id: Optional[int] = None,
+                           since: Optional[datetime] = None,
+                           until: Optional[datetime] = None) -> List[sqlite3.Row]:
+        """Per-bucket session totals, grouped in SQL over the started_at index
+
+        bucket is 'day', 'week' (starting Monday) or 'month'. Each row has the
+        bucket's first day as an ISO date plus sessions, correct_answers,
+        total_answers, accuracy (correct over all answers), average_accuracy
+        (mean of per-session accuracy), study_minutes and cards_reviewed.
+        """
+        if bucket not in self.BUCKETS:
+            raise ValueError(f"Unknown bucket {bucket!r}; expected one of {sorted(self.BUCKETS)}")
+        where, params = self._session_range(deck_id, since, until)
+        return self.db.conn.execute(f"""
+            SELECT {self.BUCKETS[bucket]} AS bucket, {self._TOTALS}
+            FROM study_sessions
+            WHERE {where}
+            GROUP BY bucket
+            ORDER BY bucket
+        """, params).fetchall()
+
+    def get_trend_summary(self, deck_id: Optional[int] = None,
+                          since: Optional[datetime] = None) -> Dict:
+        """Totals since a point in time, in the shape of DeckStats.get_study_trends"""
+        where, params = self._session_range(deck_id, since, None)
+        row = self.db.conn.execute(
+            f"SELECT {self._TOTALS} FROM study_sessions WHERE {where}", params).fetchone()
+        count = row['sessions']
+        return {
+            "sessions_count": count,
+            "total_study_time": row['study_minutes'] or 0,
+            "average_accuracy": row['average_accuracy'] or 0.0,
+            "cards_per_session": (row['cards_reviewed'] or 0) / count if count else 0
+        }
+
+    @staticmethod
+    def _session_range(deck_id: Optional[int], since: Optional[datetime],
+                       until: Optional[datetime]) -> Tuple[str, tuple]:
+        clauses, params = ["started_at IS NOT NULL"], []
+        if deck_id is not None:
+            clauses.append("deck_id = ?")
+            params.append(deck_id)
+        if since is not None:
+            clauses.append("started_at >= ?")
+            params.append(to_epoch(since))
+        if until is not None:
+            clauses.append("started_at < ?")
+            params.append(to_epoch(until))
+        return " AND ".join(clauses), tuple(params)
+
+class CardRepository(CardStore):
+    # Ids or hashes per IN (...) lookup, well below SQLite's host parameter limit
+    HASH_LOOKUP_CHUNK = 500
+    # Review log rows fetched per round trip by load_review_log
+    LOG_READ_CHUNK = 100_000
+    # The row uuid carries the card's uid unless there is none or another row
+    # already has it (the same card saved into a second deck); those rows get
+    # a fresh uid-shaped uuid, which save_card hands back to the card.
+    # import_cards gives such cards fresh uids before inserting them.
+    INSERT_CARD = f"""
+        INSERT INTO cards (deck_id, front, back, confidence, familiarity, content_hash,
+                           level, next_due, uuid, change_seq, modified_at, origin)
+        VALUES (?1, ?2, ?3, ?4, ?5, ?6, ?7, ?8,
+                CASE WHEN ?9 IS NULL THEN {NEW_CARD_UUID}
+                     WHEN EXISTS (SELECT 1 FROM cards WHERE uuid = ?9) THEN {NEW_CARD_UUID}
+                     ELSE ?9 END,
+                ?10, ?11, ?12)
+    """
 
-class CardRepository:
     def __init__(self, db: Database):
         self.db = db
 
     def save_card(self, card: 'Flashcard', deck_id: int) -> int:
-        cursor = self.db.conn.execute("""
-            INSERT INTO cards (deck_id, front, back, confidence, familiarity)
-            VALUES (?, ?, ?, ?, ?)
-        """, (deck_id, card.front, card.back, card.confidence, card.familiarity))
+        card_id, card_uuid = self.db.conn.execute(
+            self.INSERT_CARD + " RETURNING id, uuid",
+            self._card_row(card, deck_id) + self.db.reserve_changes()).fetchone()
         self.db.conn.commit()
-        return cursor.lastrowid
+        card.id = card_id
+        card.uid = uuid_to_uid(card_uuid)
+        return card.id
+
+    def _taken_uuids(self, uuids: List[str]) -> Set[str]:
+        """The subset of card uuids some stored card already has"""
+        found = set()
+        for start in range(0, len(uuids), self.HASH_LOOKUP_CHUNK):
+            chunk = uuids[start:start + self.HASH_LOOKUP_CHUNK]
+            placeholders = ", ".join("?" * len(chunk))
+            cursor = self.db.conn.execute(
+                f"SELECT uuid FROM cards WHERE uuid IN ({placeholders})", chunk)
+            found.update(row[0] for row in cursor)
+        return found
+
+    def find_existing_hashes(self, deck_id: int, hashes: Iterable[str]) -> Set[str]:
+        """Return the subset of content hashes already stored in a deck"""
+        hashes = list(hashes)
+        found = set()
+        for start in range(0, len(hashes), self.HASH_LOOKUP_CHUNK):
+            chunk = hashes[start:start + self.HASH_LOOKUP_CHUNK]
+            placeholders = ", ".join("?" * len(chunk))
+            cursor = self.db.conn.execute(
+                f"SELECT content_hash FROM cards WHERE deck_id = ? AND content_hash IN ({placeholders})",
+                (deck_id, *chunk))
+            found.update(row[0] for row in cursor)
+        return found
+
+    def find_card_ids(self, deck_id: int, hashes: Iterable[str]) -> Dict[str, int]:
+        """Id of the first stored card of a deck with each of the content hashes it holds"""
+        hashes = list(hashes)
+        found: Dict[str, int] = {}
+        for start in range(0, len(hashes), self.HASH_LOOKUP_CHUNK):
+            chunk = hashes[start:start + self.HASH_LOOKUP_CHUNK]
+            placeholders = ", ".join("?" * len(chunk))
+            cursor = self.db.conn.execute(
+                f"SELECT content_hash, MIN(id) FROM cards WHERE deck_id = ? "
+                f"AND content_hash IN ({placeholders}) GROUP BY content_hash", (deck_id, *chunk))
+            found.update((row[0], row[1]) for row in cursor)
+        return found
+
+    def import_cards(self, cards: List['Flashcard'], deck_id: int) -> DuplicateReport:
+        """Insert cards into a deck in one transaction, skipping stored duplicates"""
+        report = self._split_duplicates(cards, deck_id)
+        if not report.added:
+            return report
+        rows = [self._card_row(card, deck_id) for card in report.added]
+        taken = self._taken_uuids([row[8] for row in rows])
+        for i, card in enumerate(report.added):
+            if rows[i][8] in taken:
+                card.uid = new_uid()
+                rows[i] = self._card_row(card, deck_id)
+            taken.add(rows[i][8])
+        with self.db.conn:
+            last_id = self.insert_card_rows(rows)
+        for card, card_id in zip(report.added, range(last_id - len(report.added) + 1, last_id + 1)):
+            card.id = card_id
+        return report
+
+    def insert_card_rows(self, rows: Iterable[tuple]) -> int:
+        """Insert cards from (deck_id, front, back, confidence, familiarity, content_hash,
+        level, next_due, uuid) rows with one executemany, within the caller's transaction
+
+        A uuid of None draws a fresh one. The rows are stamped as one change.
+        Returns the id of the last row; within a transaction rows get
+        consecutive ids, since ids are allocated as one more than the largest.
+        """
+        stamp = self.db.reserve_changes()
+        self.db.conn.executemany(self.INSERT_CARD, (row + stamp for row in rows))
+        return self.db.conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+
+    def update_schedules(self, cards: Iterable['Flashcard']) -> None:
+        """Persist scheduling state for many saved cards in one transaction"""
+        with self.db.conn:
+            stamp = self.db.reserve_changes()
+            self.db.conn.executemany(
+                "UPDATE cards SET confidence = ?, level = ?, next_due = ?, "
+                "change_seq = ?, modified_at = ?, origin = ? WHERE id = ?",
+                [(card.confidence, card.level, to_epoch(card.next_due), *stamp, card.id)
+                 for card in cards if card.id is not None])
+
+    def get_due_cards(self, limit: int, deck_id: Optional[int] = None,
+                      now: Optional[datetime] = None) -> List['Flashcard']:
+        """Return the k most overdue cards of one deck or of all decks
+
+        Served by an index range scan on next_due, so only the returned rows
+        are read regardless of collection size.
+        """
+        cutoff = to_epoch(now or datetime.now())
+        if deck_id is None:
+            cursor = self.db.conn.execute(
+                "SELECT * FROM cards WHERE next_due <= ? ORDER BY next_due LIMIT ?",
+                (cutoff, limit))
+        else:
+            cursor = self.db.conn.execute(
+                "SELECT * FROM cards WHERE deck_id = ? AND next_due <= ? "
+                "ORDER BY next_due LIMIT ?",
+                (deck_id, cutoff, limit))
+        return [card_from_row(row) for row in cursor.fetchall()]
+
+    def count_due_cards(self, deck_id: Optional[int] = None,
+                        now: Optional[datetime] = None) -> int:
+        cutoff = to_epoch(now or datetime.now())
+        if deck_id is None:
+            cursor = self.db.conn.execute(
+                "SELECT COUNT(*) FROM cards WHERE next_due <= ?", (cutoff,))
+        else:
+            cursor = self.db.conn.execute(
+                "SELECT COUNT(*) FROM cards WHERE deck_id = ? AND next_due <= ?",
+                (deck_id, cutoff))
+        return cursor.fetchone()[0]
+
+    def load_schedule_columns(self, deck_id: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (next_due, level) for every card as columnar arrays"""
+        cursor = self.db.conn.cursor()
+        cursor.row_factory = None
+        if deck_id is None:
+            cursor.execute("SELECT next_due, level FROM cards")
+        else:
+            cursor.execute("SELECT next_due, level FROM cards WHERE deck_id = ?", (deck_id,))
+        columns = np.fromiter(cursor, dtype=[('next_due', np.int64), ('level', np.int64)])
+        return columns['next_due'], columns['level']
+
+    def add_reviews(self, reviews: Iterable[Tuple[int, datetime, bool]]) -> None:
+        with self.db.conn:
+            stamp = self.db.reserve_changes()
+            self.db.conn.executemany(
+                f"INSERT INTO review_history (card_id, timestamp, correct, "
+                f"uuid, change_seq, modified_at, origin) VALUES (?, ?, ?, {NEW_UUID}, ?, ?, ?)",
+                (review + stamp for review in reviews))
+
+    def load_reviews(self, card_ids: Iterable[int]) -> Dict[int, List[Tuple[str, bool]]]:
+        card_ids = list(card_ids)
+        reviews: Dict[int, List[Tuple[str, bool]]] = {}
+        for start in range(0, len(card_ids), self.HASH_LOOKUP_CHUNK):
+            chunk = card_ids[start:start + self.HASH_LOOKUP_CHUNK]
+            placeholders = ", ".join("?" * len(chunk))
+            cursor = self.db.conn.execute(
+                f"SELECT card_id, timestamp, correct FROM review_history "
+                f"WHERE card_id IN ({placeholders}) ORDER BY timestamp", chunk)
+            for card_id, timestamp, correct in cursor:
+                reviews.setdefault(card_id, []).append((timestamp, bool(correct)))
+        return reviews
+
+    def load_review_totals(self, deck_id: int) -> List[sqlite3.Row]:
+        """Per reviewed card of a deck: card_id, total_reviews, correct_reviews, last_reviewed"""
+        return self.db.conn.execute("""
+            SELECT r.card_id AS card_id, COUNT(*) AS total_reviews,
+                   SUM(r.correct) AS correct_reviews, MAX(r.timestamp) AS last_reviewed
+            FROM cards c JOIN review_history r ON r.card_id = c.id
+            WHERE c.deck_id = ?
+            GROUP BY r.card_id
+        """, (deck_id,)).fetchall()
+
+    def load_review_log(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """The whole review log as (card uid, epoch seconds, correct) columns
+
+        Read in chunks into typed arrays; each distinct card uuid is turned
+        into a uid once rather than once per review.
+        """
+        cursor = self.db.conn.cursor()
+        cursor.row_factory = None
+        # Timestamps are stored in local time, like to_epoch reads datetimes;
+        # julianday keeps milliseconds, so rounding to them undoes float error
+        cursor.execute("""
+            SELECT c.uuid, round((julianday(r.timestamp, 'utc') - 2440587.5) * 86400.0, 3), r.correct
+            FROM review_history r JOIN cards c ON c.id = r.card_id
+            WHERE r.timestamp IS NOT NULL
+        """)
+        uuids, seconds, correct = [], [], []
+        while True:
+            rows = cursor.fetchmany(self.LOG_READ_CHUNK)
+            if not rows:
+                break
+            uuid, second, outcome = zip(*rows)
+            uuids.append(np.array(uuid, dtype=object))
+            seconds.append(np.array(second, dtype=np.float64))
+            correct.append(np.array(outcome, dtype=bool))
+        if not uuids:
+            return np.empty(0, dtype=np.int64), np.empty(0), np.empty(0, dtype=bool)
+        unique, codes = np.unique(np.concatenate(uuids).astype(str), return_inverse=True)
+        uids = np.array([uuid_to_uid(value) for value in unique], dtype=np.int64)
+        return uids[codes.ravel()], np.concatenate(seconds), np.concatenate(correct)
+
+    def change_marker(self) -> int:
+        """The database's change sequence number, see Database.setup_change_tracking
+
+        It covers every tracked table, so it also moves with deck and session writes.
+        """
+        return self.db.conn.execute("SELECT seq FROM sync_state").fetchone()[0]
+
+    @staticmethod
+    def _card_row(card: 'Flashcard', deck_id: int) -> tuple:
+        return (deck_id, card.front, card.back, card.confidence, card.familiarity,
+                card.content_hash, card.level, to_epoch(card.next_due), uid_to_uuid(card.uid))
+
+    def count_cards(self, deck_id: int) -> int:
+        return self.db.conn.execute(
+            "SELECT COUNT(*) FROM cards WHERE deck_id = ?", (deck_id,)).fetchone()[0]
+
+    def list_cards_after(self, deck_id: int, after_id: Optional[int], limit: int) -> List[sqlite3.Row]:
+        """One keyset page of (id, front, confidence) rows ordered by id"""
+        return self.db.conn.execute(
+            "SELECT id, front, confidence FROM cards WHERE deck_id = ? AND id > ? "
+            "ORDER BY id LIMIT ?",
+            (deck_id, after_id or 0, limit)).fetchall()
+
+    def card_id_before(self, deck_id: int, offset: int) -> Optional[int]:
+        """Id of the card preceding position `offset`, from the (deck_id, id) index alone"""
+        if offset <= 0:
+            return None
+        row = self.db.conn.execute(
+            "SELECT id FROM cards WHERE deck_id = ? ORDER BY id LIMIT 1 OFFSET ?",
+            (deck_id, offset - 1)).fetchone()
+        return row[0] if row else None
+
+    def get_card(self, card_id: int) -> Optional['Flashcard']:
+        row = self.db.conn.execute("SELECT * FROM cards WHERE id = ?", (card_id,)).fetchone()
+        return card_from_row(row) if row else None
 
     def load_cards_for_deck(self, deck_id: int) -> List['Flashcard']:
         cursor = self.db.conn.execute(
             "SELECT * FROM cards WHERE deck_id = ?", (deck_id,))
-        return [self._map_to_card(row) for row in cursor.fetchall()]
+        return [card_from_row(row) for row in cursor.fetchall()]
+
+    def iter_cards_for_deck(self, deck_id: int, chunk_size: int = 1000) -> Iterator[List['Flashcard']]:
+        """Yield a deck's cards in chunks instead of loading them all at once"""
+        cursor = self.db.conn.execute(
+            "SELECT * FROM cards WHERE deck_id = ? ORDER BY id", (deck_id,))
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                return
+            yield [card_from_row(row) for row in rows]
+
+
+class StatsRepository(StatsStore):
+    """CardStats and DeckStats in the card_stats, deck_stats and review_entries tables"""
+
+    def __init__(self, db: Database):
+        self.db = db
+
+    def save_card_stats(self, stats: CardStats) -> None:
+        with self.db.conn:
+            self._write_card_stats(stats)
+
+    def _write_card_stats(self, stats: CardStats) -> None:
+        conn = self.db.conn
+        conn.execute("""
+            INSERT OR REPLACE INTO card_stats
+            (card_id, total_reviews, correct_reviews, last_reviewed, average_response_time)
+            VALUES (?, ?, ?, ?, ?)
+        """, (stats.card_id, stats.total_reviews, stats.correct_reviews,
+              stats.last_reviewed, stats.average_response_time))
+        conn.execute("DELETE FROM review_entries WHERE card_id = ?", (stats.card_id,))
+        conn.executemany("""
+            INSERT INTO review_entries
+            (card_id, timestamp, result, time_taken, confidence_before, confidence_after)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, [(stats.card_id, entry.timestamp, entry.result.value, entry.time_taken,
+               entry.confidence_before, entry.confidence_after)
+              for entry in stats.review_history])
+
+    def load_card_stats(self, card_id: int) -> CardStats:
+        row = self.db.conn.execute(
+            "SELECT * FROM card_stats WHERE card_id = ?", (card_id,)).fetchone()
+        if not row:
+            return CardStats(card_id=card_id)
+        stats = self._map_to_card_stats(row)
+        cursor = self.db.conn.execute(
+            "SELECT * FROM review_entries WHERE card_id = ? ORDER BY id", (card_id,))
+        stats.review_history.extend(self._map_to_entry(entry) for entry in cursor)
+        return stats
+
+    def save_deck_stats(self, stats: DeckStats) -> None:
+        with self.db.conn:
+            self.db.conn.execute("""
+                INSERT OR REPLACE INTO deck_stats
+                (deck_id, total_cards, last_studied)
+                VALUES (?, ?, ?)
+            """, (stats.deck_id, stats.total_cards, stats.last_studied))
+            for card_stats in stats.cards_stats.values():
+                self._write_card_stats(card_stats)
+
+    def load_deck_stats(self, deck_id: int) -> DeckStats:
+        row = self.db.conn.execute(
+            "SELECT * FROM deck_stats WHERE deck_id = ?", (deck_id,)).fetchone()
+        if not row:
+            return DeckStats(deck_id=deck_id)
+        stats = DeckStats(
+            deck_id=deck_id,
+            total_cards=row['total_cards'],
+            last_studied=datetime.fromisoformat(row['last_studied']) if row['last_studied'] else None
+        )
+        # Two queries for the whole deck rather than two per card
+        cursor = self.db.conn.execute("""
+            SELECT s.* FROM cards c JOIN card_stats s ON s.card_id = c.id
+            WHERE c.deck_id = ?
+        """, (deck_id,))
+        for card_row in cursor:
+            stats.cards_stats[card_row['card_id']] = self._map_to_card_stats(card_row)
+        cursor = self.db.conn.execute("""
+            SELECT e.* FROM cards c JOIN review_entries e ON e.card_id = c.id
+            WHERE c.deck_id = ?
+            ORDER BY e.id
+        """, (deck_id,))
+        for entry in cursor:
+            card_stats = stats.cards_stats.get(entry['card_id'])
+            if card_stats is not None:
+                card_stats.review_history.append(self._map_to_entry(entry))
+        return stats
+
+    @staticmethod
+    def _map_to_card_stats(row: sqlite3.Row) -> CardStats:
+        return CardStats(
+            card_id=row['card_id'],
+            total_reviews=row['total_reviews'],
+            correct_reviews=row['correct_reviews'],
+            last_reviewed=datetime.fromisoformat(row['last_reviewed']) if row['last_reviewed'] else None,
+            average_response_time=row['average_response_time']
+        )
+
+    @staticmethod
+    def _map_to_entry(row: sqlite3.Row) -> ReviewEntry:
+        return ReviewEntry(
+            timestamp=datetime.fromisoformat(row['timestamp']),
+            result=ReviewResult(row['result']),
+            time_taken=row['time_taken'],
+            confidence_before=row['confidence_before'],
+            confidence_after=row['confidence_after']
+        )
+
+
+class SQLiteBackend(StorageBackend):
+    """The repositories over one SQLite database"""
+
+    def __init__(self, db: Database):
+        self.db = db
+        super().__init__(DeckRepository(db), StudySessionRepository(db), StatsRepository(db))
 
-    def _map_to_card(self, row: sqlite3.Row) -> 'Flashcard':
-        card = Flashcard(row['front'], row['back'], row['familiarity'])
-        card.confidence = row['confidence']
-        return card
\ No newline at end of file
+    def close(self) -> None:
+        self.db.conn.close()
\ No newline at end of file
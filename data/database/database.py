@@ -1,11 +1,51 @@
+import os
 import sqlite3
+import time
+import uuid
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
+from urllib.request import pathname2url
+
+from data.paths import default_db_path
+
+# Tables replicated by data.sync; writers stamp their rows via reserve_changes
+TRACKED_TABLES = ("decks", "cards", "study_sessions", "review_history")
+
+# Milliseconds since the epoch, evaluated inside SQLite
+_NOW_MS = "CAST((julianday('now') - 2440587.5) * 86400000 AS INTEGER)"
+
+# A fresh row uuid, evaluated inside SQLite
+NEW_UUID = "lower(hex(randomblob(16)))"
+
+# PRAGMA user_version once the sync triggers are in their current form
+TRACKING_VERSION = 1
+
+
+def reserve_changes(conn, count: int = 1) -> Tuple[int, int, str]:
+    """Database.reserve_changes for a bare connection or cursor"""
+    seq, replica = conn.execute(
+        "UPDATE sync_state SET seq = seq + ? RETURNING seq, replica_id", (count,)).fetchall()[0]
+    return seq - count + 1, int(time.time() * 1000), replica
+
 
 class Database:
-    def __init__(self, db_path: str = "flashcards.db"):
-        self.conn = sqlite3.connect(db_path)
-        self.create_tables()
+    def __init__(self, db_path: Optional[str] = None, read_only: bool = False):
+        """Open a database, creating or migrating its schema
+
+        Without a path this is the app's database in the user data
+        directory. A read-only connection leaves the file untouched and
+        expects the schema to be current; open it normally once beforehand.
+        """
+        db_path = db_path or default_db_path()
+        self.read_only = read_only
+        if read_only:
+            self.conn = sqlite3.connect(f"file:{pathname2url(os.path.abspath(db_path))}?mode=ro",
+                                        uri=True)
+        else:
+            self.conn = sqlite3.connect(db_path)
+        self.conn.row_factory = sqlite3.Row
+        if not read_only:
+            self.create_tables()
 
     def create_tables(self):
         """Create all necessary tables"""
@@ -26,6 +66,9 @@ class Database:
                 back TEXT NOT NULL,
                 confidence INTEGER DEFAULT 0,
                 familiarity INTEGER DEFAULT 0,
+                content_hash TEXT,
+                level INTEGER NOT NULL DEFAULT 0,
+                next_due INTEGER NOT NULL DEFAULT 0,  -- epoch seconds, 0 = new card
                 FOREIGN KEY (deck_id) REFERENCES decks(id)
             );
 
@@ -37,6 +80,9 @@ class Database:
                 end_time TIMESTAMP,
                 correct_answers INTEGER,
                 total_answers INTEGER,
+                started_at INTEGER,  -- epoch seconds, for range scans and bucketing
+                ended_at INTEGER,
+                cards_reviewed INTEGER DEFAULT 0,
                 FOREIGN KEY (deck_id) REFERENCES decks(id)
             );
 
@@ -47,4 +93,159 @@ class Database:
                 correct BOOLEAN,
                 FOREIGN KEY (card_id) REFERENCES cards(id)
             );
-        """)
\ No newline at end of file
+
+            CREATE TABLE IF NOT EXISTS deck_stats (
+                deck_id INTEGER PRIMARY KEY,
+                total_cards INTEGER,
+                last_studied TIMESTAMP,
+                FOREIGN KEY (deck_id) REFERENCES decks(id)
+            );
+
+            CREATE TABLE IF NOT EXISTS card_stats (
+                card_id INTEGER PRIMARY KEY,
+                total_reviews INTEGER,
+                correct_reviews INTEGER,
+                last_reviewed TIMESTAMP,
+                average_response_time REAL,
+                FOREIGN KEY (card_id) REFERENCES cards(id)
+            );
+
+            -- Detailed reviews kept by CardStats; the scheduler's log is review_history
+            CREATE TABLE IF NOT EXISTS review_entries (
+                id INTEGER PRIMARY KEY,
+                card_id INTEGER,
+                timestamp TIMESTAMP,
+                result TEXT,
+                time_taken REAL,
+                confidence_before INTEGER,
+                confidence_after INTEGER,
+                FOREIGN KEY (card_id) REFERENCES cards(id)
+            );
+            CREATE INDEX IF NOT EXISTS idx_review_entries_card ON review_entries (card_id);
+        """)
+        self.migrate()
+
+    def migrate(self):
+        """Add columns and indexes introduced after a database was created"""
+        self.ensure_column("cards", "content_hash", "TEXT")
+        self.ensure_column("cards", "level", "INTEGER NOT NULL DEFAULT 0")
+        self.ensure_column("cards", "next_due", "INTEGER NOT NULL DEFAULT 0")
+        self.ensure_column("study_sessions", "started_at", "INTEGER")
+        self.ensure_column("study_sessions", "ended_at", "INTEGER")
+        self.ensure_column("study_sessions", "cards_reviewed", "INTEGER DEFAULT 0")
+        with self.conn:
+            self.conn.execute("""
+                UPDATE study_sessions SET
+                    started_at = CAST(strftime('%s', start_time, 'utc') AS INTEGER),
+                    ended_at = CAST(strftime('%s', end_time, 'utc') AS INTEGER)
+                WHERE started_at IS NULL AND start_time IS NOT NULL
+            """)
+        self.conn.executescript("""
+            CREATE INDEX IF NOT EXISTS idx_cards_deck_hash ON cards (deck_id, content_hash);
+            CREATE INDEX IF NOT EXISTS idx_cards_deck_id ON cards (deck_id, id);
+            CREATE INDEX IF NOT EXISTS idx_cards_next_due ON cards (next_due);
+            CREATE INDEX IF NOT EXISTS idx_cards_deck_next_due ON cards (deck_id, next_due);
+            CREATE INDEX IF NOT EXISTS idx_sessions_deck_started ON study_sessions (deck_id, started_at);
+            CREATE INDEX IF NOT EXISTS idx_sessions_started ON study_sessions (started_at);
+            CREATE INDEX IF NOT EXISTS idx_reviews_card ON review_history (card_id, correct, timestamp);
+        """)
+        self.setup_change_tracking()
+
+    def setup_change_tracking(self):
+        """Give every replicated row a uuid, version and change sequence number
+
+        Writers stamp the rows they insert or update with a number claimed
+        from a per-database change counter (see reserve_changes), so sync can
+        select exactly the rows changed since a cursor. Deletes leave a
+        tombstone in sync_tombstones, recorded by a trigger because any code
+        may delete rows; while sync_state.applying is set, sync records
+        tombstones itself with the version they arrived with.
+        """
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS sync_state (
+                replica_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                applying INTEGER NOT NULL DEFAULT 0
+            );
+
+            CREATE TABLE IF NOT EXISTS sync_peers (
+                peer_id TEXT PRIMARY KEY,
+                sent_seq INTEGER NOT NULL DEFAULT 0
+            );
+
+            CREATE TABLE IF NOT EXISTS sync_tombstones (
+                table_name TEXT NOT NULL,
+                uuid TEXT NOT NULL,
+                change_seq INTEGER NOT NULL,
+                modified_at INTEGER NOT NULL,
+                origin TEXT,
+                PRIMARY KEY (table_name, uuid)
+            );
+            CREATE INDEX IF NOT EXISTS idx_sync_tombstones_change_seq
+                ON sync_tombstones (change_seq);
+        """)
+        if self.conn.execute("SELECT COUNT(*) FROM sync_state").fetchone()[0] == 0:
+            self.conn.execute("INSERT INTO sync_state (replica_id, seq) VALUES (?, 0)",
+                              (uuid.uuid4().hex,))
+
+        for table in TRACKED_TABLES:
+            self.ensure_column(table, "uuid", "TEXT")
+            self.ensure_column(table, "change_seq", "INTEGER NOT NULL DEFAULT 0")
+            self.ensure_column(table, "modified_at", "INTEGER NOT NULL DEFAULT 0")
+            self.ensure_column(table, "origin", "TEXT")
+            self.conn.executescript(f"""
+                CREATE UNIQUE INDEX IF NOT EXISTS idx_{table}_uuid ON {table} (uuid);
+                CREATE INDEX IF NOT EXISTS idx_{table}_change_seq ON {table} (change_seq);
+            """)
+
+            # Rows written before tracking existed become one initial change set
+            if self.conn.execute(f"SELECT 1 FROM {table} WHERE uuid IS NULL LIMIT 1").fetchone():
+                with self.conn:
+                    self.conn.execute("UPDATE sync_state SET seq = seq + 1")
+                    self.conn.execute(f"""
+                        UPDATE {table} SET
+                            uuid = {NEW_UUID},
+                            change_seq = (SELECT seq FROM sync_state),
+                            modified_at = {_NOW_MS},
+                            origin = (SELECT replica_id FROM sync_state)
+                        WHERE uuid IS NULL
+                    """)
+
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] < TRACKING_VERSION:
+            self.migrate_change_tracking()
+        self.conn.commit()
+
+    def migrate_change_tracking(self):
+        """Replace the per-row stamping triggers with delete tombstones, once per database"""
+        with self.conn:
+            for table in TRACKED_TABLES:
+                self.conn.execute(f"DROP TRIGGER IF EXISTS {table}_track_insert")
+                self.conn.execute(f"DROP TRIGGER IF EXISTS {table}_track_update")
+                self.conn.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS {table}_track_delete AFTER DELETE ON {table}
+                    WHEN OLD.uuid IS NOT NULL AND NOT (SELECT applying FROM sync_state)
+                    BEGIN
+                        UPDATE sync_state SET seq = seq + 1;
+                        INSERT OR REPLACE INTO sync_tombstones
+                            (table_name, uuid, change_seq, modified_at, origin)
+                        SELECT '{table}', OLD.uuid, seq, {_NOW_MS}, replica_id FROM sync_state;
+                    END
+                """)
+            self.conn.execute(f"PRAGMA user_version = {TRACKING_VERSION}")
+
+    def reserve_changes(self, count: int = 1) -> Tuple[int, int, str]:
+        """Claim `count` change sequence numbers for rows the caller is about to write
+
+        Returns the first number, the version timestamp (milliseconds since
+        the epoch) and this replica's id, which the caller stores in the rows'
+        change_seq, modified_at and origin columns. Rows written together may
+        share one number.
+        """
+        return reserve_changes(self.conn, count)
+
+    def ensure_column(self, table: str, column: str, declaration: str):
+        """Add a column to an existing table if it is missing"""
+        columns = {row[1] for row in self.conn.execute(f"PRAGMA table_info({table})")}
+        if column not in columns:
+            self.conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {declaration}")
+            self.conn.commit()
\ No newline at end of file
@@ -0,0 +1,228 @@
+import gzip
+import json
+from contextlib import contextmanager
+from datetime import datetime
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, TYPE_CHECKING
+
+from data.data_access import CardRepository, DeckRepository
+from data.database.database import Database
+from data.storage import CardStore
+from model.flashcard import Flashcard
+from repetition.card_schedule import CardSchedule
+
+if TYPE_CHECKING:
+    from model.deck import Deck
+    from repetition.repetition_logic import RepetitionLogic
+
+# Deck archives are gzip-compressed JSON lines. The first line is a header
+# describing the deck, every following line is one chunk of card records:
+#
+#   {"format": 1, "name": ..., "description": ..., "category": ..., "created_at": ...}
+#   {"cards": [{"front": ..., "back": ..., "schedule": [...], "reviews": [...]}, ...]}
+#
+# Chunks let both ends stream large decks with bounded memory.
+ARCHIVE_FORMAT = 1
+DEFAULT_CHUNK_SIZE = 1000
+COMPRESS_LEVEL = 6
+
+
+def _card_record(card: Flashcard, schedule: Optional[CardSchedule] = None,
+                 reviews: Iterable[Tuple[str, bool]] = ()) -> Dict:
+    record = {
+        "uid": card.uid,
+        "id": card.id,
+        "front": card.front,
+        "back": card.back,
+        "familiarity": card.familiarity,
+        "confidence": card.confidence,
+        "level": card.level,
+        "next_due": card.next_due.isoformat() if card.next_due else None,
+        "reviews": [[_timestamp(timestamp), bool(correct)] for timestamp, correct in reviews]
+    }
+    if schedule is not None:
+        record["schedule"] = [schedule.level, schedule.history, schedule.window, schedule.last_review]
+    return record
+
+
+def _record_card(record: Dict) -> Flashcard:
+    card = Flashcard(record["front"], record["back"], record["familiarity"], record.get("uid"))
+    card.confidence = record["confidence"]
+    card.level = record["level"]
+    card.next_due = datetime.fromisoformat(record["next_due"]) if record["next_due"] else None
+    return card
+
+
+def _timestamp(value) -> str:
+    """A review time in the form sqlite3 stores datetimes in, so stored times sort as text"""
+    if not isinstance(value, datetime):
+        value = datetime.fromisoformat(value)
+    return value.isoformat(" ")
+
+
+class _ArchiveWriter:
+    def __init__(self, path: str, header: Dict):
+        self.file = gzip.open(path, "wb", compresslevel=COMPRESS_LEVEL)
+        self._write(header)
+
+    def _write(self, obj: Dict) -> None:
+        self.file.write(json.dumps(obj, separators=(",", ":")).encode("utf-8") + b"\n")
+
+    def write_chunk(self, records: List[Dict]) -> None:
+        if records:
+            self._write({"cards": records})
+
+    def close(self) -> None:
+        self.file.close()
+
+
+def _deck_header(name: str, description: str = "", category: str = "General",
+                 created_at: Optional[datetime] = None) -> Dict:
+    return {
+        "format": ARCHIVE_FORMAT,
+        "name": name,
+        "description": description,
+        "category": category,
+        "created_at": created_at.isoformat() if created_at else None
+    }
+
+
+def export_deck(deck: 'Deck', path: str, repetition_logic: Optional['RepetitionLogic'] = None,
+                chunk_size: int = DEFAULT_CHUNK_SIZE, card_repo: Optional[CardStore] = None) -> int:
+    """Stream an in-memory deck, with its scheduler state, to a compressed archive
+
+    Each card's reviews are those logged in card_repo for saved cards,
+    followed by the reviews repetition_logic has not persisted yet.
+    """
+    pending: Dict = {}
+    if repetition_logic is not None:
+        for card, timestamp, correct in repetition_logic.pending_reviews:
+            pending.setdefault(card.uid, []).append((timestamp, correct))
+
+    writer = _ArchiveWriter(path, _deck_header(deck.name, deck.description,
+                                               deck.category, deck.created_at))
+    count = 0
+    try:
+        cards = iter(deck.flashcards)
+        while True:
+            batch = list(islice(cards, chunk_size))
+            if not batch:
+                break
+            logged = {}
+            if card_repo is not None:
+                logged = card_repo.load_reviews(card.id for card in batch if card.id is not None)
+            chunk = []
+            for card in batch:
+                schedule = None
+                if repetition_logic is not None:
+                    schedule = repetition_logic.schedules.get(repetition_logic.card_key(card))
+                reviews = logged.get(card.id, []) + pending.get(card.uid, [])
+                chunk.append(_card_record(card, schedule, reviews))
+            writer.write_chunk(chunk)
+            count += len(chunk)
+    finally:
+        writer.close()
+    return count
+
+
+def export_deck_from_database(db: Database, deck_id: int, path: str,
+                              chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """Stream a stored deck and its review history to a compressed archive"""
+    row = DeckRepository(db).get_deck_info(deck_id)
+    if not row:
+        raise ValueError(f"Deck {deck_id} not found")
+    created_at = datetime.fromisoformat(row['created_at']) if row['created_at'] else None
+    writer = _ArchiveWriter(path, _deck_header(row['name'], row['description'] or "",
+                                               row['category'] or "General", created_at))
+    count = 0
+    card_repo = CardRepository(db)
+    try:
+        for cards in card_repo.iter_cards_for_deck(deck_id, chunk_size):
+            reviews = card_repo.load_reviews(card.id for card in cards)
+            writer.write_chunk([_card_record(card, reviews=reviews.get(card.id, ()))
+                                for card in cards])
+            count += len(cards)
+    finally:
+        writer.close()
+    return count
+
+
+@contextmanager
+def read_archive(path: str) -> Iterator[Tuple[Dict, Iterator[List[Dict]]]]:
+    """Open an archive for `with`, giving its header and an iterator over card record chunks
+
+    The file is closed when the block exits, whether or not every chunk was read.
+    """
+    with gzip.open(path, "rb") as f:
+        header = json.loads(f.readline())
+        if header.get("format") != ARCHIVE_FORMAT:
+            raise ValueError(f"{path} is not a format {ARCHIVE_FORMAT} deck archive")
+        yield header, (json.loads(line)["cards"] for line in f)
+
+
+def _header_deck(header: Dict) -> 'Deck':
+    """Empty deck described by an archive header"""
+    from model.deck import Deck
+
+    deck = Deck(header["name"], header["description"])
+    deck.category = header["category"]
+    if header["created_at"]:
+        deck.created_at = datetime.fromisoformat(header["created_at"])
+    return deck
+
+
+def import_deck(path: str, repetition_logic: Optional['RepetitionLogic'] = None) -> 'Deck':
+    """Read an archive into an in-memory deck, restoring scheduler state
+
+    Records without a saved schedule (as export_deck_from_database writes
+    them) get one by replaying their reviews. The in-memory deck keeps no
+    review log; import_deck_to_database keeps it.
+    """
+    with read_archive(path) as (header, chunks):
+        deck = _header_deck(header)
+        for records in chunks:
+            for record in records:
+                card = _record_card(record)
+                deck.add_card(card)
+                if repetition_logic is None:
+                    continue
+                key = repetition_logic.card_key(card)
+                if "schedule" in record:
+                    repetition_logic.schedules[key] = CardSchedule(*record["schedule"])
+                    continue
+                for timestamp, correct in record["reviews"]:
+                    repetition_logic.replay_review(
+                        key, correct, int(datetime.fromisoformat(timestamp).timestamp()))
+    return deck
+
+
+def import_deck_to_database(path: str, db: Database,
+                            repetition_logic: Optional['RepetitionLogic'] = None) -> int:
+    """Stream an archive into the database, one transaction per chunk
+
+    Reviews of cards skipped as duplicates are logged against the stored
+    card they repeat. The database keeps a card's level and review log but
+    not the rest of its schedule: restore_scheduler rebuilds that from the
+    log, and with repetition_logic the archived schedules are restored there.
+    """
+    with read_archive(path) as (header, chunks):
+        deck_id = DeckRepository(db).save_deck(_header_deck(header))
+        card_repo = CardRepository(db)
+        for records in chunks:
+            cards = [_record_card(record) for record in records]
+            report = card_repo.import_cards(cards, deck_id)
+            stored = card_repo.find_card_ids(
+                deck_id, {card.content_hash for card, repeated in report.skipped if repeated is None})
+            owners = {id(card): repeated.id if repeated is not None else stored[card.content_hash]
+                      for card, repeated in report.skipped}
+            card_repo.add_reviews(
+                (card.id if card.id is not None else owners[id(card)],
+                 datetime.fromisoformat(timestamp), correct)
+                for card, record in zip(cards, records)
+                for timestamp, correct in record["reviews"])
+            if repetition_logic is not None:
+                for card, record in zip(cards, records):
+                    if card.id is not None and "schedule" in record:
+                        repetition_logic.schedules[repetition_logic.card_key(card)] = \
+                            CardSchedule(*record["schedule"])
+    return deck_id
\ No newline at end of file
@@ -0,0 +1,224 @@
+import hashlib
+import json
+import os
+import time
+from array import array
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
+
+from data.snapshot import DeckSnapshot, SnapshotCardList, write_snapshot
+from model.flashcard import Flashcard
+from repetition.card_schedule import CardSchedule
+
+if TYPE_CHECKING:
+    from model.deck import Deck
+    from repetition.repetition_logic import RepetitionLogic
+
+# A parsed-deck cache is three files next to each other:
+#
+#   <path>        deck snapshot (see data.snapshot) holding the cards and their progress
+#   <path>.lines  per card in source order: uid q[], 8-byte digest of its source line Q[],
+#                 16-byte content hash
+#   <path>.json   the source key (path, size, mtime, digest) and the cards' schedules by uid
+#
+# A matching size and mtime reuses the snapshot without reading the source;
+# otherwise the source digest decides, and if the text really changed only
+# lines whose digest is not in the cache are parsed. Progress is saved by card
+# uid, so the cache stays a copy of the source whatever the deck's order.
+CACHE_FORMAT = 3
+LINE_DIGEST_SIZE = 8
+HASH_SIZE = 16
+LINE_RECORD_SIZE = 8 + LINE_DIGEST_SIZE + HASH_SIZE
+
+
+def _line_digest(line: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(line.strip(), digest_size=LINE_DIGEST_SIZE).digest(), "little")
+
+
+def _file_digest(path: str) -> str:
+    digest = hashlib.blake2b()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _replace(path: str, write) -> None:
+    tmp_path = f"{path}.tmp"
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+class DeckCache:
+    """Snapshot of a text deck, with its review progress, keyed by the source file"""
+
+    def __init__(self, cache_path: str):
+        self.cache_path = cache_path
+        self.lines_path = f"{cache_path}.lines"
+        self.meta_path = f"{cache_path}.json"
+        self.source: Optional[Dict] = None
+        self.loaded_at = 0
+
+    def _read_meta(self) -> Optional[Dict]:
+        try:
+            with open(self.meta_path) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if meta.get("format") != CACHE_FORMAT or not os.path.exists(self.cache_path):
+            return None
+        return meta
+
+    def _read_lines(self, count: int) -> Tuple[array, array, List[bytes]]:
+        """The cached lines' (uids, digests, hashes); all empty unless there are `count`"""
+        uids, digests = array("q"), array("Q")
+        try:
+            with open(self.lines_path, "rb") as f:
+                uids.fromfile(f, count)
+                digests.fromfile(f, count)
+                blob = f.read(count * HASH_SIZE)
+        except (OSError, EOFError):
+            return array("q"), array("Q"), []
+        if len(blob) != count * HASH_SIZE:
+            return array("q"), array("Q"), []
+        hashes = [blob[i:i + HASH_SIZE] for i in range(0, len(blob), HASH_SIZE)]
+        return uids, digests, hashes
+
+    def load(self, name: str, source_path: str,
+             repetition_logic: Optional['RepetitionLogic'] = None) -> 'Deck':
+        """Return the deck for a source file, parsing only what the cache lacks"""
+        from model.deck import Deck
+
+        stat = os.stat(source_path)
+        source = {"path": os.path.abspath(source_path), "size": stat.st_size,
+                  "mtime_ns": stat.st_mtime_ns}
+        self.loaded_at = int(time.time())
+        meta = self._read_meta()
+        cached = meta["source"] if meta else None
+
+        unchanged = cached is not None and all(cached[k] == source[k] for k in source)
+        if not unchanged:
+            source["digest"] = _file_digest(source_path)
+            unchanged = cached is not None and cached["path"] == source["path"] \
+                and cached["digest"] == source["digest"]
+        else:
+            source["digest"] = cached["digest"]
+        self.source = source
+
+        schedules = meta["schedules"] if meta else {}
+        if repetition_logic is not None:
+            # A newer checkpoint wins over the cached state
+            for uid, state in schedules.items():
+                repetition_logic.schedules.setdefault(int(uid), CardSchedule(*state))
+
+        if unchanged:
+            deck = Deck.open_snapshot(self.cache_path)
+            deck.name = name
+            if cached != source:
+                self._write_meta(schedules)
+        else:
+            deck = self._rebuild(name, source_path, meta)
+            self._write_meta(schedules)
+        return deck
+
+    def _rebuild(self, name: str, source_path: str, meta: Optional[Dict]) -> 'Deck':
+        """Re-import a changed source, keeping cached cards for unchanged lines"""
+        from model.deck import Deck
+
+        snapshot = DeckSnapshot(self.cache_path) if meta else None
+        # Lines that repeat map to their cached rows in order
+        cached_rows: Dict[int, List[int]] = {}
+        cached_hashes: List[bytes] = []
+        if snapshot is not None:
+            _, cached_digests, cached_hashes = self._read_lines(len(snapshot))
+            for row, digest in enumerate(cached_digests):
+                cached_rows.setdefault(digest, []).append(row)
+        for rows in cached_rows.values():
+            rows.reverse()
+
+        # Every line becomes a card, as with Deck.from_file
+        cards, digests, hashes = [], array("Q"), []
+        try:
+            with open(source_path, "rb") as f:
+                for line in f:
+                    digest = _line_digest(line)
+                    rows = cached_rows.get(digest)
+                    if rows:
+                        row = rows.pop()
+                        card, key = snapshot.card(row), cached_hashes[row]
+                    else:
+                        card = Flashcard(*Flashcard.parse_line(line.decode("utf-8")))
+                        key = bytes.fromhex(card.content_hash)
+                    cards.append(card)
+                    digests.append(digest)
+                    hashes.append(key)
+        finally:
+            if snapshot is not None:
+                snapshot.close()
+
+        deck = Deck(name)
+        deck.flashcards = cards
+        deck._card_index = None
+        self._write_cards(deck, cards, digests, hashes)
+        return deck
+
+    def _write_cards(self, deck: 'Deck', cards: List[Flashcard], digests: array,
+                     hashes: List[bytes]) -> None:
+        """Write the snapshot and line records of the source's cards, in source order"""
+        def write_lines(path: str) -> None:
+            with open(path, "wb") as f:
+                array("q", (card.uid for card in cards)).tofile(f)
+                digests.tofile(f)
+                f.write(b"".join(hashes))
+
+        _replace(self.cache_path, lambda path: write_snapshot(path, cards, deck.name,
+                                                              deck.description))
+        _replace(self.lines_path, write_lines)
+
+    def _write_meta(self, schedules: Dict[str, List[int]]) -> None:
+        def write(path: str) -> None:
+            with open(path, "w") as f:
+                json.dump({"format": CACHE_FORMAT, "source": self.source,
+                           "schedules": schedules}, f)
+
+        _replace(self.meta_path, write)
+
+    def save(self, deck: 'Deck', repetition_logic: Optional['RepetitionLogic'] = None) -> bool:
+        """Store the deck's progress if any card was reviewed since it was loaded"""
+        if self.source is None:
+            raise ValueError("save() needs a deck returned by load()")
+        if repetition_logic is None or not any(
+                s.last_review >= self.loaded_at for s in repetition_logic.schedules.values()):
+            return False
+        try:
+            count = os.path.getsize(self.lines_path) // LINE_RECORD_SIZE
+        except OSError:
+            return False
+        uids, digests, hashes = self._read_lines(count)
+        if len(hashes) != count:
+            return False
+
+        # Match the source's cards by uid, so cards the deck gained, lost or
+        # reordered since loading neither shift nor corrupt the cache; a line
+        # whose card left the deck keeps its cached row
+        by_uid = {card.uid: card for card in deck.flashcards}
+        snapshot = DeckSnapshot(self.cache_path) if any(uid not in by_uid for uid in uids) else None
+        try:
+            cards = [by_uid[uid] if uid in by_uid else snapshot.card(row)
+                     for row, uid in enumerate(uids)]
+        finally:
+            if snapshot is not None:
+                snapshot.close()
+        if isinstance(deck.flashcards, SnapshotCardList):
+            # The snapshot backing the list is about to be replaced
+            snapshot = deck.flashcards.snapshot
+            deck.flashcards = list(deck.flashcards)
+            snapshot.close()
+        self._write_cards(deck, cards, digests, hashes)
+        schedules = {}
+        for card in cards:
+            state = repetition_logic.schedules.get(card.uid)
+            if state is not None and state.last_review:
+                schedules[str(card.uid)] = [state.level, state.history, state.window, state.last_review]
+        self._write_meta(schedules)
+        self.loaded_at = int(time.time())
+        return True
\ No newline at end of file
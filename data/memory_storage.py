@@ -0,0 +1,393 @@
+from bisect import bisect_right, insort
+from collections import defaultdict
+from dataclasses import replace
+from datetime import date, datetime, timedelta
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple, TYPE_CHECKING
+
+import numpy as np
+
+from data.data_access import card_from_row, session_from_row, to_epoch, uid_to_uuid, uuid_to_uid
+from data.storage import CardStore, DeckStore, Record, SessionStore, StatsStore, StorageBackend
+from model.card_index import DuplicateReport
+from model.card_stats import CardStats
+from model.deck_stats import DeckStats
+from model.flashcard import new_uid
+from model.study_session_stats import StudySession
+
+if TYPE_CHECKING:
+    from model.deck import Deck
+    from model.flashcard import Flashcard
+
+# Sorts after every card id in a (next_due, id) key
+_LAST = float("inf")
+
+
+def _local_date(epoch: int) -> date:
+    return datetime.fromtimestamp(epoch).date()
+
+
+# Python equivalents of StudySessionRepository.BUCKETS: the bucket's first day
+BUCKETS: Dict[str, Callable[[int], date]] = {
+    'day': _local_date,
+    'week': lambda epoch: _local_date(epoch) - timedelta(days=_local_date(epoch).weekday()),
+    'month': lambda epoch: _local_date(epoch).replace(day=1),
+}
+
+
+class MemoryCardRepository(CardStore):
+    """Cards in a dict of rows keyed by id, with the indexes the SQLite schema has
+
+    Per-deck id lists serve paging, per-deck hash sets serve duplicate checks
+    and sorted (next_due, id) lists, one per deck plus one for all decks,
+    serve due-card queries. Rows hold the same columns as the cards table.
+    """
+
+    def __init__(self):
+        self._rows: Dict[int, Record] = {}
+        self._next_id = 1
+        self._deck_ids: Dict[int, List[int]] = defaultdict(list)
+        self._hashes: Dict[int, Set[str]] = defaultdict(set)
+        self._uuids: Set[str] = set()
+        self._due: Dict[Optional[int], List[Tuple[int, int]]] = defaultdict(list)
+        # card id -> [total_reviews, correct_reviews, last_reviewed]
+        self._review_totals: Dict[int, list] = {}
+        # card id -> logged (timestamp, correct) reviews
+        self._reviews: Dict[int, List[Tuple[str, bool]]] = defaultdict(list)
+        # Bumped by every write, standing in for the SQLite change counter
+        self._changes = 0
+
+    def _insert(self, card: 'Flashcard', deck_id: int) -> int:
+        card_id = self._next_id
+        self._next_id += 1
+        self._changes += 1
+        # Like the SQLite store, a card saved into a second deck gets a fresh uid
+        card_uuid = uid_to_uuid(card.uid)
+        if card_uuid in self._uuids:
+            card.uid = new_uid()
+            card_uuid = uid_to_uuid(card.uid)
+        self._uuids.add(card_uuid)
+        next_due = to_epoch(card.next_due)
+        self._rows[card_id] = Record(
+            id=card_id, deck_id=deck_id, front=card.front, back=card.back,
+            confidence=card.confidence, familiarity=card.familiarity,
+            content_hash=card.content_hash, level=card.level, next_due=next_due, uuid=card_uuid)
+        self._deck_ids[deck_id].append(card_id)
+        self._hashes[deck_id].add(card.content_hash)
+        insort(self._due[None], (next_due, card_id))
+        insort(self._due[deck_id], (next_due, card_id))
+        card.id = card_id
+        return card_id
+
+    def save_card(self, card: 'Flashcard', deck_id: int) -> int:
+        return self._insert(card, deck_id)
+
+    def find_existing_hashes(self, deck_id: int, hashes: Iterable[str]) -> Set[str]:
+        return self._hashes.get(deck_id, set()).intersection(hashes)
+
+    def find_card_ids(self, deck_id: int, hashes: Iterable[str]) -> Dict[str, int]:
+        wanted = self.find_existing_hashes(deck_id, hashes)
+        found: Dict[str, int] = {}
+        for card_id in self._deck_ids.get(deck_id, ()) if wanted else ():
+            key = self._rows[card_id]['content_hash']
+            if key in wanted:
+                found.setdefault(key, card_id)
+        return found
+
+    def import_cards(self, cards: List['Flashcard'], deck_id: int) -> DuplicateReport:
+        report = self._split_duplicates(cards, deck_id)
+        for card in report.added:
+            self._insert(card, deck_id)
+        return report
+
+    def update_schedules(self, cards: Iterable['Flashcard']) -> None:
+        self._changes += 1
+        moved = []
+        for card in cards:
+            row = self._rows.get(card.id) if card.id is not None else None
+            if row is None:
+                continue
+            next_due = to_epoch(card.next_due)
+            if next_due != row['next_due']:
+                moved.append((row['deck_id'], row['next_due'], next_due, card.id))
+            row.update(confidence=card.confidence, level=card.level, next_due=next_due)
+        # Moving an entry shifts the list behind it; past a few, re-sorting is cheaper
+        if len(moved) * 8 > len(self._rows):
+            self._rebuild_due()
+            return
+        for deck_id, old_due, new_due, card_id in moved:
+            for key in (None, deck_id):
+                due = self._due[key]
+                del due[bisect_right(due, (old_due, card_id)) - 1]
+                insort(due, (new_due, card_id))
+
+    def _rebuild_due(self) -> None:
+        self._due = defaultdict(list)
+        for row in self._rows.values():
+            key = (row['next_due'], row['id'])
+            self._due[None].append(key)
+            self._due[row['deck_id']].append(key)
+        for due in self._due.values():
+            due.sort()
+
+    def _due_until(self, deck_id: Optional[int], now: Optional[datetime]) -> Tuple[List[Tuple[int, int]], int]:
+        due = self._due.get(deck_id, [])
+        return due, bisect_right(due, (to_epoch(now or datetime.now()), _LAST))
+
+    def get_due_cards(self, limit: int, deck_id: Optional[int] = None,
+                      now: Optional[datetime] = None) -> List['Flashcard']:
+        due, end = self._due_until(deck_id, now)
+        return [card_from_row(self._rows[card_id]) for _, card_id in due[:min(end, limit)]]
+
+    def count_due_cards(self, deck_id: Optional[int] = None,
+                        now: Optional[datetime] = None) -> int:
+        return self._due_until(deck_id, now)[1]
+
+    def _deck_rows(self, deck_id: Optional[int]) -> Iterator[Record]:
+        if deck_id is None:
+            return iter(self._rows.values())
+        return (self._rows[card_id] for card_id in self._deck_ids.get(deck_id, ()))
+
+    def load_schedule_columns(self, deck_id: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        columns = np.fromiter(((row['next_due'], row['level']) for row in self._deck_rows(deck_id)),
+                              dtype=[('next_due', np.int64), ('level', np.int64)])
+        return columns['next_due'], columns['level']
+
+    def add_reviews(self, reviews: Iterable[Tuple[int, datetime, bool]]) -> None:
+        self._changes += 1
+        for card_id, timestamp, correct in reviews:
+            totals = self._review_totals.setdefault(card_id, [0, 0, None])
+            totals[0] += 1
+            totals[1] += int(correct)
+            # Stored as text like sqlite3 stores datetimes, so the latest compares greatest
+            timestamp = str(timestamp)
+            if totals[2] is None or timestamp > totals[2]:
+                totals[2] = timestamp
+            self._reviews[card_id].append((timestamp, bool(correct)))
+
+    def load_reviews(self, card_ids: Iterable[int]) -> Dict[int, List[Tuple[str, bool]]]:
+        return {card_id: sorted(self._reviews[card_id], key=lambda review: review[0])
+                for card_id in card_ids if card_id in self._reviews}
+
+    def load_review_totals(self, deck_id: int) -> List[Record]:
+        return [Record(card_id=card_id, total_reviews=totals[0], correct_reviews=totals[1],
+                       last_reviewed=totals[2])
+                for card_id, totals in ((card_id, self._review_totals.get(card_id))
+                                        for card_id in self._deck_ids.get(deck_id, ()))
+                if totals is not None]
+
+    def load_review_log(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        log = [(uuid_to_uid(self._rows[card_id]['uuid']), datetime.fromisoformat(timestamp).timestamp(),
+                correct)
+               for card_id, reviews in self._reviews.items() if card_id in self._rows
+               for timestamp, correct in reviews if timestamp != 'None']
+        columns = np.array(log, dtype=[('uid', np.int64), ('seconds', np.float64), ('correct', bool)])
+        return columns['uid'], columns['seconds'], columns['correct']
+
+    def change_marker(self) -> int:
+        return self._changes
+
+    def count_cards(self, deck_id: int) -> int:
+        return len(self._deck_ids.get(deck_id, ()))
+
+    def card_ids(self, deck_id: int) -> List[int]:
+        """Ids of a deck's cards in ascending order"""
+        return self._deck_ids.get(deck_id, [])
+
+    def list_cards_after(self, deck_id: int, after_id: Optional[int], limit: int) -> List[Record]:
+        ids = self._deck_ids.get(deck_id, [])
+        start = bisect_right(ids, after_id or 0)
+        return [Record(id=card_id, front=self._rows[card_id]['front'],
+                       confidence=self._rows[card_id]['confidence'])
+                for card_id in ids[start:start + limit]]
+
+    def card_id_before(self, deck_id: int, offset: int) -> Optional[int]:
+        ids = self._deck_ids.get(deck_id, [])
+        if offset <= 0 or offset > len(ids):
+            return None
+        return ids[offset - 1]
+
+    def get_card(self, card_id: int) -> Optional['Flashcard']:
+        row = self._rows.get(card_id)
+        return card_from_row(row) if row else None
+
+    def load_cards_for_deck(self, deck_id: int) -> List['Flashcard']:
+        return [card_from_row(row) for row in self._deck_rows(deck_id)]
+
+    def iter_cards_for_deck(self, deck_id: int, chunk_size: int = 1000) -> Iterator[List['Flashcard']]:
+        rows = self._deck_rows(deck_id)
+        while True:
+            chunk = [card_from_row(row) for row in islice(rows, chunk_size)]
+            if not chunk:
+                return
+            yield chunk
+
+
+class MemoryDeckRepository(DeckStore):
+    def __init__(self, card_repo: MemoryCardRepository):
+        self.card_repo = card_repo
+        self._rows: Dict[int, Record] = {}
+        self._ids: List[int] = []
+
+    def save_deck(self, deck: 'Deck') -> int:
+        deck_id = len(self._ids) + 1
+        self._rows[deck_id] = Record(id=deck_id, name=deck.name, description=deck.description,
+                                     created_at=deck.created_at, last_studied=deck.last_studied,
+                                     category=deck.category)
+        self._ids.append(deck_id)
+        return deck_id
+
+    def load_deck(self, deck_id: int) -> 'Deck':
+        from model.deck import Deck
+
+        row = self._rows.get(deck_id)
+        if not row:
+            raise ValueError(f"Deck {deck_id} not found")
+        deck = Deck(row['name'], row['description'])
+        deck.id = deck_id
+        deck.created_at = row['created_at']
+        deck.last_studied = row['last_studied']
+        deck.category = row['category']
+        deck.add_cards(self.card_repo.load_cards_for_deck(deck_id), skip_duplicates=False)
+        return deck
+
+    def get_deck_info(self, deck_id: int) -> Optional[Record]:
+        row = self._rows.get(deck_id)
+        return Record(row) if row else None
+
+    def count_decks(self) -> int:
+        return len(self._ids)
+
+    def list_decks_after(self, after_id: Optional[int], limit: int) -> List[Record]:
+        start = bisect_right(self._ids, after_id or 0)
+        return [Record(id=deck_id, name=self._rows[deck_id]['name'],
+                       category=self._rows[deck_id]['category'])
+                for deck_id in self._ids[start:start + limit]]
+
+    def deck_id_before(self, offset: int) -> Optional[int]:
+        if offset <= 0 or offset > len(self._ids):
+            return None
+        return self._ids[offset - 1]
+
+
+def _session_totals(rows: List[Record]) -> Record:
+    """The aggregates of StudySessionRepository._TOTALS, with SQL's NULLs for no rows"""
+    if not rows:
+        return Record(sessions=0, correct_answers=None, total_answers=None, accuracy=None,
+                      average_accuracy=None, study_minutes=None, cards_reviewed=None)
+    correct = sum(row['correct_answers'] for row in rows)
+    total = sum(row['total_answers'] for row in rows)
+    return Record(
+        sessions=len(rows),
+        correct_answers=correct,
+        total_answers=total,
+        accuracy=correct / total if total else None,
+        average_accuracy=sum(row['correct_answers'] / row['total_answers'] if row['total_answers'] > 0
+                             else 0 for row in rows) / len(rows),
+        study_minutes=sum(row['ended_at'] - row['started_at'] for row in rows
+                          if row['ended_at'] is not None) / 60.0,
+        cards_reviewed=sum(row['cards_reviewed'] for row in rows),
+    )
+
+
+class MemorySessionRepository(SessionStore):
+    def __init__(self):
+        self._rows: List[Record] = []
+
+    def save_session(self, session: StudySession, deck_id: int) -> int:
+        stats = session.stats
+        session_id = len(self._rows) + 1
+        self._rows.append(Record(
+            id=session_id, deck_id=deck_id, mode=session.mode.value,
+            correct_answers=stats.correct_answers, total_answers=stats.total_answers,
+            started_at=to_epoch(stats.start_time), ended_at=to_epoch(stats.end_time) or None,
+            cards_reviewed=len(session.reviewed_cards)))
+        return session_id
+
+    def get_sessions_for_deck(self, deck_id: int) -> List[StudySession]:
+        rows = sorted((row for row in self._rows if row['deck_id'] == deck_id),
+                      key=lambda row: row['started_at'])
+        return [session_from_row(row) for row in rows]
+
+    def _session_range(self, deck_id: Optional[int], since: Optional[datetime],
+                       until: Optional[datetime]) -> List[Record]:
+        low = to_epoch(since) if since is not None else None
+        high = to_epoch(until) if until is not None else None
+        return [row for row in self._rows
+                if (deck_id is None or row['deck_id'] == deck_id)
+                and (low is None or row['started_at'] >= low)
+                and (high is None or row['started_at'] < high)]
+
+    def aggregate_sessions(self, bucket: str = 'day', deck_id: Optional[int] = None,
+                           since: Optional[datetime] = None,
+                           until: Optional[datetime] = None) -> List[Record]:
+        if bucket not in BUCKETS:
+            raise ValueError(f"Unknown bucket {bucket!r}; expected one of {sorted(BUCKETS)}")
+        label = BUCKETS[bucket]
+        groups: Dict[str, List[Record]] = defaultdict(list)
+        for row in self._session_range(deck_id, since, until):
+            groups[label(row['started_at']).isoformat()].append(row)
+        return [Record(bucket=key, **_session_totals(groups[key])) for key in sorted(groups)]
+
+    def get_trend_summary(self, deck_id: Optional[int] = None,
+                          since: Optional[datetime] = None) -> Dict:
+        row = _session_totals(self._session_range(deck_id, since, None))
+        count = row['sessions']
+        return {
+            "sessions_count": count,
+            "total_study_time": row['study_minutes'] or 0,
+            "average_accuracy": row['average_accuracy'] or 0.0,
+            "cards_per_session": (row['cards_reviewed'] or 0) / count if count else 0
+        }
+
+
+def _copy_card_stats(stats: CardStats) -> CardStats:
+    return CardStats(
+        card_id=stats.card_id,
+        total_reviews=stats.total_reviews,
+        correct_reviews=stats.correct_reviews,
+        review_history=[replace(entry) for entry in stats.review_history],
+        last_reviewed=stats.last_reviewed,
+        average_response_time=stats.average_response_time
+    )
+
+
+class MemoryStatsRepository(StatsStore):
+    """Copies of saved CardStats and DeckStats, so later changes to the originals are not stored"""
+
+    def __init__(self, card_repo: MemoryCardRepository):
+        self.card_repo = card_repo
+        self._card_stats: Dict[int, CardStats] = {}
+        self._deck_stats: Dict[int, Tuple[int, Optional[datetime]]] = {}
+
+    def save_card_stats(self, stats: CardStats) -> None:
+        self._card_stats[stats.card_id] = _copy_card_stats(stats)
+
+    def load_card_stats(self, card_id: int) -> CardStats:
+        stats = self._card_stats.get(card_id)
+        return _copy_card_stats(stats) if stats is not None else CardStats(card_id=card_id)
+
+    def save_deck_stats(self, stats: DeckStats) -> None:
+        self._deck_stats[stats.deck_id] = (stats.total_cards, stats.last_studied)
+        for card_stats in stats.cards_stats.values():
+            self.save_card_stats(card_stats)
+
+    def load_deck_stats(self, deck_id: int) -> DeckStats:
+        if deck_id not in self._deck_stats:
+            return DeckStats(deck_id=deck_id)
+        total_cards, last_studied = self._deck_stats[deck_id]
+        stats = DeckStats(deck_id=deck_id, total_cards=total_cards, last_studied=last_studied)
+        for card_id in self.card_repo.card_ids(deck_id):
+            card_stats = self._card_stats.get(card_id)
+            if card_stats is not None:
+                stats.cards_stats[card_id] = _copy_card_stats(card_stats)
+        return stats
+
+
+class MemoryBackend(StorageBackend):
+    """Repositories kept entirely in process memory, for simulations, benchmarks and checks"""
+
+    def __init__(self):
+        cards = MemoryCardRepository()
+        super().__init__(MemoryDeckRepository(cards), MemorySessionRepository(),
+                         MemoryStatsRepository(cards))
\ No newline at end of file
@@ -0,0 +1,34 @@
+import os
+import sys
+
+APP_NAME = "flashcards"
+
+
+def user_data_dir() -> str:
+    """Per-user directory for the database, scheduler checkpoint and deck cache
+
+    FLASHCARDS_DATA_DIR overrides the platform default: %APPDATA% on
+    Windows, ~/Library/Application Support on macOS and $XDG_DATA_HOME
+    (~/.local/share) elsewhere.
+    """
+    override = os.environ.get("FLASHCARDS_DATA_DIR")
+    if override:
+        return override
+    if sys.platform == "win32":
+        base = os.environ.get("APPDATA") or os.path.expanduser("~\\AppData\\Roaming")
+    elif sys.platform == "darwin":
+        base = os.path.expanduser("~/Library/Application Support")
+    else:
+        base = os.environ.get("XDG_DATA_HOME") or os.path.expanduser("~/.local/share")
+    return os.path.join(base, APP_NAME)
+
+
+def data_path(name: str) -> str:
+    """Path of a file in the user data directory, creating the directory if needed"""
+    directory = user_data_dir()
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, name)
+
+
+def default_db_path() -> str:
+    return data_path("flashcards.db")
\ No newline at end of file
@@ -0,0 +1,203 @@
+import mmap
+import os
+import struct
+from array import array
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from model.card_list import LazyCardList
+from model.flashcard import Flashcard
+
+# Binary deck snapshot layout (little endian):
+#
+#   header      magic, version, reserved, card count              (32 bytes)
+#   uid         int64[n]     persistent card uid (version 2 onwards)
+#   id          int64[n]     database id, -1 if unsaved
+#   next_due    int64[n]     epoch seconds, 0 if never scheduled
+#   confidence  float64[n]
+#   offsets     uint64[2n+3] string boundaries into the heap
+#   level       int32[n]
+#   familiarity int32[n]
+#   heap        UTF-8 strings: deck name, description, front0, back0, front1, ...
+MAGIC = b"FCSNAP\x00\x01"
+VERSION = 2
+HEADER = struct.Struct("<8sIIQ8x")
+
+
+def write_snapshot(path: str, cards: List[Flashcard], name: str = "", description: str = "") -> None:
+    """Write cards to a snapshot file"""
+    count = len(cards)
+    uids = array("q", (card.uid for card in cards))
+    ids = array("q", (card.id if card.id is not None else -1 for card in cards))
+    next_due = array("q", (int(card.next_due.timestamp()) if card.next_due else 0 for card in cards))
+    confidence = array("d", (float(card.confidence) for card in cards))
+    level = array("i", (card.level for card in cards))
+    familiarity = array("i", (card.familiarity for card in cards))
+
+    strings = [name.encode("utf-8"), description.encode("utf-8")]
+    for card in cards:
+        strings.append(card.front.encode("utf-8"))
+        strings.append(card.back.encode("utf-8"))
+    offsets = array("Q", [0])
+    position = 0
+    for data in strings:
+        position += len(data)
+        offsets.append(position)
+
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, count))
+        for column in (uids, ids, next_due, confidence, offsets, level, familiarity):
+            column.tofile(f)
+        f.write(b"".join(strings))
+
+
+class DeckSnapshot:
+    """Read-only, memory-mapped view of a snapshot file
+
+    Columns are exposed as memoryviews over the mapping, so opening a file
+    costs a few page faults regardless of its size and the pages are shared
+    by every process that maps the same file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, count = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version not in (1, VERSION):
+            self._mmap.close()
+            raise ValueError(f"{path} is not a version 1 or {VERSION} deck snapshot")
+        self.count = count
+
+        self._view = view = memoryview(self._mmap)
+        position = HEADER.size
+        columns = {"uid": None}
+        layout = [("uid", "q", count)] if version >= 2 else []
+        layout += [("id", "q", count), ("next_due", "q", count),
+                   ("confidence", "d", count), ("offsets", "Q", 2 * count + 3),
+                   ("level", "i", count), ("familiarity", "i", count)]
+        for column, fmt, length in layout:
+            size = struct.calcsize(fmt) * length
+            columns[column] = view[position:position + size].cast(fmt)
+            position += size
+        self.uids = columns["uid"]  # None for version 1 files, see upgrade_snapshot
+        self.ids = columns["id"]
+        self.next_due = columns["next_due"]
+        self.confidence = columns["confidence"]
+        self.offsets = columns["offsets"]
+        self.level = columns["level"]
+        self.familiarity = columns["familiarity"]
+        self._heap = view[position:]
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _string(self, index: int) -> str:
+        return str(self._heap[self.offsets[index]:self.offsets[index + 1]], "utf-8")
+
+    @property
+    def name(self) -> str:
+        return self._string(0)
+
+    @property
+    def description(self) -> str:
+        return self._string(1)
+
+    def card(self, index: int) -> Flashcard:
+        """Build the Flashcard stored at a row"""
+        card = Flashcard(self._string(2 * index + 2), self._string(2 * index + 3),
+                         self.familiarity[index],
+                         self.uids[index] if self.uids is not None else None)
+        card_id = self.ids[index]
+        card.id = card_id if card_id >= 0 else None
+        card.confidence = self.confidence[index]
+        if card.confidence.is_integer():
+            card.confidence = int(card.confidence)
+        card.level = self.level[index]
+        card.next_due = datetime.fromtimestamp(self.next_due[index]) if self.next_due[index] else None
+        return card
+
+    def close(self) -> None:
+        for column in (self.uids, self.ids, self.next_due, self.confidence, self.offsets,
+                       self.level, self.familiarity, self._heap, self._view):
+            if column is not None:
+                column.release()
+        self._mmap.close()
+
+
+def upgrade_snapshot(snapshot: DeckSnapshot) -> DeckSnapshot:
+    """Rewrite an older snapshot in the current layout and return it reopened
+
+    Version 1 files carry no uids, so their cards would get new ones on
+    every open; the rewrite keeps those drawn now. The file is replaced
+    atomically. If it cannot be written the old snapshot is returned as is.
+    """
+    path = snapshot.path
+    tmp_path = f"{path}.tmp"
+    cards = [snapshot.card(i) for i in range(len(snapshot))]
+    try:
+        write_snapshot(tmp_path, cards, snapshot.name, snapshot.description)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return snapshot
+    snapshot.close()
+    try:
+        os.replace(tmp_path, path)
+    except OSError:
+        os.remove(tmp_path)
+    return DeckSnapshot(path)
+
+
+class SnapshotCardList(LazyCardList):
+    """Card list that builds Flashcards from a snapshot on first access
+
+    Reads stay lazy and return the same object for a row on every access.
+    The first mutation materializes the whole list, after which it behaves
+    like a plain list.
+    """
+
+    def __init__(self, snapshot: DeckSnapshot):
+        self.snapshot = snapshot
+        self._built: Dict[int, Flashcard] = {}
+        self._cards: Optional[List[Flashcard]] = None
+
+    def _row(self, index: int) -> Flashcard:
+        card = self._built.get(index)
+        if card is None:
+            card = self._built[index] = self.snapshot.card(index)
+        return card
+
+    def _materialize(self) -> List[Flashcard]:
+        if self._cards is None:
+            self._cards = [self._row(i) for i in range(len(self.snapshot))]
+            self._built.clear()
+        return self._cards
+
+    def __len__(self) -> int:
+        return len(self._cards) if self._cards is not None else len(self.snapshot)
+
+    def __getitem__(self, index):
+        if self._cards is not None:
+            return self._cards[index]
+        if isinstance(index, slice):
+            return [self._row(i) for i in range(*index.indices(len(self.snapshot)))]
+        if index < 0:
+            index += len(self.snapshot)
+        if not 0 <= index < len(self.snapshot):
+            raise IndexError("card index out of range")
+        return self._row(index)
+
+    def __iter__(self):
+        if self._cards is not None:
+            return iter(self._cards)
+        return (self._row(i) for i in range(len(self.snapshot)))
+
+    def __setitem__(self, index, value) -> None:
+        self._materialize()[index] = value
+
+    def __delitem__(self, index) -> None:
+        del self._materialize()[index]
+
+    def insert(self, index: int, value: Flashcard) -> None:
+        self._materialize().insert(index, value)
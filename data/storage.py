@@ -0,0 +1,212 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple, TYPE_CHECKING
+
+import numpy as np
+
+from model.card_index import DuplicateReport
+from model.study_session_stats import StudySession
+
+if TYPE_CHECKING:
+    from model.card_stats import CardStats
+    from model.deck import Deck
+    from model.deck_stats import DeckStats
+    from model.flashcard import Flashcard
+
+# The storage contract: what the app needs from wherever decks, cards, study
+# sessions and statistics live. data.data_access implements it on SQLite,
+# data.memory_storage in plain dicts and sorted lists; tests/test_storage_contract.py
+# checks that both behave the same.
+#
+# Rows returned by list_*_after, aggregate_sessions, load_review_totals and
+# get_deck_info can be indexed by position or by column name, like sqlite3.Row.
+
+
+class Record(dict):
+    """Row of an in-memory table, indexable by column name or position like sqlite3.Row"""
+
+    def __getitem__(self, key):
+        if isinstance(key, int):
+            return tuple(self.values())[key]
+        return super().__getitem__(key)
+
+
+class CardStore(ABC):
+    @abstractmethod
+    def save_card(self, card: 'Flashcard', deck_id: int) -> int:
+        """Insert a card into a deck, set its id and return it"""
+
+    @abstractmethod
+    def find_existing_hashes(self, deck_id: int, hashes: Iterable[str]) -> Set[str]:
+        """Return the subset of content hashes already stored in a deck"""
+
+    @abstractmethod
+    def find_card_ids(self, deck_id: int, hashes: Iterable[str]) -> Dict[str, int]:
+        """Id of the first stored card of a deck with each of the content hashes it holds"""
+
+    @abstractmethod
+    def import_cards(self, cards: List['Flashcard'], deck_id: int) -> DuplicateReport:
+        """Insert cards into a deck at once, skipping stored duplicates"""
+
+    def _split_duplicates(self, cards: List['Flashcard'], deck_id: int) -> DuplicateReport:
+        """Sort cards into those to add and those already stored or repeated in the batch"""
+        report = DuplicateReport()
+        keyed = [(card.content_hash, card) for card in cards]
+        existing = self.find_existing_hashes(deck_id, {key for key, _ in keyed})
+        seen = {}
+        for key, card in keyed:
+            if key in existing:
+                report.skipped.append((card, None))
+                continue
+            if key in seen:
+                report.skipped.append((card, seen[key]))
+                continue
+            seen[key] = card
+            report.added.append(card)
+        return report
+
+    def update_schedule(self, card: 'Flashcard') -> None:
+        """Persist a saved card's confidence, level and next due time"""
+        self.update_schedules([card])
+
+    @abstractmethod
+    def update_schedules(self, cards: Iterable['Flashcard']) -> None:
+        """Persist scheduling state for many saved cards at once"""
+
+    @abstractmethod
+    def get_due_cards(self, limit: int, deck_id: Optional[int] = None,
+                      now: Optional[datetime] = None) -> List['Flashcard']:
+        """Return the k most overdue cards of one deck or of all decks"""
+
+    @abstractmethod
+    def count_due_cards(self, deck_id: Optional[int] = None,
+                        now: Optional[datetime] = None) -> int:
+        pass
+
+    @abstractmethod
+    def load_schedule_columns(self, deck_id: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (next_due, level) for every card as columnar arrays"""
+
+    @abstractmethod
+    def add_reviews(self, reviews: Iterable[Tuple[int, datetime, bool]]) -> None:
+        """Append (card_id, timestamp, correct) entries to the review log"""
+
+    @abstractmethod
+    def load_reviews(self, card_ids: Iterable[int]) -> Dict[int, List[Tuple[str, bool]]]:
+        """Logged (timestamp, correct) reviews of the given cards in time order, by card id"""
+
+    @abstractmethod
+    def load_review_totals(self, deck_id: int) -> Sequence:
+        """Per reviewed card of a deck: card_id, total_reviews, correct_reviews, last_reviewed"""
+
+    @abstractmethod
+    def load_review_log(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """The whole review log as (card uid, epoch seconds, correct) columns, in no set order"""
+
+    @abstractmethod
+    def change_marker(self) -> int:
+        """A number that changes with every write to cards or the review log"""
+
+    @abstractmethod
+    def count_cards(self, deck_id: int) -> int:
+        pass
+
+    @abstractmethod
+    def list_cards_after(self, deck_id: int, after_id: Optional[int], limit: int) -> Sequence:
+        """One keyset page of (id, front, confidence) rows ordered by id"""
+
+    @abstractmethod
+    def card_id_before(self, deck_id: int, offset: int) -> Optional[int]:
+        """Id of the card preceding position `offset` of a deck"""
+
+    @abstractmethod
+    def get_card(self, card_id: int) -> Optional['Flashcard']:
+        pass
+
+    @abstractmethod
+    def load_cards_for_deck(self, deck_id: int) -> List['Flashcard']:
+        pass
+
+    @abstractmethod
+    def iter_cards_for_deck(self, deck_id: int, chunk_size: int = 1000) -> Iterator[List['Flashcard']]:
+        """Yield a deck's cards in id order, in chunks"""
+
+
+class DeckStore(ABC):
+    card_repo: CardStore
+
+    @abstractmethod
+    def save_deck(self, deck: 'Deck') -> int:
+        """Insert a deck (without its cards) and return its id"""
+
+    @abstractmethod
+    def load_deck(self, deck_id: int) -> 'Deck':
+        """Load a deck with all its cards; ValueError if there is none"""
+
+    @abstractmethod
+    def get_deck_info(self, deck_id: int):
+        """A deck's (id, name, description, created_at, last_studied, category) row, or None"""
+
+    @abstractmethod
+    def count_decks(self) -> int:
+        pass
+
+    @abstractmethod
+    def list_decks_after(self, after_id: Optional[int], limit: int) -> Sequence:
+        """One keyset page of (id, name, category) rows ordered by id"""
+
+    @abstractmethod
+    def deck_id_before(self, offset: int) -> Optional[int]:
+        """Id of the deck preceding position `offset`, for jumping to a page"""
+
+
+class SessionStore(ABC):
+    @abstractmethod
+    def save_session(self, session: StudySession, deck_id: int) -> int:
+        pass
+
+    @abstractmethod
+    def get_sessions_for_deck(self, deck_id: int) -> List[StudySession]:
+        """A deck's sessions in start order"""
+
+    @abstractmethod
+    def aggregate_sessions(self, bucket: str = 'day', deck_id: Optional[int] = None,
+                           since: Optional[datetime] = None,
+                           until: Optional[datetime] = None) -> Sequence:
+        """Per-bucket session totals; see StudySessionRepository.aggregate_sessions"""
+
+    @abstractmethod
+    def get_trend_summary(self, deck_id: Optional[int] = None,
+                          since: Optional[datetime] = None) -> Dict:
+        """Totals since a point in time, in the shape of DeckStats.get_study_trends"""
+
+
+class StatsStore(ABC):
+    @abstractmethod
+    def save_card_stats(self, stats: 'CardStats') -> None:
+        """Store a card's statistics and review entries, replacing earlier ones"""
+
+    @abstractmethod
+    def load_card_stats(self, card_id: int) -> 'CardStats':
+        """A card's statistics, or empty ones if none were stored"""
+
+    @abstractmethod
+    def save_deck_stats(self, stats: 'DeckStats') -> None:
+        """Store deck statistics together with those of its cards"""
+
+    @abstractmethod
+    def load_deck_stats(self, deck_id: int) -> 'DeckStats':
+        """Deck statistics with those of its cards, or empty ones if none were stored"""
+
+
+class StorageBackend:
+    """One storage engine's repositories, handed to the app as a unit"""
+
+    def __init__(self, decks: DeckStore, sessions: SessionStore, stats: StatsStore):
+        self.decks = decks
+        self.cards = decks.card_repo
+        self.sessions = sessions
+        self.stats = stats
+
+    def close(self) -> None:
+        pass
\ No newline at end of file
@@ -0,0 +1,225 @@
+import uuid
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List
+
+from data.database.database import Database
+
+CHUNK_SIZE = 5000
+
+# Per table: the alias and SELECT exporting changed rows (foreign keys as uuids) and the
+# bulk statement applying them, stamped with a change number of the receiving
+# replica so they travel on to its other peers. Mutable rows merge
+# last-writer-wins on (modified_at, origin), which both replicas evaluate
+# identically; the review log and sessions are append-only and merge as a union.
+# Deletes travel as tombstones and win over any older version of the row.
+_TABLES = {
+    "decks": (
+        "d",
+        """SELECT d.uuid, d.name, d.description, d.created_at, d.last_studied, d.category,
+                  d.modified_at, d.origin, d.change_seq
+           FROM decks d""",
+        """INSERT INTO decks (uuid, name, description, created_at, last_studied, category,
+                              modified_at, origin, change_seq)
+           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+           ON CONFLICT (uuid) DO UPDATE SET
+               name = excluded.name, description = excluded.description,
+               created_at = excluded.created_at, last_studied = excluded.last_studied,
+               category = excluded.category,
+               modified_at = excluded.modified_at, origin = excluded.origin,
+               change_seq = excluded.change_seq
+           WHERE (excluded.modified_at, excluded.origin) > (decks.modified_at, decks.origin)"""
+    ),
+    "cards": (
+        "c",
+        """SELECT c.uuid, d.uuid, c.front, c.back, c.confidence, c.familiarity, c.content_hash,
+                  c.level, c.next_due, c.modified_at, c.origin, c.change_seq
+           FROM cards c LEFT JOIN decks d ON d.id = c.deck_id""",
+        """INSERT INTO cards (uuid, deck_id, front, back, confidence, familiarity, content_hash,
+                              level, next_due, modified_at, origin, change_seq)
+           VALUES (?, (SELECT id FROM decks WHERE uuid = ?), ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+           ON CONFLICT (uuid) DO UPDATE SET
+               deck_id = excluded.deck_id, front = excluded.front, back = excluded.back,
+               confidence = excluded.confidence, familiarity = excluded.familiarity,
+               content_hash = excluded.content_hash, level = excluded.level,
+               next_due = excluded.next_due,
+               modified_at = excluded.modified_at, origin = excluded.origin,
+               change_seq = excluded.change_seq
+           WHERE (excluded.modified_at, excluded.origin) > (cards.modified_at, cards.origin)"""
+    ),
+    "study_sessions": (
+        "s",
+        """SELECT s.uuid, d.uuid, s.mode, s.start_time, s.end_time, s.correct_answers,
+                  s.total_answers, s.started_at, s.ended_at, s.cards_reviewed,
+                  s.modified_at, s.origin, s.change_seq
+           FROM study_sessions s LEFT JOIN decks d ON d.id = s.deck_id""",
+        """INSERT INTO study_sessions (uuid, deck_id, mode, start_time, end_time,
+                                       correct_answers, total_answers, started_at, ended_at,
+                                       cards_reviewed, modified_at, origin, change_seq)
+           VALUES (?, (SELECT id FROM decks WHERE uuid = ?), ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+           ON CONFLICT (uuid) DO NOTHING"""
+    ),
+    "review_history": (
+        "r",
+        """SELECT r.uuid, c.uuid, r.timestamp, r.correct, r.modified_at, r.origin, r.change_seq
+           FROM review_history r LEFT JOIN cards c ON c.id = r.card_id""",
+        """INSERT INTO review_history (uuid, card_id, timestamp, correct, modified_at, origin,
+                                       change_seq)
+           VALUES (?, (SELECT id FROM cards WHERE uuid = ?), ?, ?, ?, ?, ?)
+           ON CONFLICT (uuid) DO NOTHING"""
+    ),
+}
+
+_SELECT_TOMBSTONES = """
+    SELECT table_name, uuid, modified_at, origin FROM sync_tombstones
+    WHERE change_seq > ? AND change_seq <= ? AND origin IS NOT ? ORDER BY change_seq
+"""
+
+_APPLY_TOMBSTONE = """
+    INSERT INTO sync_tombstones (table_name, uuid, modified_at, origin, change_seq)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT (table_name, uuid) DO UPDATE SET
+        modified_at = excluded.modified_at, origin = excluded.origin,
+        change_seq = excluded.change_seq
+    WHERE (excluded.modified_at, excluded.origin)
+          > (sync_tombstones.modified_at, sync_tombstones.origin)
+"""
+
+# Rows outdated by a tombstone, where either side arrived with change number ?1:
+# new tombstones delete existing rows, and rows deleted here earlier stay deleted
+_PURGE = """
+    DELETE FROM {table} WHERE id IN (
+        SELECT x.id FROM sync_tombstones t JOIN {table} x ON x.uuid = t.uuid
+        WHERE t.table_name = '{table}' AND t.change_seq = ?1
+          AND (t.modified_at, t.origin) > (x.modified_at, x.origin)
+        UNION ALL
+        SELECT x.id FROM {table} x JOIN sync_tombstones t
+            ON t.table_name = '{table}' AND t.uuid = x.uuid
+        WHERE x.change_seq = ?1
+          AND (t.modified_at, t.origin) > (x.modified_at, x.origin))
+"""
+
+
+@dataclass
+class SyncReport:
+    """Rows sent in each direction, per table"""
+    pushed: Dict[str, int] = field(default_factory=dict)
+    pulled: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def total(self) -> int:
+        return sum(self.pushed.values()) + sum(self.pulled.values())
+
+
+def replica_id(db: Database) -> str:
+    return db.conn.execute("SELECT replica_id FROM sync_state").fetchone()[0]
+
+
+def current_seq(db: Database) -> int:
+    return db.conn.execute("SELECT seq FROM sync_state").fetchone()[0]
+
+
+def new_replica_id(db: Database) -> str:
+    """Give a copied database file its own identity so it can sync with the original"""
+    new_id = uuid.uuid4().hex
+    with db.conn:
+        db.conn.execute("UPDATE sync_state SET replica_id = ?", (new_id,))
+        db.conn.execute("DELETE FROM sync_peers")
+    return new_id
+
+
+def _sent_cursor(db: Database, peer_id: str) -> int:
+    row = db.conn.execute("SELECT sent_seq FROM sync_peers WHERE peer_id = ?", (peer_id,)).fetchone()
+    return row[0] if row else 0
+
+
+def changes_since(db: Database, table: str, since: int, until: int,
+                  exclude_origin: str) -> Iterator[List[tuple]]:
+    """Yield chunks of rows changed in (since, until], skipping versions from exclude_origin
+
+    Rows whose current version came from the peer are already there, so
+    they are not echoed back. The change_seq index keeps this proportional
+    to the number of changes.
+    """
+    alias, select, _ = _TABLES[table]
+    cursor = db.conn.cursor()
+    cursor.row_factory = None
+    cursor.execute(
+        f"{select} WHERE {alias}.change_seq > ? AND {alias}.change_seq <= ? "
+        f"AND {alias}.origin IS NOT ? ORDER BY {alias}.change_seq",
+        (since, until, exclude_origin))
+    while True:
+        rows = cursor.fetchmany(CHUNK_SIZE)
+        if not rows:
+            return
+        # change_seq is only used for selection, not shipped
+        yield [row[:-1] for row in rows]
+
+
+def tombstones_since(db: Database, since: int, until: int,
+                     exclude_origin: str) -> Iterator[List[tuple]]:
+    """Yield chunks of (table, uuid, modified_at, origin) for deletes in (since, until]"""
+    cursor = db.conn.cursor()
+    cursor.row_factory = None
+    cursor.execute(_SELECT_TOMBSTONES, (since, until, exclude_origin))
+    while True:
+        rows = cursor.fetchmany(CHUNK_SIZE)
+        if not rows:
+            return
+        yield rows
+
+
+def _transfer(source: Database, target: Database) -> Dict[str, int]:
+    """Send source's changes since the last sync to target in one transaction"""
+    source_id, target_id = replica_id(source), replica_id(target)
+    since = _sent_cursor(source, target_id)
+    until = current_seq(source)
+    counts = {}
+    with target.conn:
+        target.conn.execute("UPDATE sync_state SET applying = 1")
+        try:
+            seq, _, _ = target.reserve_changes()
+            for table, (_, _, apply) in _TABLES.items():
+                counts[table] = 0
+                for rows in changes_since(source, table, since, until, target_id):
+                    target.conn.executemany(apply, [row + (seq,) for row in rows])
+                    counts[table] += len(rows)
+            counts["deletes"] = 0
+            for rows in tombstones_since(source, since, until, target_id):
+                target.conn.executemany(_APPLY_TOMBSTONE, [row + (seq,) for row in rows])
+                counts["deletes"] += len(rows)
+            # Children before parents, mirroring the apply order
+            for table in reversed(list(_TABLES)):
+                target.conn.execute(_PURGE.format(table=table), (seq,))
+        finally:
+            target.conn.execute("UPDATE sync_state SET applying = 0")
+    with source.conn:
+        source.conn.execute("""
+            INSERT INTO sync_peers (peer_id, sent_seq) VALUES (?, ?)
+            ON CONFLICT (peer_id) DO UPDATE SET sent_seq = excluded.sent_seq
+        """, (target_id, until))
+    return counts
+
+
+def sync(local: Database, remote: Database) -> SyncReport:
+    """Exchange changes between two databases in both directions
+
+    Decks are applied before cards and cards before reviews and sessions,
+    so foreign keys resolve through the rows' uuids. Deleted rows are
+    removed on the other side unless that side has a newer version of them.
+    """
+    if replica_id(local) == replica_id(remote):
+        raise ValueError("Both databases share a replica id; call new_replica_id on a copied file")
+    report = SyncReport()
+    report.pushed = _transfer(local, remote)
+    report.pulled = _transfer(remote, local)
+    return report
+
+
+def sync_files(local_path: str, remote_path: str) -> SyncReport:
+    """Sync two database files"""
+    local, remote = Database(local_path), Database(remote_path)
+    try:
+        return sync(local, remote)
+    finally:
+        local.conn.close()
+        remote.conn.close()
@@ -1,37 +1,76 @@
 from ui.ui import FlashcardUI
 from model.deck import Deck
 from model.flashcard import Flashcard
+from data.database.database import Database
+from data.data_access import SQLiteBackend
+from data.deck_cache import DeckCache
+from data.paths import data_path, default_db_path
+from repetition.checkpoint import restore_scheduler, save_checkpoint
+
+CHECKPOINT_INTERVAL_MS = 5 * 60 * 1000
 
 class FlashcardApp:
-    def __init__(self, default_deck_path="resources/flashcards.txt"):
+    def __init__(self, default_deck_path="resources/flashcards.txt",
+                 db_path=None, checkpoint_path=None, deck_cache_path=None):
+        """Paths left as None go to the per-user data directory (see data.paths)"""
         self.default_deck_path = default_deck_path
+        self.db_path = db_path or default_db_path()
+        self.checkpoint_path = checkpoint_path or data_path("scheduler.ckpt")
+        self.deck_cache = DeckCache(deck_cache_path or data_path("default_deck.cache"))
+        self.default_deck = None
+        self.storage = None
         self.ui = None
 
     def load_default_deck(self) -> Deck:
-        """Load the default flashcard deck"""
+        """Load the default flashcard deck, from the parsed-deck cache when it is current"""
         try:
-            deck = Deck.from_file("Default Deck", self.default_deck_path)
-            return deck
+            return self.deck_cache.load("Default Deck", self.default_deck_path,
+                                        self.ui.repetition_logic if self.ui else None)
         except FileNotFoundError:
             print(f"Warning: Default deck file not found at {self.default_deck_path}")
             return Deck("Default Deck")
 
+    def save_checkpoint(self):
+        """Write the scheduler checkpoint and the default deck's progress"""
+        self.ui.speed_review.flush()
+        save_checkpoint(self.ui.repetition_logic, self.checkpoint_path, self.storage.cards)
+        if self.default_deck is not None:
+            self.deck_cache.save(self.default_deck, self.ui.repetition_logic)
+
+    def checkpoint_periodically(self):
+        """Write a checkpoint and schedule the next one"""
+        self.save_checkpoint()
+        self.ui.after(CHECKPOINT_INTERVAL_MS, self.checkpoint_periodically)
+
     def run(self):
         """Start the flashcard application"""
         # Initialize UI
         self.ui = FlashcardUI()
         
+        # Restore scheduler state
+        self.storage = SQLiteBackend(Database(self.db_path))
+        restore_scheduler(self.ui.repetition_logic, self.checkpoint_path, self.storage.cards)
+        self.ui.attach_storage(self.storage)
+        self.ui.after(CHECKPOINT_INTERVAL_MS, self.checkpoint_periodically)
+        
         # Load default deck
         default_deck = self.load_default_deck()
+        if self.deck_cache.source is not None:
+            self.default_deck = default_deck
         
         # Set up initial UI state
         if default_deck.get_card_count() > 0:
             self.ui.current_deck = default_deck
+            self.ui.begin_session()
             self.ui.show_next_card()
             self.ui.update_stats()
 
         # Start UI main loop
-        self.ui.mainloop()
+        try:
+            self.ui.mainloop()
+        finally:
+            self.ui.finish_session()
+            self.save_checkpoint()
 
 def main():
     app = FlashcardApp()
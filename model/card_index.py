@@ -0,0 +1,165 @@
+import hashlib
+import re
+import unicodedata
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from model.flashcard import Flashcard
+
+_WHITESPACE = re.compile(r"\s+")
+_FIELD_SEPARATOR = "\x1f"
+_MERSENNE_PRIME = (1 << 61) - 1
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text for duplicate comparison (unicode form, case, whitespace)"""
+    text = unicodedata.normalize("NFKC", text).casefold()
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def content_hash(front: str, back: str) -> str:
+    """Stable hash of a card's normalized front and back"""
+    key = normalize_text(front) + _FIELD_SEPARATOR + normalize_text(back)
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _shingles(text: str, size: int) -> set:
+    """Character shingles of the normalized text"""
+    if len(text) <= size:
+        return {text}
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+def _permutations(num_perm: int) -> List[Tuple[int, int]]:
+    """Deterministic (a, b) coefficients for the MinHash universal hashes"""
+    coefficients = []
+    for i in range(num_perm):
+        digest = hashlib.blake2b(i.to_bytes(4, "little"), digest_size=16).digest()
+        a = int.from_bytes(digest[:8], "little") % _MERSENNE_PRIME or 1
+        b = int.from_bytes(digest[8:], "little") % _MERSENNE_PRIME
+        coefficients.append((a, b))
+    return coefficients
+
+
+def minhash_signature(front: str, back: str, permutations: List[Tuple[int, int]],
+                      shingle_size: int = 4) -> Tuple[int, ...]:
+    """MinHash signature over character shingles of the card content"""
+    text = normalize_text(front) + _FIELD_SEPARATOR + normalize_text(back)
+    values = [
+        int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "little")
+        for s in _shingles(text, shingle_size)
+    ]
+    return tuple(
+        min((a * v + b) % _MERSENNE_PRIME for v in values)
+        for a, b in permutations
+    )
+
+
+@dataclass
+class DuplicateReport:
+    """Outcome of adding a batch of cards to an indexed collection"""
+    added: List['Flashcard'] = field(default_factory=list)
+    # (incoming, existing); existing is None when the duplicate is only in the database
+    skipped: List[Tuple['Flashcard', Optional['Flashcard']]] = field(default_factory=list)
+    near_duplicates: List[Tuple['Flashcard', 'Flashcard']] = field(default_factory=list)
+    merged: List[Tuple['Flashcard', 'Flashcard']] = field(default_factory=list)
+
+    @property
+    def duplicate_count(self) -> int:
+        return len(self.skipped) + len(self.near_duplicates) + len(self.merged)
+
+    def summary(self) -> Dict[str, int]:
+        return {
+            "added": len(self.added),
+            "skipped": len(self.skipped),
+            "near_duplicates": len(self.near_duplicates),
+            "merged": len(self.merged)
+        }
+
+
+class CardIndex:
+    """Content-hash index of cards with optional MinHash/LSH near-duplicate lookup"""
+
+    def __init__(self, near_duplicates: bool = False, threshold: float = 0.8,
+                 num_perm: int = 32, bands: int = 8):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.near_duplicates = near_duplicates
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._permutations = _permutations(num_perm) if near_duplicates else []
+        self._by_hash: Dict[str, 'Flashcard'] = {}
+        self._signatures: Dict[str, Tuple[int, ...]] = {}
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], List[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._by_hash)
+
+    def __contains__(self, card: 'Flashcard') -> bool:
+        return card.content_hash in self._by_hash
+
+    def get(self, key: str) -> Optional['Flashcard']:
+        """Return the indexed card with the given content hash"""
+        return self._by_hash.get(key)
+
+    def find_duplicate(self, card: 'Flashcard') -> Tuple[Optional['Flashcard'], Optional[str]]:
+        """Return (existing card, "exact" | "near") or (None, None)"""
+        key = card.content_hash
+        existing = self._by_hash.get(key)
+        if existing is not None:
+            return existing, "exact"
+        if self.near_duplicates:
+            match = self._find_near(minhash_signature(card.front, card.back, self._permutations))
+            if match is not None:
+                return match, "near"
+        return None, None
+
+    def add(self, card: 'Flashcard') -> None:
+        """Index a card; the first card indexed for a given content wins"""
+        key = card.content_hash
+        if key in self._by_hash:
+            return
+        self._by_hash[key] = card
+        if self.near_duplicates:
+            signature = minhash_signature(card.front, card.back, self._permutations)
+            self._signatures[key] = signature
+            for band in self._band_keys(signature):
+                self._buckets.setdefault(band, []).append(key)
+
+    def remove(self, card: 'Flashcard') -> None:
+        """Drop a card from the index"""
+        key = card.content_hash
+        if self._by_hash.get(key) is not card:
+            return
+        del self._by_hash[key]
+        signature = self._signatures.pop(key, None)
+        if signature is not None:
+            for band in self._band_keys(signature):
+                bucket = self._buckets.get(band)
+                if bucket and key in bucket:
+                    bucket.remove(key)
+                    if not bucket:
+                        del self._buckets[band]
+
+    def clear(self) -> None:
+        self._by_hash.clear()
+        self._signatures.clear()
+        self._buckets.clear()
+
+    def _band_keys(self, signature: Tuple[int, ...]):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows]
+
+    def _find_near(self, signature: Tuple[int, ...]) -> Optional['Flashcard']:
+        candidates = set()
+        for band in self._band_keys(signature):
+            candidates.update(self._buckets.get(band, ()))
+        best, best_score = None, self.threshold
+        for key in candidates:
+            other = self._signatures[key]
+            score = sum(1 for x, y in zip(signature, other) if x == y) / len(signature)
+            if score >= best_score:
+                best, best_score = self._by_hash[key], score
+        return best
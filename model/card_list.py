@@ -0,0 +1,136 @@
+from collections.abc import MutableSequence
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from model.flashcard import Flashcard
+
+
+class LazyCardList(MutableSequence):
+    """Base for card sequences that build their cards on access, like snapshot-backed lists
+
+    Deck keeps such a list as it is instead of copying it into a CardList,
+    until an edit needs the uid index.
+    """
+
+
+class CardList(MutableSequence):
+    """Dense list of cards with a uid -> position map
+
+    Lookup, membership and removal by uid are O(1) and keep the order of
+    the remaining cards: removal leaves a hole in the underlying list,
+    which iteration skips and which is squeezed out once holes make up half
+    of it, or before the next positional access. Iteration walks the
+    underlying list without copying it.
+
+    The map is built on the first lookup by uid, so cards that are only
+    ever iterated pay neither for it nor for a uid.
+    """
+
+    # Holes tolerated before a removal compacts the list, whatever its size
+    MIN_HOLES = 64
+
+    def __init__(self, cards: Iterable[Flashcard] = ()):
+        self._cards: List[Optional[Flashcard]] = list(cards)
+        self._positions: Optional[Dict[int, int]] = None
+        self._holes = 0
+
+    def __len__(self) -> int:
+        return len(self._cards) - self._holes
+
+    def __iter__(self) -> Iterator[Flashcard]:
+        if self._holes:
+            return (card for card in self._cards if card is not None)
+        return iter(self._cards)
+
+    def __getitem__(self, index):
+        return self._compact()[index]
+
+    def __contains__(self, card) -> bool:
+        if not isinstance(card, Flashcard):
+            return False
+        position = self._index().get(card.uid)
+        return position is not None and self._cards[position] is card
+
+    def __repr__(self) -> str:
+        return f"CardList({len(self)} cards)"
+
+    def _compact(self) -> List[Optional[Flashcard]]:
+        """Squeeze out holes left by removals; positions in the map follow"""
+        if self._holes:
+            self._cards = [card for card in self._cards if card is not None]
+            self._holes = 0
+            if self._positions is not None:
+                self._positions = {card.uid: i for i, card in enumerate(self._cards)}
+        return self._cards
+
+    def _index(self) -> Dict[int, int]:
+        if self._positions is None:
+            positions = {card.uid: i for i, card in enumerate(self._cards) if card is not None}
+            if len(positions) != len(self):
+                raise ValueError("a card appears more than once in the list")
+            self._positions = positions
+        return self._positions
+
+    def _check_new(self, card: Flashcard) -> None:
+        if self._positions is not None and card.uid in self._positions:
+            raise ValueError(f"card {card.uid} is already in the list")
+
+    def get(self, uid: int) -> Optional[Flashcard]:
+        """Return the card with a uid, or None"""
+        position = self._index().get(uid)
+        return self._cards[position] if position is not None else None
+
+    def append(self, card: Flashcard) -> None:
+        self._check_new(card)
+        if self._positions is not None:
+            self._positions[card.uid] = len(self._cards)
+        self._cards.append(card)
+
+    def extend(self, cards: Iterable[Flashcard]) -> None:
+        if self._positions is None:
+            self._cards.extend(cards)
+        else:
+            for card in cards:
+                self.append(card)
+
+    def pop_id(self, uid: int) -> Flashcard:
+        """Remove and return the card with a uid, keeping the order of the others"""
+        position = self._index().pop(uid)
+        card = self._cards[position]
+        if position == len(self._cards) - 1:
+            self._cards.pop()
+        else:
+            self._cards[position] = None
+            self._holes += 1
+            if self._holes >= self.MIN_HOLES and 2 * self._holes >= len(self._cards):
+                self._compact()
+        return card
+
+    def remove(self, card: Flashcard) -> None:
+        if card not in self:
+            raise ValueError("card is not in the list")
+        self.pop_id(card.uid)
+
+    def clear(self) -> None:
+        self._cards.clear()
+        self._positions = None
+        self._holes = 0
+
+    # Positional edits keep the order; they drop the map, to be rebuilt on the next lookup
+    def __setitem__(self, index, value) -> None:
+        cards = self._compact()
+        if isinstance(index, slice):
+            cards[index] = list(value)
+        else:
+            if value is not cards[index]:
+                self._check_new(value)
+            cards[index] = value
+        self._positions = None
+
+    def __delitem__(self, index) -> None:
+        del self._compact()[index]
+        self._positions = None
+
+    def insert(self, index: int, card: Flashcard) -> None:
+        self._check_new(card)
+        self._compact().insert(index, card)
+        self._positions = None
\ No newline at end of file
@@ -1,8 +1,10 @@
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from typing import List, Dict
+from typing import List, Dict, Optional, TYPE_CHECKING
 from enum import Enum
-from data.database.database import Database
+
+if TYPE_CHECKING:
+    from data.storage import StatsStore
 
 class ReviewResult(Enum):
     CORRECT = "correct"
@@ -25,9 +27,6 @@ class CardStats:
     review_history: List[ReviewEntry] = field(default_factory=list)
     last_reviewed: datetime = None
     average_response_time: float = 0.0
-
-    def __post_init__(self):
-        self.db = Database()
     
     def record_review(self, result: ReviewResult, time_taken: float, 
                      confidence_before: int, confidence_after: int) -> None:
@@ -87,55 +86,11 @@ class CardStats:
         time_since_review = datetime.now() - self.last_reviewed
         return time_since_review.total_seconds() >= (interval_hours * 3600)
 
-    def save(self, db_cursor) -> None:
-        """Save card statistics to database"""
-        db_cursor.execute("""
-            INSERT OR REPLACE INTO card_stats 
-            (card_id, total_reviews, correct_reviews, last_reviewed, average_response_time)
-            VALUES (?, ?, ?, ?, ?)
-        """, (self.card_id, self.total_reviews, self.correct_reviews,
-              self.last_reviewed, self.average_response_time))
-        
-        # Save review history
-        for entry in self.review_history:
-            db_cursor.execute("""
-                INSERT INTO review_history 
-                (card_id, timestamp, result, time_taken, 
-                 confidence_before, confidence_after)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (self.card_id, entry.timestamp, entry.result.value,
-                  entry.time_taken, entry.confidence_before, 
-                  entry.confidence_after))
+    def save(self, repository: 'StatsStore') -> None:
+        """Save card statistics and review history"""
+        repository.save_card_stats(self)
 
     @classmethod
-    def load(cls, card_id: int, db_cursor) -> 'CardStats':
-        """Load card statistics from database"""
-        db_cursor.execute(
-            "SELECT * FROM card_stats WHERE card_id = ?", (card_id,))
-        stats_row = db_cursor.fetchone()
-        
-        if not stats_row:
-            return cls(card_id=card_id)
-            
-        stats = cls(
-            card_id=card_id,
-            total_reviews=stats_row['total_reviews'],
-            correct_reviews=stats_row['correct_reviews'],
-            last_reviewed=datetime.fromisoformat(stats_row['last_reviewed']),
-            average_response_time=stats_row['average_response_time']
-        )
-        
-        # Load review history
-        db_cursor.execute(
-            "SELECT * FROM review_history WHERE card_id = ?", (card_id,))
-        for row in db_cursor.fetchall():
-            entry = ReviewEntry(
-                timestamp=datetime.fromisoformat(row['timestamp']),
-                result=ReviewResult(row['result']),
-                time_taken=row['time_taken'],
-                confidence_before=row['confidence_before'],
-                confidence_after=row['confidence_after']
-            )
-            stats.review_history.append(entry)
-            
-        return stats
\ No newline at end of file
+    def load(cls, card_id: int, repository: 'StatsStore') -> 'CardStats':
+        """Load card statistics and review history"""
+        return repository.load_card_stats(card_id)
\ No newline at end of file
@@ -1,34 +1,111 @@
 from datetime import datetime
-from typing import List, Optional, TYPE_CHECKING
+from typing import Iterable, List, MutableSequence, Optional, TYPE_CHECKING
 from model.flashcard import Flashcard
+from model.card_list import CardList, LazyCardList
+from model.card_index import CardIndex, DuplicateReport
 
 # Type hint only, no runtime import
 if TYPE_CHECKING:
-    from data.data_access import DeckRepository
+    from data.storage import DeckStore
+    from repetition.repetition_logic import RepetitionLogic
 
 
 class Deck:
     def __init__(self, name: str, description: str = ""):
+        self.id: Optional[int] = None
         self.name = name
         self.description = description
-        self.flashcards: List[Flashcard] = []
+        self.flashcards = CardList()
         self.created_at = datetime.now()
         self.last_studied = None
         self.category = "General"
         self.study_sessions = []
+        self._card_index: Optional[CardIndex] = CardIndex()
+
+    @property
+    def flashcards(self) -> MutableSequence:
+        return self._flashcards
+
+    @flashcards.setter
+    def flashcards(self, cards: Iterable[Flashcard]) -> None:
+        # Snapshot-backed lists stay lazy until they are edited
+        if not isinstance(cards, (CardList, LazyCardList)):
+            cards = CardList(cards)
+        self._flashcards = cards
+
+    def _card_list(self) -> CardList:
+        """The cards as an indexed CardList, materializing a lazy snapshot list"""
+        if not isinstance(self._flashcards, CardList):
+            self._flashcards = CardList(self._flashcards)
+        return self._flashcards
+
+    @property
+    def card_index(self) -> CardIndex:
+        """Duplicate index, built on first use for decks opened lazily"""
+        if self._card_index is None:
+            self._card_index = CardIndex()
+            for card in self.flashcards:
+                self._card_index.add(card)
+        return self._card_index
 
     def add_card(self, card: Flashcard) -> None:
         """Add a single card to the deck"""
         self.flashcards.append(card)
+        self.card_index.add(card)
+
+    def add_cards(self, cards: List[Flashcard], skip_duplicates: bool = True) -> DuplicateReport:
+        """Add multiple cards to the deck, skipping cards already present"""
+        report = DuplicateReport()
+        for card in cards:
+            if skip_duplicates:
+                existing, kind = self.card_index.find_duplicate(card)
+                if existing is not None:
+                    target = report.skipped if kind == "exact" else report.near_duplicates
+                    target.append((card, existing))
+                    continue
+            self.add_card(card)
+            report.added.append(card)
+        return report
 
-    def add_cards(self, cards: List[Flashcard]) -> None:
-        """Add multiple cards to the deck"""
-        self.flashcards.extend(cards)
+    def merge(self, other: 'Deck') -> DuplicateReport:
+        """Merge another deck's cards into this one, folding duplicates together"""
+        report = DuplicateReport()
+        for card in other.flashcards:
+            existing, kind = self.card_index.find_duplicate(card)
+            if existing is None:
+                self.add_card(card)
+                report.added.append(card)
+            elif kind == "exact":
+                existing.confidence = max(existing.confidence, card.confidence)
+                existing.familiarity = max(existing.familiarity, card.familiarity)
+                report.merged.append((card, existing))
+            else:
+                report.near_duplicates.append((card, existing))
+        return report
+
+    def enable_near_duplicate_detection(self, threshold: float = 0.8) -> None:
+        """Rebuild the card index with MinHash near-duplicate lookup"""
+        self._card_index = CardIndex(near_duplicates=True, threshold=threshold)
+        for card in self.flashcards:
+            self._card_index.add(card)
+
+    def get_card(self, uid: int) -> Optional[Flashcard]:
+        """Return the card with a uid in O(1), or None"""
+        return self._card_list().get(uid)
 
     def remove_card(self, card: Flashcard) -> None:
-        """Remove a card from the deck"""
-        if card in self.flashcards:
-            self.flashcards.remove(card)
+        """Remove a card from the deck, keeping the order of the others"""
+        cards = self._card_list()
+        if card in cards:
+            cards.pop_id(card.uid)
+            self.card_index.remove(card)
+
+    def remove_card_by_id(self, uid: int) -> Optional[Flashcard]:
+        """Remove and return the card with a uid, or None if it is not in the deck"""
+        card = self.get_card(uid)
+        if card is not None:
+            self.remove_card(card)
+        return card
 
     def get_card_count(self) -> int:
         """Return total number of cards in deck"""
@@ -56,16 +133,51 @@ class Deck:
 
     @classmethod
     def from_file(cls, name: str, file_path: str) -> 'Deck':
-        """Create a deck from a file"""
+        """Create a deck from a file, keeping every line; see import_file for duplicate checks"""
         deck = cls(name)
-        deck.flashcards = Flashcard.import_flashcards(file_path)
+        deck.add_cards(Flashcard.import_flashcards(file_path), skip_duplicates=False)
         return deck
 
+    def import_file(self, file_path: str) -> DuplicateReport:
+        """Import cards from a file into this deck, reporting duplicates"""
+        return self.add_cards(Flashcard.import_flashcards(file_path))
+
     def export_to_file(self, file_path: str) -> None:
         """Export deck to a file"""
         with open(file_path, 'w') as f:
-            for card in self.flashcards:
-                f.write(f"{card.front}|{card.back}|{card.familiarity}\n")
+            f.writelines(f"{card.front}|{card.back}|{card.familiarity}\n" for card in self.flashcards)
+
+    def export_archive(self, file_path: str, repetition_logic: Optional['RepetitionLogic'] = None) -> int:
+        """Stream the deck with its scheduler state to a compressed archive"""
+        from data import deck_archive
+
+        return deck_archive.export_deck(self, file_path, repetition_logic)
+
+    @classmethod
+    def from_archive(cls, file_path: str, repetition_logic: Optional['RepetitionLogic'] = None) -> 'Deck':
+        """Load a deck from a compressed archive"""
+        from data import deck_archive
+
+        return deck_archive.import_deck(file_path, repetition_logic)
+
+    def save_snapshot(self, file_path: str) -> None:
+        """Write the deck to a binary snapshot file"""
+        from data.snapshot import write_snapshot
+
+        write_snapshot(file_path, list(self.flashcards), self.name, self.description)
+
+    @classmethod
+    def open_snapshot(cls, file_path: str) -> 'Deck':
+        """Open a snapshot file via mmap; cards are built as they are accessed"""
+        from data.snapshot import DeckSnapshot, SnapshotCardList, upgrade_snapshot
+
+        snapshot = DeckSnapshot(file_path)
+        if snapshot.uids is None:
+            snapshot = upgrade_snapshot(snapshot)
+        deck = cls(snapshot.name, snapshot.description)
+        deck.flashcards = SnapshotCardList(snapshot)
+        deck._card_index = None
+        return deck
 
     def start_study_session(self, mode: str = "normal", duration: Optional[int] = None) -> None:
         """Start a new study session"""
@@ -76,13 +188,12 @@ class Deck:
         """Get cards with low confidence scores"""
         return [card for card in self.flashcards if card.confidence < 0]
     
-    def save(self, repository: 'DeckRepository') -> None:
+    def save(self, repository: 'DeckStore') -> None:
         """Save deck and all its cards"""
-        deck_id = repository.save_deck(self)
-        for card in self.flashcards:
-            repository.card_repo.save_card(card, deck_id)
+        self.id = repository.save_deck(self)
+        repository.card_repo.import_cards(self.flashcards, self.id)
 
     @classmethod
-    def load(cls, deck_id: int, repository: 'DeckRepository') -> 'Deck':
+    def load(cls, deck_id: int, repository: 'DeckStore') -> 'Deck':
         """Load deck with all its cards"""
         return repository.load_deck(deck_id)
\ No newline at end of file
@@ -1,9 +1,11 @@
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, TYPE_CHECKING
 from model.card_stats import CardStats, ReviewResult
 from model.study_session_stats import StudySession
-from data.database.database import Database
+
+if TYPE_CHECKING:
+    from data.storage import SessionStore, StatsStore
 
 @dataclass
 class DeckStats:
@@ -12,9 +14,6 @@ class DeckStats:
     cards_stats: Dict[int, CardStats] = field(default_factory=dict)
     study_sessions: List[StudySession] = field(default_factory=list)
     last_studied: datetime = None
-
-    def __post_init__(self):
-        self.db = Database()
     
     def add_card_stats(self, card_stats: CardStats) -> None:
         """Add or update statistics for a card"""
@@ -46,9 +45,16 @@ class DeckStats:
             "mastery_level": self._calculate_mastery_level()
         }
 
-    def get_study_trends(self, days: int = 30) -> Dict:
-        """Analyze study trends over time"""
+    def get_study_trends(self, days: int = 30,
+                         repository: Optional['SessionStore'] = None) -> Dict:
+        """Analyze study trends over time
+
+        With a repository, the totals are computed by the repository over the
+        stored sessions instead of the sessions recorded on this object.
+        """
         cutoff = datetime.now() - timedelta(days=days)
+        if repository is not None:
+            return repository.get_trend_summary(self.deck_id, since=cutoff)
         recent_sessions = [s for s in self.study_sessions 
                          if s.stats.start_time >= cutoff]
         
@@ -88,40 +94,11 @@ class DeckStats:
         )
         return total_mastery / self.total_cards
 
-    def save(self, db_cursor) -> None:
-        """Save deck statistics to database"""
-        db_cursor.execute("""
-            INSERT OR REPLACE INTO deck_stats 
-            (deck_id, total_cards, last_studied)
-            VALUES (?, ?, ?)
-        """, (self.deck_id, self.total_cards, self.last_studied))
-        
-        # Save individual card stats
-        for card_stats in self.cards_stats.values():
-            card_stats.save(db_cursor)
+    def save(self, repository: 'StatsStore') -> None:
+        """Save deck statistics and those of its cards"""
+        repository.save_deck_stats(self)
 
     @classmethod
-    def load(cls, deck_id: int, db_cursor) -> 'DeckStats':
-        """Load deck statistics from database"""
-        cursor = db_cursor.execute(
-            "SELECT * FROM deck_stats WHERE deck_id = ?", (deck_id,))
-        row = cursor.fetchone()
-        
-        if not row:
-            return cls(deck_id=deck_id)
-            
-        stats = cls(
-            deck_id=deck_id,
-            total_cards=row['total_cards'],
-            last_studied=datetime.fromisoformat(row['last_studied'])
-            if row['last_studied'] else None
-        )
-        
-        # Load card stats
-        cursor = db_cursor.execute(
-            "SELECT card_id FROM cards WHERE deck_id = ?", (deck_id,))
-        for card_row in cursor.fetchall():
-            card_stats = CardStats.load(card_row['card_id'], db_cursor)
-            stats.cards_stats[card_row['card_id']] = card_stats
-            
-        return stats
\ No newline at end of file
+    def load(cls, deck_id: int, repository: 'StatsStore') -> 'DeckStats':
+        """Load deck statistics with those of its cards"""
+        return repository.load_deck_stats(deck_id)
\ No newline at end of file
@@ -1,19 +1,81 @@
+import os
+import random
+
+from model.card_index import content_hash
+
+# Random 63-bit uids: unique across processes and machines with overwhelming probability
+_uid_source = random.Random(os.urandom(16))
+
+
+def new_uid():
+    return _uid_source.getrandbits(63)
+
+
 class Flashcard:
-    def __init__(self, front, back, familiarity=0):
-        self.front = front
-        self.back = back
+    # No per-instance __dict__: a card is a fixed-size object plus its values
+    __slots__ = ('_uid', 'id', '_front', '_back', '_content_hash', 'confidence', 'familiarity',
+                 'level', 'next_due')
+
+    def __init__(self, front, back, familiarity=0, uid=None):
+        self._uid = uid
+        self.id = None  # Database row id once saved
+        self._front = front
+        self._back = back
+        self._content_hash = None
         self.confidence = 0
         self.familiarity = familiarity  # New attribute for initial familiarity
+        self.level = 0  # Position on the repetition interval ladder
+        self.next_due = None  # datetime of the next scheduled review
+
+    @property
+    def uid(self):
+        """Persistent identity, kept across saves; drawn on first use"""
+        if self._uid is None:
+            self._uid = new_uid()
+        return self._uid
+
+    @uid.setter
+    def uid(self, value):
+        # Set by storage when a card saved into a second deck becomes a card of its own
+        self._uid = value
+
+    @property
+    def front(self):
+        return self._front
+
+    @front.setter
+    def front(self, value):
+        self._front = value
+        self._content_hash = None
+
+    @property
+    def back(self):
+        return self._back
+
+    @back.setter
+    def back(self, value):
+        self._back = value
+        self._content_hash = None
+
+    @property
+    def content_hash(self):
+        """Hash of the normalized front and back, computed once until either changes"""
+        if self._content_hash is None:
+            self._content_hash = content_hash(self._front, self._back)
+        return self._content_hash
+
+    @staticmethod
+    def parse_line(line):
+        """Split a `front|back[|familiarity]` line into its fields"""
+        parts = line.strip().split('|')
+        return parts[0], parts[1], int(parts[2]) if len(parts) > 2 else 0
 
     @staticmethod
     def import_flashcards(file_path):
         flashcards = []
         with open(file_path, 'r') as file:
             for line in file:
-                parts = line.strip().split('|')
-                front = parts[0]
-                back = parts[1]
-                familiarity = int(parts[2]) if len(parts) > 2 else 0
+                front, back, familiarity = Flashcard.parse_line(line)
                 flashcards.append(Flashcard(front, back, familiarity))
         return flashcards
 
@@ -0,0 +1,199 @@
+import argparse
+import gc
+import random
+import sys
+import tracemalloc
+import types
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Dict, Iterable, List, Optional, Set, TYPE_CHECKING
+
+from model.flashcard import Flashcard
+
+if TYPE_CHECKING:
+    from model.card_stats import CardStats
+    from model.deck import Deck
+    from repetition.repetition_logic import RepetitionLogic
+    from ui.image_cache import PhotoImageCache
+
+# Objects shared by the whole process rather than owned by a component
+_SHARED = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType,
+           types.MethodType, Enum)
+
+
+class MemoryBudgetExceeded(Exception):
+    pass
+
+
+def deep_size(roots: Iterable, seen: Set[int]) -> int:
+    """Bytes of every object reachable from roots that is not already in seen
+
+    Sharing one seen set across components charges each object to the
+    first component that reaches it.
+    """
+    total = 0
+    stack = list(roots)
+    while stack:
+        obj = stack.pop()
+        if obj is None or id(obj) in seen or isinstance(obj, _SHARED):
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        stack.extend(gc.get_referents(obj))
+    return total
+
+
+@dataclass
+class MemoryReport:
+    """Live bytes per component, against what tracemalloc sees in total"""
+    card_count: int
+    components: Dict[str, int] = field(default_factory=dict)
+    native: Dict[str, int] = field(default_factory=dict)
+    traced_current: int = 0
+    traced_peak: int = 0
+
+    @property
+    def attributed(self) -> int:
+        return sum(self.components.values())
+
+    @property
+    def bytes_per_card(self) -> float:
+        return self.attributed / self.card_count if self.card_count else 0.0
+
+    def format(self) -> str:
+        lines = [f"{'component':32s} {'bytes':>14s} {'per card':>10s}"]
+        for name, size in sorted(self.components.items(), key=lambda item: -item[1]):
+            per_card = size / self.card_count if self.card_count else 0.0
+            lines.append(f"{name:32s} {size:14,d} {per_card:10.1f}")
+        lines.append(f"{'attributed':32s} {self.attributed:14,d} {self.bytes_per_card:10.1f}")
+        if self.traced_current:
+            lines.append(f"{'traced (tracemalloc)':32s} {self.traced_current:14,d}")
+            lines.append(f"{'traced peak':32s} {self.traced_peak:14,d}")
+        for name, size in self.native.items():
+            lines.append(f"{name + ' (outside Python)':32s} {size:14,d}")
+        return "\n".join(lines)
+
+
+def measure(deck: Optional['Deck'] = None, logic: Optional['RepetitionLogic'] = None,
+            card_stats: Iterable['CardStats'] = (),
+            image_cache: Optional['PhotoImageCache'] = None) -> MemoryReport:
+    """Attribute live bytes to the model-layer structures that grow with a collection"""
+    cards = list(deck.flashcards) if deck is not None else []
+    report = MemoryReport(card_count=len(cards))
+    seen: Set[int] = set()
+
+    report.components["Flashcard objects"] = deep_size(cards, seen)
+    if deck is not None:
+        report.components["Deck.flashcards"] = deep_size([deck.flashcards], seen)
+        report.components["Deck card index"] = deep_size([deck._card_index], seen)
+    card_stats = list(card_stats)
+    if card_stats:
+        report.components["CardStats.review_history"] = deep_size(
+            [stats.review_history for stats in card_stats], seen)
+    if logic is not None:
+        report.components["RepetitionLogic.schedules"] = deep_size([logic.schedules], seen)
+        report.components["RepetitionLogic.pending_reviews"] = deep_size([logic.pending_reviews], seen)
+        report.components["session_history"] = deep_size(
+            [logic.session_history, logic.session_analytics], seen)
+        if logic.memory_models is not None:
+            report.components["RepetitionLogic.memory_models"] = deep_size([logic.memory_models], seen)
+    if image_cache is not None:
+        # Count the cache's own bookkeeping; the PhotoImages lead into Tk
+        entries = image_cache._entries
+        report.components["UI image cache"] = sys.getsizeof(entries) + sum(
+            sys.getsizeof(entry) for entry in entries.values())
+        report.native["UI image pixels"] = image_cache.current_bytes
+
+    if tracemalloc.is_tracing():
+        report.traced_current, report.traced_peak = tracemalloc.get_traced_memory()
+    return report
+
+
+def check_budget(report: MemoryReport, bytes_per_card: float) -> None:
+    """Raise MemoryBudgetExceeded when the per-card cost is over budget"""
+    if report.bytes_per_card > bytes_per_card:
+        raise MemoryBudgetExceeded(
+            f"{report.bytes_per_card:.1f} bytes per card exceeds the budget of {bytes_per_card:.1f}")
+
+
+def snapshot_diff(before: tracemalloc.Snapshot, after: tracemalloc.Snapshot,
+                  limit: int = 10, key_type: str = "lineno") -> List[tracemalloc.StatisticDiff]:
+    """Largest allocation changes between two snapshots, ignoring tracemalloc itself"""
+    ignore = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    after = after.filter_traces(ignore)
+    before = before.filter_traces(ignore)
+    return after.compare_to(before, key_type)[:limit]
+
+
+def profile_session(deck: 'Deck', logic: 'RepetitionLogic', reviews: int, mode=None,
+                    seed: int = 0, limit: int = 10) -> List[tracemalloc.StatisticDiff]:
+    """Run a simulated study session and return what it allocated and kept
+
+    Starts tracemalloc if it is not already running.
+    """
+    from model.study_modes import StudyMode
+
+    mode = mode or StudyMode.NORMAL
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+    rng = random.Random(seed)
+    cards = list(deck.flashcards)
+    gc.collect()
+    before = tracemalloc.take_snapshot()
+    logic.start_session(mode)
+    for _ in range(reviews):
+        logic.update_review(rng.choice(cards), rng.random() < 0.8, mode)
+    logic.end_session()
+    gc.collect()
+    after = tracemalloc.take_snapshot()
+    return snapshot_diff(before, after, limit)
+
+
+def synthetic_deck(cards: int) -> 'Deck':
+    from model.deck import Deck
+
+    deck = Deck("Synthetic")
+    deck.add_cards([Flashcard(f"Question {i}: what is {i} squared?", f"{i * i}", i % 4)
+                    for i in range(cards)])
+    return deck
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report memory use of the model layer")
+    parser.add_argument("--deck", help="text deck to load (default: synthetic cards)")
+    parser.add_argument("--cards", type=int, default=100_000, help="synthetic deck size")
+    parser.add_argument("--reviews", type=int, default=10_000,
+                        help="reviews in the profiled study session")
+    parser.add_argument("--budget", type=float, default=None,
+                        help="fail when attributed bytes per card exceed this")
+    args = parser.parse_args()
+
+    from model.deck import Deck
+    from repetition.repetition_logic import RepetitionLogic
+
+    tracemalloc.start()
+    deck = Deck.from_file("Deck", args.deck) if args.deck else synthetic_deck(args.cards)
+    logic = RepetitionLogic()
+    print(measure(deck, logic).format())
+
+    if args.reviews and deck.flashcards:
+        print(f"\nAllocations kept by a {args.reviews}-review session:")
+        for stat in profile_session(deck, logic, args.reviews):
+            print(f"  {stat}")
+        print()
+        report = measure(deck, logic)
+        print(report.format())
+    else:
+        report = measure(deck, logic)
+
+    if args.budget is not None:
+        try:
+            check_budget(report, args.budget)
+        except MemoryBudgetExceeded as e:
+            print(f"FAIL: {e}")
+            sys.exit(1)
+        print(f"OK: {report.bytes_per_card:.1f} bytes per card within {args.budget:.1f}")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -34,7 +34,42 @@ class StudySession:
         self.stats.total_answers += 1
         if correct:
             self.stats.correct_answers += 1
-        self.reviewed_cards.add(id(card))
+        self.reviewed_cards.add(card.uid)
     
     def end_session(self) -> None:
-        self.stats.end_time = datetime.now()
\ No newline at end of file
+        self.stats.end_time = datetime.now()
+
+class SessionAnalytics:
+    """Running totals over finished sessions, updated as each one ends"""
+
+    def __init__(self):
+        self.session_count = 0
+        self.accuracy_sum = 0.0
+        self.duration_sum = 0.0
+        self.cards_reviewed = 0
+        self.mode_counts: Dict[StudyMode, int] = {mode: 0 for mode in StudyMode}
+
+    @classmethod
+    def from_sessions(cls, sessions: List[StudySession]) -> 'SessionAnalytics':
+        analytics = cls()
+        for session in sessions:
+            analytics.add(session)
+        return analytics
+
+    def add(self, session: StudySession) -> None:
+        self.session_count += 1
+        self.accuracy_sum += session.stats.accuracy
+        self.duration_sum += session.stats.duration_minutes
+        self.cards_reviewed += len(session.reviewed_cards)
+        self.mode_counts[session.mode] = self.mode_counts.get(session.mode, 0) + 1
+
+    def as_patterns(self) -> Dict:
+        """Study patterns in the shape returned by RepetitionLogic.get_study_patterns"""
+        if not self.session_count:
+            return {}
+        return {
+            'average_accuracy': self.accuracy_sum / self.session_count,
+            'average_duration': self.duration_sum / self.session_count,
+            'total_cards_reviewed': self.cards_reviewed,
+            'preferred_mode': max(StudyMode, key=lambda m: self.mode_counts.get(m, 0))
+        }
@@ -0,0 +1,32 @@
+class CardSchedule:
+    """Constant-size scheduling state for a single card
+
+    Holds the card's level on the interval ladder, the outcome of its last
+    five reviews as a bitmask (newest review in the lowest bit) and the epoch
+    second of its last review.
+    """
+    __slots__ = ('level', 'history', 'window', 'last_review')
+
+    WINDOW_SIZE = 5
+    WINDOW_MASK = (1 << WINDOW_SIZE) - 1
+
+    def __init__(self, level: int = 0, history: int = 0, window: int = 0, last_review: int = 0):
+        self.level = level
+        self.history = history  # success ring, 1 bit per review
+        self.window = window  # number of valid bits in the ring (0-5)
+        self.last_review = last_review  # epoch seconds, 0 = never reviewed
+
+    def record(self, correct: bool, timestamp: int) -> None:
+        """Push a review outcome into the success ring"""
+        self.history = ((self.history << 1) | int(correct)) & self.WINDOW_MASK
+        self.window = min(self.window + 1, self.WINDOW_SIZE)
+        self.last_review = timestamp
+
+    @property
+    def success_rate(self) -> float:
+        """Share of correct answers among the last five reviews"""
+        return self.history.bit_count() / self.window if self.window else 0.0
+
+    def __repr__(self) -> str:
+        return (f"CardSchedule(level={self.level}, history={self.history:05b}, "
+                f"window={self.window}, last_review={self.last_review})")
@@ -0,0 +1,148 @@
+import os
+import struct
+import zlib
+from array import array
+from datetime import datetime
+from typing import List, Tuple, TYPE_CHECKING
+
+from data.storage import CardStore
+from model.study_modes import StudyMode
+from model.study_session_stats import StudySession
+from repetition.card_schedule import CardSchedule
+
+if TYPE_CHECKING:
+    from repetition.repetition_logic import RepetitionLogic
+
+# Scheduler checkpoint layout (little endian):
+#
+#   header    magic, version, crc32 of body, card store change marker
+#   body      schedules: count, card uid q[], level i[], history B[], window B[], last_review q[]
+#             sessions:  count, then per session a SESSION record + reviewed card uids q[]
+#
+# The change marker ties the checkpoint to the stored cards: it moves with
+# every write (new reviews, schedule changes, card edits, inserts and
+# deletes), so any of them after the checkpoint makes it stale.
+MAGIC = b"FCSCHED\x00"
+VERSION = 3
+HEADER = struct.Struct("<8sIIq")
+COUNT = struct.Struct("<I")
+SESSION = struct.Struct("<BqddIII")
+MODES = list(StudyMode)
+
+
+def _pack_schedules(items: List[Tuple]) -> bytes:
+    keys = [key for key, _ in items]
+    states = [state for _, state in items]
+    parts = [COUNT.pack(len(items))]
+    parts.append(array("q", keys).tobytes())
+    parts.append(array("i", (s.level for s in states)).tobytes())
+    parts.append(array("B", (s.history for s in states)).tobytes())
+    parts.append(array("B", (s.window for s in states)).tobytes())
+    parts.append(array("q", (s.last_review for s in states)).tobytes())
+    return b"".join(parts)
+
+
+def _unpack_schedules(view: memoryview, position: int, schedules: dict) -> int:
+    (count,) = COUNT.unpack_from(view, position)
+    position += COUNT.size
+
+    def column(fmt: str, size: int):
+        nonlocal position
+        values = array(fmt)
+        values.frombytes(view[position:position + size * count])
+        position += size * count
+        return values
+
+    keys = column("q", 8)
+    levels, history, window, last_review = column("i", 4), column("B", 1), column("B", 1), column("q", 8)
+    schedules.update(zip(keys, map(CardSchedule, levels, history, window, last_review)))
+    return position
+
+
+def _pack_sessions(sessions: List[StudySession]) -> bytes:
+    parts = [COUNT.pack(len(sessions))]
+    for session in sessions:
+        stats = session.stats
+        parts.append(SESSION.pack(
+            MODES.index(session.mode),
+            session.target_duration if session.target_duration is not None else -1,
+            stats.start_time.timestamp(),
+            stats.end_time.timestamp() if stats.end_time else 0.0,
+            stats.correct_answers,
+            stats.total_answers,
+            len(session.reviewed_cards)))
+        parts.append(array("q", session.reviewed_cards).tobytes())
+    return b"".join(parts)
+
+
+def _unpack_sessions(view: memoryview, position: int) -> Tuple[List[StudySession], int]:
+    (count,) = COUNT.unpack_from(view, position)
+    position += COUNT.size
+    sessions = []
+    for _ in range(count):
+        mode, target, start, end, correct, total, reviewed = SESSION.unpack_from(view, position)
+        position += SESSION.size
+        session = StudySession(MODES[mode], target if target >= 0 else None)
+        session.stats.start_time = datetime.fromtimestamp(start)
+        session.stats.end_time = datetime.fromtimestamp(end) if end else None
+        session.stats.correct_answers = correct
+        session.stats.total_answers = total
+        ids = array("q")
+        ids.frombytes(view[position:position + 8 * reviewed])
+        position += 8 * reviewed
+        session.reviewed_cards = set(ids)
+        sessions.append(session)
+    return sessions, position
+
+
+def save_checkpoint(logic: 'RepetitionLogic', path: str, card_repo: CardStore) -> None:
+    """Flush pending reviews to the card store, then atomically write a checkpoint"""
+    logic.persist_review_history(card_repo)
+    body = b"".join((
+        _pack_schedules(list(logic.schedules.items())),
+        _pack_sessions(logic.session_history)
+    ))
+    header = HEADER.pack(MAGIC, VERSION, zlib.crc32(body), card_repo.change_marker())
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        f.write(body)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(logic: 'RepetitionLogic', path: str, card_repo: CardStore) -> bool:
+    """Restore scheduler state from a checkpoint if it matches the card store
+
+    Returns False and leaves the logic untouched when the checkpoint is
+    missing, corrupt, from another version or older than the stored cards.
+    """
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return False
+    if len(data) < HEADER.size:
+        return False
+    magic, version, checksum, marker = HEADER.unpack_from(data, 0)
+    view = memoryview(data)[HEADER.size:]
+    if (magic != MAGIC or version != VERSION or zlib.crc32(view) != checksum
+            or marker != card_repo.change_marker()):
+        return False
+
+    schedules = {}
+    position = _unpack_schedules(view, 0, schedules)
+    sessions, _ = _unpack_sessions(view, position)
+    logic.schedules = schedules
+    logic.set_session_history(sessions)
+    return True
+
+
+def restore_scheduler(logic: 'RepetitionLogic', path: str, card_repo: CardStore) -> bool:
+    """Warm-start from the checkpoint, falling back to replaying the review log"""
+    if load_checkpoint(logic, path, card_repo):
+        return True
+    logic.load_review_history(card_repo)
+    return False
@@ -0,0 +1,166 @@
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, TYPE_CHECKING
+
+from model.deck import Deck
+from model.flashcard import Flashcard
+from model.study_modes import StudyMode
+from model.study_session_stats import SessionAnalytics, StudySession, StudySessionStats
+from repetition.card_schedule import CardSchedule
+from repetition.repetition_logic import RepetitionLogic
+
+if TYPE_CHECKING:
+    from data.storage import CardStore
+
+
+class _Shard:
+    """One slice of a user's scheduler state and the lock that guards it"""
+    __slots__ = ('logic', 'lock')
+
+    def __init__(self):
+        self.logic = RepetitionLogic()
+        self.lock = threading.Lock()
+
+
+class _UserState:
+    """A user's shards plus their own study session"""
+
+    def __init__(self, shard_count: int):
+        self.shards = [_Shard() for _ in range(shard_count)]
+        self.session_lock = threading.Lock()
+        self.current_session: Optional[StudySession] = None
+        self.session_history: List[StudySession] = []
+        self.session_analytics = SessionAnalytics()
+
+
+class ConcurrentRepetitionLogic:
+    """Thread-safe RepetitionLogic for many simultaneous study sessions
+
+    State is partitioned per user, and each user's cards are spread over
+    `shards` independent RepetitionLogic instances by card key (decks are
+    not a partition: a user's decks share their shards). A review only
+    locks the shard owning the card around its schedule update and, if a
+    session is running, that user's session, so reviews of different cards
+    or by different users never contend on a global lock.
+
+    This is isolation, not parallelism: reviews are pure-Python work under
+    the GIL, so more shards do not raise throughput, and the extra shards'
+    bookkeeping can cost a few percent.
+
+    Flashcard objects are mutated under their shard lock; a card object
+    should belong to a single user's session.
+    """
+
+    def __init__(self, shards: int = 16):
+        if shards < 1:
+            raise ValueError("shards must be at least 1")
+        self.shard_count = shards
+        self._users: Dict[str, _UserState] = {}
+        self._users_lock = threading.Lock()
+
+    def _user(self, user: str) -> _UserState:
+        state = self._users.get(user)
+        if state is None:
+            with self._users_lock:
+                state = self._users.get(user)
+                if state is None:
+                    state = self._users[user] = _UserState(self.shard_count)
+        return state
+
+    def _shard(self, user: str, card: Flashcard) -> _Shard:
+        shards = self._user(user).shards
+        return shards[hash(RepetitionLogic.card_key(card)) % len(shards)]
+
+    def update_review(self, user: str, card: Flashcard, correct: bool, mode: StudyMode) -> int:
+        """Record a review for a user and return the next interval in days"""
+        shard = self._shard(user, card)
+        # Only the shard's schedule and review queue need the lock; the card
+        # itself belongs to this user's session
+        with shard.lock:
+            interval = shard.logic.get_next_interval(card, correct, mode)
+            last_review = shard.logic.schedules[RepetitionLogic.card_key(card)].last_review
+        card.confidence += RepetitionLogic.confidence_change(correct, mode)
+        card.next_due = datetime.fromtimestamp(last_review) + timedelta(days=interval)
+
+        state = self._user(user)
+        with state.session_lock:
+            session = state.current_session
+            if session:
+                session.record_review(card, correct)
+                if session.target_duration:
+                    elapsed = (datetime.now() - session.stats.start_time).total_seconds() / 60
+                    if elapsed >= session.target_duration:
+                        self._end_session_locked(state)
+        return interval
+
+    def get_schedule(self, user: str, card: Flashcard) -> Optional[CardSchedule]:
+        shard = self._shard(user, card)
+        with shard.lock:
+            return shard.logic.schedules.get(RepetitionLogic.card_key(card))
+
+    def get_due_cards(self, user: str, deck: Deck, mode: StudyMode,
+                      limit: Optional[int] = None) -> List[Flashcard]:
+        """Cards ordered by priority for a user
+
+        Cards are grouped by shard and each group is scored under its shard's
+        lock, so no priority is computed from a half-applied review. The result
+        is a per-shard consistent snapshot; reviews landing in a shard after it
+        was scored are not reflected.
+        """
+        shards = self._user(user).shards
+        groups: List[List[Flashcard]] = [[] for _ in shards]
+        for card in deck.flashcards:
+            groups[hash(RepetitionLogic.card_key(card)) % len(shards)].append(card)
+
+        priorities = []
+        for shard, cards in zip(shards, groups):
+            if not cards:
+                continue
+            with shard.lock:
+                priorities.extend((card, shard.logic.calculate_card_priority(card, mode))
+                                  for card in cards)
+        priorities.sort(key=lambda x: x[1], reverse=True)
+        cards = [card for card, _ in priorities]
+        return cards[:limit] if limit else cards
+
+    def start_session(self, user: str, mode: StudyMode,
+                      duration_minutes: Optional[int] = None) -> None:
+        state = self._user(user)
+        with state.session_lock:
+            if state.current_session:
+                self._end_session_locked(state)
+            state.current_session = StudySession(mode, duration_minutes)
+
+    def end_session(self, user: str) -> Optional[StudySessionStats]:
+        state = self._user(user)
+        with state.session_lock:
+            return self._end_session_locked(state)
+
+    def _end_session_locked(self, state: _UserState) -> Optional[StudySessionStats]:
+        session = state.current_session
+        if not session:
+            return None
+        session.end_session()
+        state.session_history.append(session)
+        state.session_analytics.add(session)
+        state.current_session = None
+        return session.stats
+
+    def session_history(self, user: str) -> List[StudySession]:
+        state = self._user(user)
+        with state.session_lock:
+            return list(state.session_history)
+
+    def get_study_patterns(self, user: str) -> Dict:
+        state = self._user(user)
+        with state.session_lock:
+            return state.session_analytics.as_patterns()
+
+    def persist_review_history(self, card_repo: 'CardStore') -> None:
+        """Write every shard's pending reviews to the card store's review log"""
+        with self._users_lock:
+            users = list(self._users.values())
+        for state in users:
+            for shard in state.shards:
+                with shard.lock:
+                    shard.logic.persist_review_history(card_repo)
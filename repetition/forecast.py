@@ -0,0 +1,51 @@
+import time
+from typing import Optional, Sequence, Union
+
+import numpy as np
+
+SECONDS_PER_DAY = 86400
+
+ArrayLike = Union[Sequence[float], np.ndarray]
+
+
+def forecast_reviews(next_due: ArrayLike, levels: ArrayLike, days: int,
+                     base_intervals: Sequence[int], multiplier: float,
+                     success_rate: Optional[ArrayLike] = None,
+                     now: Optional[float] = None) -> np.ndarray:
+    """Count reviews coming due on each of the next `days` days
+
+    Works on whole columns at once: every pass histograms the cards still
+    inside the horizon, then advances all of them by one interval as if the
+    review were answered correctly, mirroring RepetitionLogic.get_next_interval.
+    The number of passes is bounded by the interval ladder, not the card count.
+
+    next_due holds epoch seconds (0 or past = due today), levels the ladder
+    position, success_rate the optional per-card share of recent correct
+    answers (defaults to 1.0).
+    """
+    now = time.time() if now is None else now
+    counts = np.zeros(days, dtype=np.int64)
+    if days <= 0:
+        return counts
+
+    ladder = np.asarray(base_intervals, dtype=np.float64) * multiplier
+    top = len(ladder) - 1
+
+    due_day = np.floor((np.asarray(next_due, dtype=np.float64) - now) / SECONDS_PER_DAY)
+    due_day = np.maximum(due_day, 0).astype(np.int64)
+    level = np.clip(np.asarray(levels, dtype=np.int64), 0, top)
+    if success_rate is None:
+        factor = np.full(due_day.shape, 1.5)
+    else:
+        factor = 0.5 + np.asarray(success_rate, dtype=np.float64)
+
+    active = due_day < days
+    due_day, level, factor = due_day[active], level[active], factor[active]
+    while due_day.size:
+        counts += np.bincount(due_day, minlength=days)
+        interval = np.maximum(1, np.rint(ladder[level] * factor)).astype(np.int64)
+        due_day = due_day + interval
+        level = np.minimum(level + 1, top)
+        active = due_day < days
+        due_day, level, factor = due_day[active], level[active], factor[active]
+    return counts
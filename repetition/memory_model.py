@@ -0,0 +1,261 @@
+import argparse
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from data.storage import CardStore
+
+CardKey = int
+
+# Half-life model: a card reviewed `right` times correctly and `wrong` times
+# incorrectly has a half-life of 2 ** (stability + growth * right - LAPSE_WEIGHT * wrong)
+# days, and is recalled after `delta` days with probability 2 ** (-delta / half_life).
+# stability and growth are fitted per card; a low growth marks a difficult card.
+LAPSE_WEIGHT = 1.0
+PRIOR_STABILITY = 0.0  # one-day half-life before any review
+PRIOR_GROWTH = 1.0  # each correct answer doubles the half-life
+# Bounds on log2 half-life: about 90 minutes to 90 years
+MIN_LOG_HALF_LIFE = -4.0
+MAX_LOG_HALF_LIFE = 15.0
+MIN_DELTA_DAYS = 1 / 1440
+LN2 = math.log(2)
+
+
+@dataclass
+class ReviewColumns:
+    """The review log as columns sorted by (card, time)
+
+    card holds dense codes into keys, days the review time in fractional
+    days and correct the outcome.
+    """
+    card: np.ndarray
+    days: np.ndarray
+    correct: np.ndarray
+    keys: List[CardKey]
+
+    def __len__(self) -> int:
+        return len(self.card)
+
+
+def load_review_columns(card_repo: 'CardStore') -> ReviewColumns:
+    """Read a card store's whole review log into sorted columns, keyed by card uid"""
+    uids, seconds, correct = card_repo.load_review_log()
+    keys, codes = np.unique(uids, return_inverse=True)
+    codes = codes.ravel().astype(np.int64)
+    days = seconds / 86400.0
+    order = np.lexsort((days, codes))
+    return ReviewColumns(codes[order], days[order], correct[order], keys.tolist())
+
+
+def review_features(columns: ReviewColumns) -> Tuple[np.ndarray, ...]:
+    """Turn sorted reviews into (card, delta, right, wrong, recalled) observations
+
+    Every review after a card's first is an observation: the days since the
+    previous review, the card's correct and incorrect answers before it and
+    whether it was recalled. Counts come from per-card cumulative sums.
+    """
+    card, days, correct = columns.card, columns.days, columns.correct
+    n = len(card)
+    if n == 0:
+        empty = np.empty(0)
+        return np.empty(0, dtype=np.int64), empty, empty, empty, empty
+    first = np.ones(n, dtype=bool)
+    first[1:] = card[1:] != card[:-1]
+    index = np.arange(n)
+    start = np.maximum.accumulate(np.where(first, index, 0))
+
+    correct_before = np.cumsum(correct) - correct
+    right = (correct_before - correct_before[start]).astype(np.float64)
+    wrong = (index - start) - right
+
+    observed = ~first
+    delta = np.empty(n)
+    delta[1:] = days[1:] - days[:-1]
+    delta = np.maximum(delta[observed], MIN_DELTA_DAYS)
+    return (card[observed], delta, right[observed], wrong[observed],
+            correct[observed].astype(np.float64))
+
+
+def fit_arrays(card: np.ndarray, delta: np.ndarray, right: np.ndarray, wrong: np.ndarray,
+               recalled: np.ndarray, card_count: int, iterations: int = 8,
+               regularization: float = 1.0) -> Tuple[np.ndarray, np.ndarray]:
+    """Fit per-card (stability, growth) to observations by batch Gauss-Newton steps
+
+    Minimizes the squared error between predicted and actual recall plus an
+    L2 pull towards the priors, which also settles cards with few reviews.
+    Each step evaluates every observation at once and reduces per card with
+    bincount, then solves each card's 2x2 system in closed form.
+    """
+    stability = np.full(card_count, PRIOR_STABILITY)
+    growth = np.full(card_count, PRIOR_GROWTH)
+    if len(card) == 0:
+        return stability, growth
+    lapse = LAPSE_WEIGHT * wrong
+    right_sq = right * right
+
+    for _ in range(iterations):
+        log_half_life = stability[card] + growth[card] * right - lapse
+        np.clip(log_half_life, MIN_LOG_HALF_LIFE, MAX_LOG_HALF_LIFE, out=log_half_life)
+        scaled = delta * np.exp2(-log_half_life)
+        predicted = np.exp2(-scaled)
+        # d(predicted)/d(log_half_life)
+        slope = predicted * scaled * LN2
+        error = predicted - recalled
+        slope_sq = slope * slope
+        slope_err = slope * error
+
+        h_ss = np.bincount(card, slope_sq, card_count) + regularization
+        h_sg = np.bincount(card, slope_sq * right, card_count)
+        h_gg = np.bincount(card, slope_sq * right_sq, card_count) + regularization
+        g_s = np.bincount(card, slope_err, card_count) + regularization * (stability - PRIOR_STABILITY)
+        g_g = np.bincount(card, slope_err * right, card_count) + regularization * (growth - PRIOR_GROWTH)
+
+        determinant = h_ss * h_gg - h_sg * h_sg
+        stability -= (h_gg * g_s - h_sg * g_g) / determinant
+        growth -= (h_ss * g_g - h_sg * g_s) / determinant
+        np.clip(stability, MIN_LOG_HALF_LIFE, MAX_LOG_HALF_LIFE, out=stability)
+        np.clip(growth, 0.0, 4.0, out=growth)
+    return stability, growth
+
+
+def _fit_slice(args) -> Tuple[np.ndarray, np.ndarray]:
+    card, delta, right, wrong, recalled, first_card, card_count, iterations = args
+    return fit_arrays(card - first_card, delta, right, wrong, recalled, card_count, iterations)
+
+
+class MemoryModels:
+    """Fitted per-card half-life parameters plus each card's running answer counts"""
+
+    def __init__(self, keys: List[CardKey], stability: np.ndarray, growth: np.ndarray,
+                 right: np.ndarray, wrong: np.ndarray):
+        self.index: Dict[CardKey, int] = {key: i for i, key in enumerate(keys)}
+        self.stability = stability
+        self.growth = growth
+        self.right = right
+        self.wrong = wrong
+
+    def __contains__(self, key: CardKey) -> bool:
+        return key in self.index
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def observe(self, key: CardKey, correct: bool) -> None:
+        """Count a review made after fitting"""
+        i = self.index.get(key)
+        if i is None:
+            return
+        if correct:
+            self.right[i] += 1
+        else:
+            self.wrong[i] += 1
+
+    def half_life(self, key: CardKey) -> float:
+        """Current half-life of a card in days"""
+        i = self.index[key]
+        log_half_life = self.stability[i] + self.growth[i] * self.right[i] - LAPSE_WEIGHT * self.wrong[i]
+        return 2.0 ** min(max(log_half_life, MIN_LOG_HALF_LIFE), MAX_LOG_HALF_LIFE)
+
+    def interval(self, key: CardKey, retention: float = 0.9) -> float:
+        """Days until predicted recall falls to `retention`"""
+        return -math.log2(retention) * self.half_life(key)
+
+
+def fit_memory_models(columns: ReviewColumns, iterations: int = 8,
+                      workers: int = 1) -> MemoryModels:
+    """Fit every card in the review log
+
+    Cards are fitted independently, so with workers > 1 the card range is
+    split into contiguous slices (rows are sorted by card) fitted in
+    separate processes.
+    """
+    card_count = len(columns.keys)
+    card, delta, right, wrong, recalled = review_features(columns)
+
+    if workers <= 1 or card_count < workers:
+        stability, growth = fit_arrays(card, delta, right, wrong, recalled, card_count, iterations)
+    else:
+        bounds = np.linspace(0, card_count, workers + 1).astype(np.int64)
+        rows = np.searchsorted(card, bounds)
+        tasks = [
+            (card[a:b], delta[a:b], right[a:b], wrong[a:b], recalled[a:b],
+             lo, hi - lo, iterations)
+            for lo, hi, a, b in zip(bounds[:-1], bounds[1:], rows[:-1], rows[1:])
+        ]
+        with ProcessPoolExecutor(workers) as pool:
+            parts = list(pool.map(_fit_slice, tasks))
+        stability = np.concatenate([s for s, _ in parts])
+        growth = np.concatenate([g for _, g in parts])
+
+    total_right = np.bincount(columns.card, columns.correct, card_count)
+    total = np.bincount(columns.card, minlength=card_count).astype(np.float64)
+    return MemoryModels(columns.keys, stability, growth, total_right, total - total_right)
+
+
+def synthetic_reviews(reviews: int, cards: int, seed: int = 0) -> ReviewColumns:
+    """Review log simulated from known per-card parameters, for benchmarking"""
+    rng = np.random.default_rng(seed)
+    card = np.sort(rng.integers(0, cards, reviews))
+    stability = rng.normal(PRIOR_STABILITY, 1.0, cards)
+    growth = np.clip(rng.normal(PRIOR_GROWTH, 0.4, cards), 0.1, None)
+    gaps = rng.exponential(5.0, reviews)
+    days = np.empty(reviews)
+    correct = np.empty(reviews, dtype=bool)
+    # Outcomes depend on the running counts, so simulate in review order per position
+    first = np.ones(reviews, dtype=bool)
+    first[1:] = card[1:] != card[:-1]
+    starts = np.flatnonzero(first)
+    position = np.arange(reviews) - np.repeat(starts, np.diff(np.append(starts, reviews)))
+    right = np.zeros(cards)
+    wrong = np.zeros(cards)
+    last = np.zeros(cards)
+    for step in range(int(position.max()) + 1 if reviews else 0):
+        rows = np.flatnonzero(position == step)
+        ids = card[rows]
+        days[rows] = last[ids] + gaps[rows]
+        half_life = np.exp2(np.clip(stability[ids] + growth[ids] * right[ids] - LAPSE_WEIGHT * wrong[ids],
+                                    MIN_LOG_HALF_LIFE, MAX_LOG_HALF_LIFE))
+        recall = np.where(step == 0, 1.0, np.exp2(-gaps[rows] / half_life))
+        outcome = rng.random(len(rows)) < recall
+        correct[rows] = outcome
+        right[ids] += outcome
+        wrong[ids] += ~outcome
+        last[ids] = days[rows]
+    return ReviewColumns(card.astype(np.int64), days, correct, list(range(cards)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fit per-card memory models from the review log")
+    parser.add_argument("--db", help="database to read review_history from")
+    parser.add_argument("--synthetic", type=int, default=1_000_000,
+                        help="number of simulated reviews when no database is given")
+    parser.add_argument("--cards", type=int, default=100_000)
+    parser.add_argument("--iterations", type=int, default=8)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1])
+    args = parser.parse_args()
+
+    if args.db:
+        from data.data_access import CardRepository
+        from data.database.database import Database
+        started = time.perf_counter()
+        columns = load_review_columns(CardRepository(Database(args.db)))
+        print(f"loaded {len(columns)} reviews of {len(columns.keys)} cards "
+              f"in {time.perf_counter() - started:.2f}s")
+    else:
+        columns = synthetic_reviews(args.synthetic, args.cards)
+
+    for workers in args.workers:
+        started = time.perf_counter()
+        models = fit_memory_models(columns, args.iterations, workers)
+        elapsed = time.perf_counter() - started
+        print(f"workers={workers:2d}  fitted {len(models)} cards from {len(columns)} reviews "
+              f"in {elapsed:.2f}s  median half-life growth {np.median(models.growth):.2f}")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -1,14 +1,27 @@
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from typing import Iterable, List, Dict, Optional, Tuple, TYPE_CHECKING
 from enum import Enum
+import heapq
 import math
+import time
 
-from model.study_session_stats import StudySession, StudySessionStats
+import numpy as np
+
+from model.study_session_stats import SessionAnalytics, StudySession, StudySessionStats
 from model.flashcard import Flashcard
 from typing import List, Optional, Dict
 from enum import Enum
 from model.deck import Deck
 from model.study_modes import StudyMode
+from repetition.card_schedule import CardSchedule
+from repetition.forecast import forecast_reviews
+from repetition.memory_model import MemoryModels, fit_memory_models, load_review_columns
+
+if TYPE_CHECKING:
+    from data.storage import CardStore
+
+CardKey = int
+SECONDS_PER_DAY = 86400
 
 class RepetitionLogic:
     def __init__(self):
@@ -16,6 +29,7 @@ class RepetitionLogic:
         self.base_intervals = [1, 3, 7, 14, 30, 60, 120]
         self.current_session: Optional[StudySession] = None
         self.session_history: List[StudySession] = []
+        self.session_analytics = SessionAnalytics()
 
         
         # Mode-specific multipliers
@@ -25,22 +39,49 @@ class RepetitionLogic:
             StudyMode.EXAM_PREP: 0.5   # Medium intervals but more repetitions
         }
         
-        # Track review history
-        self.review_history: Dict[int, List[tuple]] = {}  # card_id: [(timestamp, correct)]
-        self.last_review: Dict[int, datetime] = {}
-        
+        # Per-card scheduler state, keyed by card uid
+        self.schedules: Dict[CardKey, CardSchedule] = {}
+        # Reviews of saved cards not yet written to the review log:
+        # (card, timestamp, correct). Unsaved cards have no row to log against,
+        # so their reviews only live on in schedules.
+        self.pending_reviews: List[Tuple['Flashcard', datetime, bool]] = []
+        # Per-card half-life models fitted from the review log; cards without
+        # one fall back to the interval ladder
+        self.memory_models: Optional[MemoryModels] = None
+        self.target_retention = 0.9
+
+    @staticmethod
+    def card_key(card: 'Flashcard') -> CardKey:
+        """Stable key for a card: its uid, which stays the same when the card is saved"""
+        return card.uid
+
+    def get_schedule(self, card: 'Flashcard') -> CardSchedule:
+        """Return the scheduler state for a card, seeding it from the card's level"""
+        key = self.card_key(card)
+        state = self.schedules.get(key)
+        if state is None:
+            state = CardSchedule(level=card.level)
+            self.schedules[key] = state
+        return state
+
+    def _advance(self, state: CardSchedule, correct: bool, timestamp: int) -> int:
+        """Record a review on the state and return the ladder index to use"""
+        state.record(correct, timestamp)
+        top = len(self.base_intervals) - 1
+        level_index = min(state.level if correct else max(0, state.level - 1), top)
+        state.level = min(level_index + 1, top) if correct else level_index
+        return level_index
+
     def calculate_card_priority(self, card: 'Flashcard', mode: StudyMode) -> float:
         """Calculate priority score for card selection"""
-        now = datetime.now()
-        card_id = id(card)
-        last_review = self.last_review.get(card_id)
+        state = self.schedules.get(self.card_key(card))
         
         # Base priority factors
         time_factor = 1.0
         confidence_factor = math.exp(-0.5 * card.confidence)  # Lower confidence = higher priority
         
-        if last_review:
-            days_since_review = (now - last_review).days
+        if state and state.last_review:
+            days_since_review = (int(time.time()) - state.last_review) // SECONDS_PER_DAY
             time_factor = math.log(days_since_review + 1)
         
         # Mode-specific adjustments
@@ -57,31 +98,28 @@ class RepetitionLogic:
 
     def get_next_interval(self, card: 'Flashcard', correct: bool, mode: StudyMode) -> int:
         """Calculate next review interval based on performance and mode"""
-        card_id = id(card)
-        
-        # Initialize or update review history
-        if card_id not in self.review_history:
-            self.review_history[card_id] = []
-        self.review_history[card_id].append((datetime.now(), correct))
-        
-        # Calculate success rate
-        recent_reviews = self.review_history[card_id][-5:]  # Last 5 reviews
-        success_rate = sum(1 for _, correct in recent_reviews if correct) / len(recent_reviews)
+        now = datetime.now()
+        state = self.get_schedule(card)
+        level_index = self._advance(state, correct, int(now.timestamp()))
+        if card.id is not None:
+            self.pending_reviews.append((card, now, correct))
+        card.level = state.level
+
+        key = self.card_key(card)
+        if self.memory_models is not None and key in self.memory_models:
+            # The fitted model already reflects the card's record
+            self.memory_models.observe(key, correct)
+            interval = self.memory_models.interval(key, self.target_retention)
+            return max(1, round(interval * self.mode_multipliers[mode]))
         
-        # Get current level and adjust
-        current_level = len(self.review_history[card_id]) - 1
-        if not correct:
-            current_level = max(0, current_level - 1)
-            
         # Get base interval
-        level_index = min(current_level, len(self.base_intervals) - 1)
         base_interval = self.base_intervals[level_index]
         
         # Apply mode multiplier
         interval = base_interval * self.mode_multipliers[mode]
         
         # Adjust for success rate
-        interval *= (0.5 + success_rate)
+        interval *= (0.5 + state.success_rate)
         
         return max(1, round(interval))
 
@@ -104,6 +142,48 @@ class RepetitionLogic:
             return sorted_cards[:limit]
         return sorted_cards
 
+    def get_review_batch(self, deck: 'Deck', mode: StudyMode, size: int) -> List['Flashcard']:
+        """Highest-priority cards, best first, without sorting the whole deck"""
+        return heapq.nlargest(size, deck.flashcards,
+                              key=lambda card: self.calculate_card_priority(card, mode))
+
+    def get_due_cards_from_repository(self, card_repo: 'CardStore', limit: int,
+                                      deck_id: Optional[int] = None) -> List['Flashcard']:
+        """Get due cards straight from the database without loading whole decks"""
+        return card_repo.get_due_cards(limit, deck_id)
+
+    def get_review_batch_from_repository(self, card_repo: 'CardStore', mode: StudyMode, size: int,
+                                         deck_id: Optional[int] = None,
+                                         candidates: int = 0) -> List['Flashcard']:
+        """Highest-priority cards, best first, among the most overdue stored ones
+
+        Only max(size, candidates) of the most overdue cards are read, so the
+        cost does not grow with the deck.
+        """
+        cards = card_repo.get_due_cards(max(size, candidates), deck_id)
+        return heapq.nlargest(size, cards, key=lambda card: self.calculate_card_priority(card, mode))
+
+    def forecast_workload(self, deck: 'Deck', days: int = 30,
+                          mode: StudyMode = StudyMode.NORMAL) -> List[int]:
+        """Forecast how many reviews come due on each of the next `days` days"""
+        cards = deck.flashcards
+        next_due = [card.next_due.timestamp() if card.next_due else 0 for card in cards]
+        levels = [card.level for card in cards]
+        success_rate = [
+            state.success_rate if state and state.window else 1.0
+            for state in (self.schedules.get(self.card_key(card)) for card in cards)
+        ]
+        return forecast_reviews(next_due, levels, days, self.base_intervals,
+                                self.mode_multipliers[mode], success_rate).tolist()
+
+    def forecast_workload_from_repository(self, card_repo: 'CardStore', days: int = 30,
+                                          mode: StudyMode = StudyMode.NORMAL,
+                                          deck_id: Optional[int] = None) -> List[int]:
+        """Forecast daily review counts for one deck or all decks in the database"""
+        next_due, levels = card_repo.load_schedule_columns(deck_id)
+        return forecast_reviews(next_due, levels, days, self.base_intervals,
+                                self.mode_multipliers[mode]).tolist()
+
     def update_review(self, card: 'Flashcard', correct: bool, mode: StudyMode) -> int:
         """Update card review status and handle session tracking"""
         # Session tracking logic
@@ -117,16 +197,22 @@ class RepetitionLogic:
                     self.end_session()
 
         # Core review update logic
-        card_id = id(card)
-        self.last_review[card_id] = datetime.now()
-        
-        # Update confidence
-        confidence_change = 1 if correct else -1
+        card.confidence += self.confidence_change(correct, mode)
+        interval = self.get_next_interval(card, correct, mode)
+        card.next_due = datetime.fromtimestamp(self.get_schedule(card).last_review) + timedelta(days=interval)
+        return interval
+
+    @staticmethod
+    def confidence_change(correct: bool, mode: StudyMode) -> float:
+        """How much an answer moves a card's confidence"""
+        change = 1 if correct else -1
         if mode == StudyMode.EXAM_PREP:
-            confidence_change *= 1.5
-        card.confidence += confidence_change
-        
-        return self.get_next_interval(card, correct, mode)
+            change *= 1.5
+        return change
+    
+    def record_reviews(self, answers: Iterable[Tuple['Flashcard', bool]], mode: StudyMode) -> List[int]:
+        """Apply a batch of (card, correct) answers in the order given"""
+        return [self.update_review(card, correct, mode) for card, correct in answers]
     
     def start_session(self, mode: StudyMode, duration_minutes: Optional[int] = None) -> None:
         """Start a new study session"""
@@ -139,6 +225,7 @@ class RepetitionLogic:
         if self.current_session:
             self.current_session.end_session()
             self.session_history.append(self.current_session)
+            self.session_analytics.add(self.current_session)
             stats = self.current_session.stats
             self.current_session = None
             return stats
@@ -146,36 +233,41 @@ class RepetitionLogic:
 
     def get_study_patterns(self) -> Dict:
         """Analyze study patterns from session history"""
-        if not self.session_history:
-            return {}
-            
-        return {
-            'average_accuracy': sum(s.stats.accuracy for s in self.session_history) / len(self.session_history),
-            'average_duration': sum(s.stats.duration_minutes for s in self.session_history) / len(self.session_history),
-            'total_cards_reviewed': sum(len(s.reviewed_cards) for s in self.session_history),
-            'preferred_mode': max(
-                StudyMode,
-                key=lambda m: sum(1 for s in self.session_history if s.mode == m)
-            )
-        }
+        return self.session_analytics.as_patterns()
+
+    def set_session_history(self, sessions: List[StudySession]) -> None:
+        """Replace the session history and rebuild its running analytics"""
+        self.session_history = sessions
+        self.session_analytics = SessionAnalytics.from_sessions(sessions)
     
-    def persist_review_history(self, db_cursor) -> None:
-        """Save review history to database"""
-        for card_id, reviews in self.review_history.items():
-            for timestamp, correct in reviews:
-                db_cursor.execute("""
-                    INSERT INTO review_history 
-                    (card_id, timestamp, correct)
-                    VALUES (?, ?, ?)
-                """, (card_id, timestamp, correct))
+    def persist_review_history(self, card_repo: 'CardStore') -> None:
+        """Save reviews recorded since the last call to the card store's review log
+
+        Every pending review is dropped afterwards; one whose card has lost
+        its id since has nowhere to go, and its schedule already counts it.
+        """
+        saved = [(card.id, timestamp, correct)
+                 for card, timestamp, correct in self.pending_reviews if card.id is not None]
+        if saved:
+            card_repo.add_reviews(saved)
+        self.pending_reviews = []
     
-    def load_review_history(self, db_cursor) -> None:
-        """Load review history from database"""
-        cursor = db_cursor.execute("SELECT * FROM review_history ORDER BY timestamp")
-        for row in cursor:
-            card_id = row['card_id']
-            if card_id not in self.review_history:
-                self.review_history[card_id] = []
-            self.review_history[card_id].append(
-                (datetime.fromisoformat(row['timestamp']), row['correct'])
-            )
\ No newline at end of file
+    def fit_memory_models(self, card_repo: 'CardStore', workers: int = 1) -> MemoryModels:
+        """Fit per-card memory models to the stored review log and use them for intervals"""
+        self.memory_models = fit_memory_models(load_review_columns(card_repo), workers=workers)
+        return self.memory_models
+
+    def load_review_history(self, card_repo: 'CardStore') -> None:
+        """Rebuild scheduler state by replaying the review log"""
+        uids, seconds, correct = card_repo.load_review_log()
+        order = np.argsort(seconds, kind='stable')
+        for key, timestamp, outcome in zip(uids[order].tolist(), seconds[order].astype(np.int64).tolist(),
+                                           correct[order].tolist()):
+            self.replay_review(key, outcome, timestamp)
+
+    def replay_review(self, key: CardKey, correct: bool, timestamp: int) -> None:
+        """Apply a past review, made at epoch second `timestamp`, to a card's schedule"""
+        state = self.schedules.get(key)
+        if state is None:
+            state = self.schedules[key] = CardSchedule()
+        self._advance(state, correct, timestamp)
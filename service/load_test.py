@@ -0,0 +1,115 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+
+class _Connection:
+    """Keep-alive HTTP/1.1 connection speaking just enough to talk to ReviewServer"""
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+
+    async def open(self) -> None:
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    async def request(self, method: str, path: str, payload: Optional[Dict] = None) -> Tuple[int, Dict]:
+        body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+        self.writer.write(
+            f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n".encode("latin-1")
+            + body)
+        await self.writer.drain()
+        status = int((await self.reader.readline()).split()[1])
+        length = 0
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            if name.lower() == "content-length":
+                length = int(value)
+        return status, json.loads(await self.reader.readexactly(length))
+
+    def close(self) -> None:
+        if self.writer:
+            self.writer.close()
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+async def _worker(conn: _Connection, deadline: float, deck_id: Optional[int], user: str,
+                  latencies: List[float], errors: List[int]) -> None:
+    query = f"?deck_id={deck_id}" if deck_id is not None else ""
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        status, data = await conn.request("GET", f"/next{query}")
+        latencies.append(time.perf_counter() - start)
+        if status != 200:
+            errors.append(status)
+            continue
+        for card in data["cards"]:
+            start = time.perf_counter()
+            status, _ = await conn.request("POST", "/answer", {
+                "card_id": card["id"], "correct": random.random() < 0.8, "user": user})
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors.append(status)
+
+
+async def run_load_test(url: str, concurrency: int = 16, duration: float = 10.0,
+                        deck_id: Optional[int] = None) -> Dict:
+    """Drive next/answer cycles against a server and report throughput and latency"""
+    parts = urlsplit(url)
+    connections = [_Connection(parts.hostname, parts.port or 80) for _ in range(concurrency)]
+    await asyncio.gather(*(conn.open() for conn in connections))
+    latencies: List[float] = []
+    errors: List[int] = []
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(
+            _worker(conn, started + duration, deck_id, f"user{i}", latencies, errors)
+            for i, conn in enumerate(connections)))
+    finally:
+        for conn in connections:
+            conn.close()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "requests_per_sec": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test a running review server")
+    parser.add_argument("--url", default="http://127.0.0.1:8765")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds")
+    parser.add_argument("--deck-id", type=int, default=None)
+    args = parser.parse_args()
+
+    report = asyncio.run(run_load_test(args.url, args.concurrency, args.duration, args.deck_id))
+    print(f"Requests:     {report['requests']} ({report['errors']} errors)")
+    print(f"Throughput:   {report['requests_per_sec']:.1f} req/s")
+    print(f"Latency p50:  {report['p50_ms']:.2f} ms")
+    print(f"Latency p99:  {report['p99_ms']:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+import argparse
+import html
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import List, Optional, Sequence
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from data.data_access import SQLiteBackend
+from data.database.database import Database
+from data.paths import default_db_path
+from data.storage import CardStore, DeckStore, StorageBackend
+from model.card_stats import CardStats
+from model.deck_stats import DeckStats
+from repetition.repetition_logic import RepetitionLogic
+
+# Deck ids read per keyset page when reporting on every deck
+DECK_PAGE = 1000
+
+PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{title}</title>
+<style>body {{ font-family: sans-serif; margin: 2em; }} td, th {{ padding: 2px 12px; text-align: left; }}</style>
+</head><body>
+<h1>{title}</h1>
+<p>Generated {generated}</p>
+{body}
+</body></html>"""
+
+
+@dataclass
+class DeckReport:
+    deck_id: int
+    name: str
+    html_path: str
+    png_path: str
+    total_cards: int
+    sessions: int
+    average_accuracy: float
+
+
+@dataclass
+class ReportRun:
+    """Outcome of a report run"""
+    reports: List[DeckReport] = field(default_factory=list)
+    index_path: Optional[str] = None
+    elapsed: float = 0.0
+
+    @property
+    def reports_per_sec(self) -> float:
+        return len(self.reports) / self.elapsed if self.elapsed else 0.0
+
+
+def load_deck_stats(card_repo: CardStore, deck_id: int) -> DeckStats:
+    """DeckStats for a stored deck, with per-card totals taken from the review log"""
+    stats = DeckStats(deck_id)
+    for row in card_repo.load_review_totals(deck_id):
+        stats.add_card_stats(CardStats(
+            row['card_id'],
+            total_reviews=row['total_reviews'],
+            correct_reviews=row['correct_reviews'] or 0,
+            last_reviewed=datetime.fromisoformat(row['last_reviewed']) if row['last_reviewed'] else None))
+    stats.total_cards = card_repo.count_cards(deck_id)
+    return stats
+
+
+def all_deck_ids(decks: DeckStore) -> List[int]:
+    """Ids of every stored deck in ascending order, read page by page"""
+    deck_ids: List[int] = []
+    while True:
+        page = decks.list_decks_after(deck_ids[-1] if deck_ids else None, DECK_PAGE)
+        if not page:
+            return deck_ids
+        deck_ids.extend(row['id'] for row in page)
+
+
+def _table(rows: Sequence[Sequence], header: Optional[Sequence[str]] = None) -> str:
+    lines = ["<table>"]
+    if header:
+        lines.append("<tr>" + "".join(f"<th>{html.escape(h)}</th>" for h in header) + "</tr>")
+    for row in rows:
+        lines.append("<tr>" + "".join(f"<td>{cell}</td>" for cell in row) + "</tr>")
+    lines.append("</table>")
+    return "\n".join(lines)
+
+
+class ReportWriter:
+    """Renders deck reports from one storage backend, without a display
+
+    Charts are drawn on bare Figures with the Agg canvas, so nothing touches
+    pyplot's global state or Tk and one writer can live in each worker process.
+    """
+
+    def __init__(self, storage: StorageBackend, out_dir: str, days: int = 30):
+        self.storage = storage
+        self.deck_repo = storage.decks
+        self.card_repo = storage.cards
+        self.session_repo = storage.sessions
+        self.logic = RepetitionLogic()
+        self.out_dir = out_dir
+        self.days = days
+
+    def render(self, deck_id: int) -> Optional[DeckReport]:
+        """Write deck_<id>.png and deck_<id>.html; None if the deck does not exist"""
+        deck = self.deck_repo.get_deck_info(deck_id)
+        if deck is None:
+            return None
+        since = datetime.now() - timedelta(days=self.days)
+        stats = load_deck_stats(self.card_repo, deck_id)
+        overall = stats.get_overall_stats()
+        trends = stats.get_study_trends(self.days, repository=self.session_repo)
+        daily = self.session_repo.aggregate_sessions('day', deck_id=deck_id, since=since)
+        forecast = self.logic.forecast_workload_from_repository(
+            self.card_repo, self.days, deck_id=deck_id)
+
+        png_name = f"deck_{deck_id}.png"
+        html_name = f"deck_{deck_id}.html"
+        self._write_chart(os.path.join(self.out_dir, png_name), deck['name'], daily, forecast)
+
+        summary = _table([
+            ("Category", html.escape(deck['category'] or "")),
+            ("Last studied", html.escape(str(deck['last_studied'] or "never"))),
+            ("Cards", stats.total_cards),
+            ("Average card accuracy", f"{overall['average_accuracy']:.1%}"),
+            ("Mastery", f"{overall['mastery_level']:.1%}"),
+            ("Weak cards", len(stats.get_weak_cards())),
+            (f"Sessions (last {self.days} days)", trends['sessions_count']),
+            ("Study time (minutes)", f"{trends['total_study_time']:.0f}"),
+            ("Session accuracy", f"{trends['average_accuracy']:.1%}"),
+            ("Cards per session", f"{trends['cards_per_session']:.1f}"),
+            (f"Reviews due (next {self.days} days)", sum(forecast)),
+        ])
+        body = f'{summary}\n<p><img src="{png_name}" alt="progress charts"></p>'
+        with open(os.path.join(self.out_dir, html_name), "w", encoding="utf-8") as f:
+            f.write(PAGE.format(title=html.escape(deck['name']),
+                                generated=datetime.now().strftime("%Y-%m-%d %H:%M"), body=body))
+
+        return DeckReport(deck_id, deck['name'], html_name, png_name, stats.total_cards,
+                          trends['sessions_count'], trends['average_accuracy'])
+
+    def _write_chart(self, path: str, title: str, daily, forecast: List[int]) -> None:
+        fig = Figure(figsize=(8, 7))
+        FigureCanvasAgg(fig)
+        accuracy_ax, answers_ax, forecast_ax = fig.subplots(3, 1)
+        fig.suptitle(title)
+
+        dates = [datetime.fromisoformat(row['bucket']) for row in daily]
+        accuracy_ax.plot(dates, [row['accuracy'] or 0.0 for row in daily], marker='o')
+        accuracy_ax.set_ylabel('Accuracy')
+        accuracy_ax.set_ylim(0, 1)
+        accuracy_ax.set_title('Learning Progress')
+
+        answers_ax.bar(dates, [row['total_answers'] or 0 for row in daily])
+        answers_ax.set_ylabel('Answers')
+        for ax in (accuracy_ax, answers_ax):
+            ax.tick_params(axis='x', labelrotation=45)
+
+        forecast_ax.bar(range(len(forecast)), forecast)
+        forecast_ax.set_ylabel('Due')
+        forecast_ax.set_xlabel('Days from today')
+
+        # Fixed margins: tight_layout would lay the figure out a second time
+        fig.subplots_adjust(left=0.1, right=0.97, top=0.9, bottom=0.08, hspace=0.6)
+        fig.savefig(path, dpi=80)
+
+
+# The writer of a worker process, set up by _init_worker
+_writer: Optional[ReportWriter] = None
+
+
+def _init_worker(db_path: str, out_dir: str, days: int) -> None:
+    global _writer
+    _writer = ReportWriter(SQLiteBackend(Database(db_path, read_only=True)), out_dir, days)
+
+
+def _render(deck_id: int) -> Optional[DeckReport]:
+    return _writer.render(deck_id)
+
+
+def _write_index(out_dir: str, reports: List[DeckReport]) -> str:
+    rows = [(f'<a href="{report.html_path}">{html.escape(report.name)}</a>', report.total_cards,
+             report.sessions, f"{report.average_accuracy:.1%}") for report in reports]
+    path = os.path.join(out_dir, "index.html")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(PAGE.format(title="Deck Reports", generated=datetime.now().strftime("%Y-%m-%d %H:%M"),
+                            body=_table(rows, ("Deck", "Cards", "Sessions", "Session accuracy"))))
+    return path
+
+
+def generate_reports(db_path: str, out_dir: str, deck_ids: Optional[List[int]] = None,
+                     days: int = 30, workers: Optional[int] = None) -> ReportRun:
+    """Render a report per deck (all decks by default) plus an index page
+
+    The schema is brought up to date once here; the workers only read,
+    each through its own read-only connection.
+    """
+    workers = workers or os.cpu_count() or 1
+    started = time.perf_counter()
+    storage = SQLiteBackend(Database(db_path))
+    try:
+        if deck_ids is None:
+            deck_ids = all_deck_ids(storage.decks)
+    finally:
+        storage.close()
+    os.makedirs(out_dir, exist_ok=True)
+
+    if workers <= 1:
+        writer = ReportWriter(SQLiteBackend(Database(db_path, read_only=True)), out_dir, days)
+        try:
+            results = [writer.render(deck_id) for deck_id in deck_ids]
+        finally:
+            writer.storage.close()
+    else:
+        with ProcessPoolExecutor(workers, initializer=_init_worker,
+                                 initargs=(db_path, out_dir, days)) as pool:
+            chunksize = max(1, len(deck_ids) // (workers * 4))
+            results = list(pool.map(_render, deck_ids, chunksize=chunksize))
+
+    run = ReportRun([report for report in results if report is not None])
+    run.index_path = _write_index(out_dir, run.reports)
+    run.elapsed = time.perf_counter() - started
+    return run
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render per-deck progress reports without a display")
+    parser.add_argument("--db", default=None, help="database file (default: the app's own)")
+    parser.add_argument("--out", default="reports", help="output directory")
+    parser.add_argument("--deck", type=int, action="append", dest="decks",
+                        help="deck id to report on (repeatable; default: all decks)")
+    parser.add_argument("--days", type=int, default=30, help="trend and forecast window")
+    parser.add_argument("--workers", type=int, default=None, help="render processes (default: all cores)")
+    args = parser.parse_args()
+
+    run = generate_reports(args.db or default_db_path(), args.out, args.decks, args.days, args.workers)
+    print(f"Wrote {len(run.reports)} deck reports to {args.out} in {run.elapsed:.2f}s "
+          f"({run.reports_per_sec:.1f} reports/s); index: {run.index_path}")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,262 @@
+import argparse
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from data.data_access import CardRepository
+from data.database.database import Database
+from data.paths import default_db_path
+from repetition.repetition_logic import RepetitionLogic
+from model.study_modes import StudyMode
+
+MAX_BODY_BYTES = 64 * 1024
+# A user's study session ends after this long without an answer
+SESSION_IDLE_SECONDS = 30 * 60
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class _UserState:
+    """A user's scheduler, the lock that guards it and when they last answered"""
+    __slots__ = ('logic', 'lock', 'last_answer')
+
+    def __init__(self):
+        self.logic = RepetitionLogic()
+        self.lock = threading.Lock()
+        self.last_answer = 0.0
+
+
+class ReviewService:
+    """Scheduler operations backed by SQLite, safe to call from worker threads
+
+    Every worker thread gets its own connection; each user gets their own
+    RepetitionLogic, guarded by a per-user lock. A user's first answer opens
+    a study session in its mode; the session ends when the mode changes,
+    after SESSION_IDLE_SECONDS without answers or through end_session, and
+    ended sessions make up the user's study patterns.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._users: Dict[str, _UserState] = {}
+        self._users_lock = threading.Lock()
+        # Create the schema and switch to WAL once, before workers connect
+        db = Database(db_path)
+        db.conn.execute("PRAGMA journal_mode=WAL")
+        db.conn.close()
+
+    @property
+    def card_repo(self) -> CardRepository:
+        repo = getattr(self._local, "card_repo", None)
+        if repo is None:
+            db = Database(self.db_path)
+            db.conn.execute("PRAGMA busy_timeout = 5000")
+            repo = self._local.card_repo = CardRepository(db)
+        return repo
+
+    def _user(self, user: str) -> _UserState:
+        with self._users_lock:
+            state = self._users.get(user)
+            if state is None:
+                state = self._users[user] = _UserState()
+            return state
+
+    @staticmethod
+    def _end_idle_session(state: _UserState) -> None:
+        """End the user's session if they have not answered for a while; call under its lock"""
+        if (state.logic.current_session is not None
+                and time.monotonic() - state.last_answer > SESSION_IDLE_SECONDS):
+            state.logic.end_session()
+
+    def next_cards(self, deck_id: Optional[int], limit: int) -> Dict:
+        cards = self.card_repo.get_due_cards(limit, deck_id)
+        return {"cards": [{"id": card.id, "front": card.front, "back": card.back,
+                           "confidence": card.confidence, "level": card.level}
+                          for card in cards]}
+
+    def submit_answer(self, user: str, card_id: int, correct: bool, mode: StudyMode) -> Dict:
+        repo = self.card_repo
+        card = repo.get_card(card_id)
+        if card is None:
+            raise HTTPError(404, f"Card {card_id} not found")
+        state = self._user(user)
+        logic = state.logic
+        with state.lock:
+            self._end_idle_session(state)
+            if logic.current_session is None or logic.current_session.mode != mode:
+                logic.start_session(mode)
+            state.last_answer = time.monotonic()
+            interval = logic.update_review(card, correct, mode)
+            repo.update_schedule(card)
+            logic.persist_review_history(repo)
+        return {"card_id": card.id, "interval_days": interval, "level": card.level,
+                "next_due": card.next_due.isoformat()}
+
+    def end_session(self, user: str) -> Dict:
+        """End the user's open study session, if any, and return its totals"""
+        state = self._user(user)
+        with state.lock:
+            stats = state.logic.end_session()
+        if stats is None:
+            return {"ended": False}
+        return {"ended": True, "correct_answers": stats.correct_answers,
+                "total_answers": stats.total_answers,
+                "duration_minutes": stats.duration_minutes}
+
+    def stats(self, user: str, deck_id: Optional[int]) -> Dict:
+        state = self._user(user)
+        with state.lock:
+            self._end_idle_session(state)
+            patterns = state.logic.get_study_patterns()
+        if "preferred_mode" in patterns:
+            patterns["preferred_mode"] = patterns["preferred_mode"].value
+        return {"due_cards": self.card_repo.count_due_cards(deck_id),
+                "study_patterns": patterns}
+
+
+class ReviewServer:
+    """Minimal HTTP/1.1 JSON server on asyncio streams
+
+    Endpoints:
+        GET  /next?deck_id=&limit=       due cards
+        POST /answer                     {"card_id", "correct", "mode", "user"}
+        POST /session/end                {"user"}; ends the user's study session
+        GET  /stats?deck_id=&user=       due count and study patterns of ended sessions
+
+    Request parsing happens on the event loop; SQLite work runs on a
+    bounded thread pool so slow queries never block other connections.
+    """
+
+    def __init__(self, service: ReviewService, host: str = "127.0.0.1", port: int = 8765,
+                 workers: int = 8):
+        self.service = service
+        self.host = host
+        self.port = port
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="review-db")
+        self.server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> None:
+        self.server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def close(self) -> None:
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+        self.executor.shutdown(wait=True)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader,
+                                 writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length", 0))
+                keep_alive = headers.get("connection", "").lower() != "close"
+                if length > MAX_BODY_BYTES:
+                    status, payload = 413, {"error": "request body too large"}
+                    keep_alive = False
+                else:
+                    body = await reader.readexactly(length) if length else b""
+                    status, payload = await self._dispatch(method, target, body)
+                self._write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, method: str, target: str, body: bytes) -> Tuple[int, Dict]:
+        url = urlsplit(target)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        loop = asyncio.get_running_loop()
+        try:
+            deck_id = int(query["deck_id"]) if "deck_id" in query else None
+            user = query.get("user", "default")
+            if url.path == "/next" and method == "GET":
+                limit = min(int(query.get("limit", 1)), 1000)
+                result = await loop.run_in_executor(
+                    self.executor, self.service.next_cards, deck_id, limit)
+            elif url.path == "/answer" and method == "POST":
+                data = json.loads(body or b"{}")
+                mode = StudyMode(data.get("mode", StudyMode.NORMAL.value))
+                result = await loop.run_in_executor(
+                    self.executor, self.service.submit_answer,
+                    data.get("user", user), int(data["card_id"]), bool(data["correct"]), mode)
+            elif url.path == "/session/end" and method == "POST":
+                data = json.loads(body or b"{}")
+                result = await loop.run_in_executor(
+                    self.executor, self.service.end_session, data.get("user", user))
+            elif url.path == "/stats" and method == "GET":
+                result = await loop.run_in_executor(
+                    self.executor, self.service.stats, user, deck_id)
+            elif url.path in ("/next", "/answer", "/session/end", "/stats"):
+                raise HTTPError(405, f"{method} not allowed on {url.path}")
+            else:
+                raise HTTPError(404, f"Unknown endpoint {url.path}")
+            return 200, result
+        except HTTPError as e:
+            return e.status, {"error": str(e)}
+        except (KeyError, ValueError, TypeError) as e:
+            return 400, {"error": f"Invalid request: {e}"}
+        except Exception as e:
+            return 500, {"error": str(e)}
+
+    @staticmethod
+    def _write_response(writer: asyncio.StreamWriter, status: int, payload: Dict,
+                        keep_alive: bool) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        writer.write(
+            f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1")
+            + body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the review scheduler over HTTP")
+    parser.add_argument("--db", default=None, help="database file (default: the app's own)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=8, help="SQLite worker threads")
+    args = parser.parse_args()
+
+    server = ReviewServer(ReviewService(args.db or default_db_path()), args.host, args.port, args.workers)
+    print(f"Serving on http://{args.host}:{args.port}")
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
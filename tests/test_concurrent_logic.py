@@ -0,0 +1,110 @@
+import random
+import threading
+from typing import Dict, List, Tuple
+
+import pytest
+
+from model.flashcard import Flashcard
+from model.study_modes import StudyMode
+from repetition.concurrent_logic import ConcurrentRepetitionLogic
+from repetition.repetition_logic import RepetitionLogic
+
+USERS = 4
+CARDS_PER_USER = 200
+
+# Per thread: (user, [(card index, correct, interval)])
+ReviewLog = List[Tuple[str, List[Tuple[int, bool, int]]]]
+
+
+def _review_concurrently(logic: ConcurrentRepetitionLogic, decks: Dict[str, List[Flashcard]],
+                         threads: int, reviews_per_thread: int, seed: int = 0) -> ReviewLog:
+    """Review from many threads at once, spread over the users
+
+    Each thread owns a disjoint slice of its user's cards but shares the
+    user's shards and session with the other threads.
+    """
+    logs: ReviewLog = [(f"user{index % USERS}", []) for index in range(threads)]
+    barrier = threading.Barrier(threads)
+
+    def work(index: int) -> None:
+        rng = random.Random(seed + index)
+        user, log = logs[index]
+        slot, owners = index // USERS, (threads - index % USERS + USERS - 1) // USERS
+        owned = range(slot, CARDS_PER_USER, owners)
+        cards = decks[user]
+        barrier.wait()
+        for _ in range(reviews_per_thread):
+            i = rng.choice(owned)
+            correct = rng.random() < 0.7
+            log.append((i, correct, logic.update_review(user, cards[i], correct, StudyMode.NORMAL)))
+
+    workers = [threading.Thread(target=work, args=(i,)) for i in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return logs
+
+
+def _replay_serially(decks: Dict[str, List[Flashcard]], logs: ReviewLog):
+    """Apply every thread's reviews to fresh cards through one plain RepetitionLogic per user
+
+    Each card is reviewed by a single thread, so its reviews replay in the
+    order they happened and the outcome must match the concurrent run.
+    """
+    logics = {user: RepetitionLogic() for user in decks}
+    cards = {user: [Flashcard(card.front, card.back) for card in user_cards]
+             for user, user_cards in decks.items()}
+    intervals: List[List[int]] = []
+    for logic in logics.values():
+        logic.start_session(StudyMode.NORMAL)
+    for user, log in logs:
+        logic = logics[user]
+        intervals.append([logic.update_review(cards[user][i], correct, StudyMode.NORMAL)
+                          for i, correct, _ in log])
+    return logics, cards, intervals
+
+
+@pytest.mark.parametrize("shards", [1, 4, 16])
+def test_concurrent_reviews_match_a_serial_run(shards: int) -> None:
+    logic = ConcurrentRepetitionLogic(shards)
+    decks = {f"user{u}": [Flashcard(f"u{u} q{i}", f"a{i}") for i in range(CARDS_PER_USER)]
+             for u in range(USERS)}
+    for user in decks:
+        logic.start_session(user, StudyMode.NORMAL)
+    logs = _review_concurrently(logic, decks, threads=16, reviews_per_thread=500)
+
+    serial_logics, serial_cards, serial_intervals = _replay_serially(decks, logs)
+    assert [[interval for _, _, interval in log] for _, log in logs] == serial_intervals
+    for user, cards in decks.items():
+        serial = serial_logics[user]
+        stats, serial_stats = logic.end_session(user), serial.end_session()
+        assert (stats.total_answers, stats.correct_answers) == \
+            (serial_stats.total_answers, serial_stats.correct_answers)
+        for card, serial_card in zip(cards, serial_cards[user]):
+            schedule = logic.get_schedule(user, card)
+            serial_schedule = serial.schedules.get(RepetitionLogic.card_key(serial_card))
+            got = (card.confidence, card.level,
+                   (schedule.level, schedule.history, schedule.window) if schedule else None)
+            want = (serial_card.confidence, serial_card.level,
+                    (serial_schedule.level, serial_schedule.history, serial_schedule.window)
+                    if serial_schedule else None)
+            assert got == want, card.front
+
+
+def test_users_have_separate_sessions() -> None:
+    logic = ConcurrentRepetitionLogic(4)
+    card = Flashcard("q", "a")
+    logic.start_session("alice", StudyMode.NORMAL)
+    logic.update_review("alice", card, True, StudyMode.NORMAL)
+    logic.update_review("bob", Flashcard("q", "a"), False, StudyMode.NORMAL)
+    assert logic.end_session("alice").total_answers == 1
+    assert logic.end_session("bob") is None
+    assert len(logic.session_history("alice")) == 1 and logic.session_history("bob") == []
+    assert logic.get_schedule("alice", card).window == 1
+    assert logic.get_schedule("bob", card) is None
+
+
+def test_shards_must_be_positive() -> None:
+    with pytest.raises(ValueError):
+        ConcurrentRepetitionLogic(0)
\ No newline at end of file
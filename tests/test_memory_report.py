@@ -0,0 +1,62 @@
+import sys
+import tracemalloc
+
+import pytest
+
+from model import memory_report
+from model.memory_report import MemoryBudgetExceeded, MemoryReport, check_budget, measure, synthetic_deck
+from repetition.repetition_logic import RepetitionLogic
+
+# Attributed bytes per card after a study session; a synthetic card costs
+# about 500 bytes today
+BUDGET = 1000
+
+
+@pytest.fixture(autouse=True)
+def stop_tracing():
+    yield
+    tracemalloc.stop()
+
+
+def test_check_budget() -> None:
+    report = MemoryReport(card_count=4, components={"Flashcard objects": 1000, "Deck.flashcards": 200})
+    assert report.bytes_per_card == 300
+    check_budget(report, 300)
+    with pytest.raises(MemoryBudgetExceeded):
+        check_budget(report, 299)
+    check_budget(MemoryReport(card_count=0), 0)
+
+
+def test_measure_attributes_each_object_once() -> None:
+    deck = synthetic_deck(100)
+    logic = RepetitionLogic()
+    report = measure(deck, logic)
+    assert report.card_count == 100
+    assert report.components["Flashcard objects"] > 0
+    # The cards are charged to the first component, not again to the deck's list
+    assert report.components["Deck.flashcards"] < report.components["Flashcard objects"]
+    assert report.components["RepetitionLogic.schedules"] < 1000
+
+
+def test_model_layer_within_budget() -> None:
+    deck = synthetic_deck(2000)
+    logic = RepetitionLogic()
+    memory_report.profile_session(deck, logic, 1000)
+    report = measure(deck, logic)
+    assert report.components["RepetitionLogic.schedules"] > 0
+    assert report.traced_current > 0
+    check_budget(report, BUDGET)
+
+
+@pytest.mark.parametrize("budget, code", [(BUDGET, None), (10, 1)])
+def test_budget_option(monkeypatch, capsys, budget, code) -> None:
+    monkeypatch.setattr(sys, "argv", ["memory_report", "--cards", "200", "--reviews", "200",
+                                      "--budget", str(budget)])
+    if code is None:
+        memory_report.main()
+        assert capsys.readouterr().out.splitlines()[-1].startswith("OK:")
+    else:
+        with pytest.raises(SystemExit) as exit_info:
+            memory_report.main()
+        assert exit_info.value.code == code
+        assert capsys.readouterr().out.splitlines()[-1].startswith("FAIL:")
\ No newline at end of file
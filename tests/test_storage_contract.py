@@ -0,0 +1,303 @@
+import math
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+
+import pytest
+
+from data.data_access import SQLiteBackend
+from data.database.database import Database
+from data.memory_storage import MemoryBackend
+from data.storage import StorageBackend
+from model.card_stats import CardStats, ReviewResult
+from model.deck import Deck
+from model.deck_stats import DeckStats
+from model.flashcard import Flashcard
+from model.study_modes import StudyMode
+from model.study_session_stats import StudySession
+from repetition.checkpoint import load_checkpoint, save_checkpoint
+from repetition.repetition_logic import RepetitionLogic
+
+# Behaviour every storage backend must share: each test runs on a fresh
+# instance of every bundled backend.
+BACKENDS: Dict[str, Callable[[], StorageBackend]] = {
+    "sqlite": lambda: SQLiteBackend(Database(":memory:")),
+    "memory": MemoryBackend,
+}
+
+
+@pytest.fixture(params=list(BACKENDS))
+def backend(request) -> StorageBackend:
+    backend = BACKENDS[request.param]()
+    yield backend
+    backend.close()
+
+
+def _close(a, b) -> bool:
+    if a is None or b is None:
+        return a is b
+    return math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-9)
+
+
+def _saved_deck(backend: StorageBackend, name: str, cards: List[Flashcard]) -> Deck:
+    deck = Deck(name)
+    deck.add_cards(cards)
+    deck.save(backend.decks)
+    return deck
+
+
+def test_decks_and_cards(backend: StorageBackend) -> None:
+    deck = Deck("Capitals", "European capitals")
+    deck.add_cards([Flashcard("France", "Paris"), Flashcard("Spain", "Madrid"),
+                    Flashcard("Italy", "Rome")])
+    deck.save(backend.decks)
+    assert deck.id is not None
+    assert all(card.id is not None for card in deck.flashcards)
+    assert backend.cards.count_cards(deck.id) == 3
+
+    loaded = backend.decks.load_deck(deck.id)
+    assert (loaded.name, loaded.description, loaded.id) == ("Capitals", "European capitals", deck.id)
+    # Loaded cards keep their uid
+    assert {card.uid: card.front for card in loaded.flashcards} == \
+        {card.uid: card.front for card in deck.flashcards}
+    with pytest.raises(ValueError):
+        backend.decks.load_deck(10_000)
+
+    info = backend.decks.get_deck_info(deck.id)
+    assert (info['id'], info['name'], info['description'], info['category']) == \
+        (deck.id, "Capitals", "European capitals", deck.category)
+    assert backend.decks.get_deck_info(10_000) is None
+    assert backend.cards.get_card(10_000) is None
+
+
+def test_duplicates(backend: StorageBackend) -> None:
+    deck = _saved_deck(backend, "Capitals", [Flashcard("France", "Paris"), Flashcard("Spain", "Madrid")])
+    report = backend.cards.import_cards(
+        [Flashcard("france", " Paris "), Flashcard("Germany", "Berlin"),
+         Flashcard("Germany", "Berlin")], deck.id)
+    # A stored duplicate is paired with None, a repeat within the batch with the card it repeats
+    assert len(report.added) == 1 and len(report.skipped) == 2
+    assert report.skipped[0][1] is None and report.skipped[1][1] is report.added[0]
+
+    spain = next(card for card in deck.flashcards if card.front == "Spain")
+    unknown = Flashcard("x", "y").content_hash
+    assert backend.cards.find_existing_hashes(deck.id, [spain.content_hash, unknown]) == {spain.content_hash}
+    assert backend.cards.find_card_ids(deck.id, [spain.content_hash, unknown]) == {spain.content_hash: spain.id}
+
+
+def test_card_saved_into_second_deck(backend: StorageBackend) -> None:
+    deck = _saved_deck(backend, "First", [Flashcard("One", "1"), Flashcard("Two", "2")])
+    other_id = backend.decks.save_deck(Deck("Other"))
+
+    # The copy is a distinct stored card, and the in-memory card follows it
+    card = deck.flashcards[0]
+    original_id, original_uid = card.id, card.uid
+    backend.cards.save_card(card, other_id)
+    assert card.id != original_id
+    copy = backend.cards.get_card(card.id)
+    assert copy.front == card.front
+    assert copy.uid == card.uid != original_uid
+    assert backend.cards.get_card(original_id).uid == original_uid
+
+    second = deck.flashcards[1]
+    second_uid = second.uid
+    backend.cards.import_cards([second], other_id)
+    assert second.uid != second_uid
+    assert backend.cards.get_card(second.id).uid == second.uid
+
+
+def test_paging(backend: StorageBackend) -> None:
+    deck_ids = [backend.decks.save_deck(Deck(f"Deck {i}")) for i in range(5)]
+    assert backend.decks.count_decks() == 5
+    page = backend.decks.list_decks_after(None, 2)
+    assert [row['id'] for row in page] == deck_ids[:2]
+    # Rows are indexable by position and pages continue after the key
+    assert [row[0] for row in backend.decks.list_decks_after(page[-1][0], 10)] == deck_ids[2:]
+    assert backend.decks.deck_id_before(0) is None
+    assert backend.decks.deck_id_before(3) == deck_ids[2]
+
+    deck_id = deck_ids[0]
+    backend.cards.import_cards([Flashcard(f"Q{i}", f"A{i}") for i in range(7)], deck_id)
+    ids = [row['id'] for row in backend.cards.list_cards_after(deck_id, None, 100)]
+    assert len(ids) == 7 and ids == sorted(ids)
+    assert [row['front'] for row in backend.cards.list_cards_after(deck_id, ids[2], 2)] == ["Q3", "Q4"]
+    assert backend.cards.card_id_before(deck_id, 4) == ids[3]
+    assert backend.cards.card_id_before(deck_id, 0) is None
+    chunks = list(backend.cards.iter_cards_for_deck(deck_id, chunk_size=3))
+    assert [len(chunk) for chunk in chunks] == [3, 3, 1]
+    assert [card.id for chunk in chunks for card in chunk] == ids
+
+
+def test_schedules(backend: StorageBackend) -> None:
+    now = datetime(2030, 6, 1, 12, 0)
+    deck_id = backend.decks.save_deck(Deck("Due"))
+    other_id = backend.decks.save_deck(Deck("Other"))
+    cards = [Flashcard(f"Q{i}", f"A{i}") for i in range(5)]
+    backend.cards.import_cards(cards, deck_id)
+    backend.cards.import_cards([Flashcard(f"Other {i}", "card") for i in range(20)], other_id)
+    for days, card in zip((-3, -1, 2, 5), cards):
+        card.next_due = now + timedelta(days=days)
+        card.level = days + 3
+        card.confidence = days
+    backend.cards.update_schedules(cards[:4])
+    backend.cards.update_schedule(cards[4])
+
+    # New cards (next_due 0) come first, then the most overdue
+    due = backend.cards.get_due_cards(10, deck_id, now=now)
+    assert [card.front for card in due] == ["Q4", "Q0", "Q1"]
+    assert due[1].confidence == -3 and due[1].level == 0
+    assert [card.front for card in backend.cards.get_due_cards(2, now=now)] == ["Q4", "Other 0"]
+    assert backend.cards.count_due_cards(deck_id, now=now) == 3
+    assert backend.cards.count_due_cards(now=now + timedelta(days=3)) == 24
+
+    next_due, levels = backend.cards.load_schedule_columns(deck_id)
+    assert sorted(levels.tolist()) == [0, 0, 2, 5, 8]
+    assert int(next_due.max()) == int((now + timedelta(days=5)).timestamp())
+
+    # A rescheduled card moves in the due order
+    cards[2].next_due = now - timedelta(days=5)
+    backend.cards.update_schedule(cards[2])
+    assert [card.front for card in backend.cards.get_due_cards(10, deck_id, now=now)] == \
+        ["Q4", "Q2", "Q0", "Q1"]
+
+    backend.cards.add_reviews([(cards[0].id, now, True), (cards[0].id, now + timedelta(hours=1), False),
+                               (cards[1].id, now - timedelta(days=1), True)])
+    totals = {row['card_id']: (row['total_reviews'], row['correct_reviews'], row['last_reviewed'])
+              for row in backend.cards.load_review_totals(deck_id)}
+    assert totals == {cards[0].id: (2, 1, str(now + timedelta(hours=1))),
+                      cards[1].id: (1, 1, str(now - timedelta(days=1)))}
+    assert backend.cards.load_reviews([cards[1].id, cards[0].id, cards[2].id]) == {
+        cards[0].id: [(str(now), True), (str(now + timedelta(hours=1)), False)],
+        cards[1].id: [(str(now - timedelta(days=1)), True)]}
+
+
+def test_review_log(backend: StorageBackend, tmp_path) -> None:
+    deck = _saved_deck(backend, "Log", [Flashcard(f"Q{i}", f"A{i}") for i in range(3)])
+    cards = list(deck.flashcards)
+    unsaved = Flashcard("Unsaved", "not stored")
+    logic = RepetitionLogic()
+    logic.record_reviews([(cards[0], True), (cards[1], False), (cards[0], True), (unsaved, True)],
+                         StudyMode.NORMAL)
+
+    # Only reviews of saved cards are queued; the rest only update schedules
+    assert len(logic.pending_reviews) == 3
+    assert unsaved.uid in logic.schedules
+    marker = backend.cards.change_marker()
+    logic.persist_review_history(backend.cards)
+    assert backend.cards.change_marker() != marker
+    assert logic.pending_reviews == []
+
+    uids, seconds, correct = backend.cards.load_review_log()
+    assert sorted(zip(uids.tolist(), correct.tolist())) == \
+        sorted([(cards[0].uid, True), (cards[0].uid, True), (cards[1].uid, False)])
+    assert abs(seconds.max() - time.time()) < 60
+
+    replayed = RepetitionLogic()
+    replayed.load_review_history(backend.cards)
+    assert {key: (state.level, state.history, state.last_review)
+            for key, state in replayed.schedules.items()} == \
+        {card.uid: (logic.schedules[card.uid].level, logic.schedules[card.uid].history,
+                    logic.schedules[card.uid].last_review) for card in cards[:2]}
+    models = replayed.fit_memory_models(backend.cards)
+    assert cards[0].uid in models and cards[1].uid in models and cards[2].uid not in models
+
+    path = str(tmp_path / "scheduler.ckpt")
+    save_checkpoint(logic, path, backend.cards)
+    restored = RepetitionLogic()
+    assert load_checkpoint(restored, path, backend.cards)
+    assert restored.schedules.keys() == logic.schedules.keys()
+    # Any later write makes the checkpoint stale
+    backend.cards.update_schedule(cards[2])
+    assert not load_checkpoint(RepetitionLogic(), path, backend.cards)
+
+
+def _session(start: datetime, minutes, correct: int, total: int, cards: int) -> StudySession:
+    session = StudySession(StudyMode.NORMAL)
+    session.stats.start_time = start
+    session.stats.end_time = start + timedelta(minutes=minutes) if minutes is not None else None
+    session.stats.correct_answers = correct
+    session.stats.total_answers = total
+    session.reviewed_cards = set(range(cards))
+    return session
+
+
+def test_sessions(backend: StorageBackend) -> None:
+    deck_id = backend.decks.save_deck(Deck("Sessions"))
+    other_id = backend.decks.save_deck(Deck("Other"))
+    sessions = backend.sessions
+    # Monday 7 January twice, Wednesday 9 January and Sunday 3 February, local time
+    sessions.save_session(_session(datetime(2030, 1, 7, 15), None, 2, 10, 4), deck_id)
+    sessions.save_session(_session(datetime(2030, 1, 7, 10), 10, 8, 10, 6), deck_id)
+    sessions.save_session(_session(datetime(2030, 1, 9, 9), 30, 5, 5, 5), deck_id)
+    sessions.save_session(_session(datetime(2030, 2, 3, 9), 5, 0, 0, 0), deck_id)
+    sessions.save_session(_session(datetime(2030, 1, 7, 11), 60, 1, 1, 1), other_id)
+
+    history = sessions.get_sessions_for_deck(deck_id)
+    assert [s.stats.start_time for s in history] == [
+        datetime(2030, 1, 7, 10), datetime(2030, 1, 7, 15), datetime(2030, 1, 9, 9), datetime(2030, 2, 3, 9)]
+    assert history[1].stats.end_time is None and history[0].stats.correct_answers == 8
+
+    def buckets(bucket: str, **kwargs) -> List[Dict]:
+        return [dict(row) for row in sessions.aggregate_sessions(bucket, deck_id=deck_id, **kwargs)]
+
+    days = buckets('day')
+    assert [row['bucket'] for row in days] == ["2030-01-07", "2030-01-09", "2030-02-03"]
+    first = days[0]
+    assert (first['sessions'], first['correct_answers'], first['total_answers'],
+            first['cards_reviewed']) == (2, 10, 20, 10)
+    assert _close(first['accuracy'], 0.5) and _close(first['average_accuracy'], 0.5)
+    assert _close(first['study_minutes'], 10.0)
+    # A bucket without answers has no accuracy
+    assert days[2]['accuracy'] is None and _close(days[2]['average_accuracy'], 0.0)
+    # Weeks start on Monday
+    assert [(row['bucket'], row['sessions']) for row in buckets('week')] == \
+        [("2030-01-07", 3), ("2030-01-28", 1)]
+    assert [(row['bucket'], row['sessions']) for row in buckets('month')] == \
+        [("2030-01-01", 3), ("2030-02-01", 1)]
+    assert [row['sessions'] for row in buckets('day', since=datetime(2030, 1, 8),
+                                               until=datetime(2030, 2, 1))] == [1]
+    assert len(sessions.aggregate_sessions('day')) == 3
+    with pytest.raises(ValueError):
+        sessions.aggregate_sessions('year')
+
+    trends = sessions.get_trend_summary(deck_id, since=datetime(2030, 1, 8))
+    assert trends['sessions_count'] == 2
+    assert _close(trends['total_study_time'], 35.0)
+    assert _close(trends['average_accuracy'], 0.5) and _close(trends['cards_per_session'], 2.5)
+    assert sessions.get_trend_summary(deck_id, since=datetime(2031, 1, 1)) == {
+        "sessions_count": 0, "total_study_time": 0, "average_accuracy": 0.0, "cards_per_session": 0}
+
+
+def test_stats(backend: StorageBackend) -> None:
+    deck = _saved_deck(backend, "Stats", [Flashcard("One", "1"), Flashcard("Two", "2"),
+                                          Flashcard("Three", "3")])
+    first, second, third = (card.id for card in deck.flashcards)
+
+    stats = CardStats(first)
+    stats.record_review(ReviewResult.CORRECT, 2.0, 0, 1)
+    stats.record_review(ReviewResult.INCORRECT, 4.0, 1, 0)
+    stats.save(backend.stats)
+    loaded = CardStats.load(first, backend.stats)
+    assert (loaded.total_reviews, loaded.correct_reviews, loaded.last_reviewed,
+            loaded.average_response_time) == (2, 1, stats.last_reviewed, 3.0)
+    assert loaded.review_history == stats.review_history
+
+    # Saving again replaces the stored entries rather than adding to them
+    stats.review_history.pop()
+    stats.save(backend.stats)
+    assert len(CardStats.load(first, backend.stats).review_history) == 1
+    assert CardStats.load(second, backend.stats).total_reviews == 0
+
+    # Stored stats do not follow later changes to the object
+    stats.record_review(ReviewResult.SKIPPED, 1.0, 0, 0)
+    assert CardStats.load(first, backend.stats).total_reviews == 2
+
+    deck_stats = DeckStats(deck.id, last_studied=datetime(2030, 3, 1, 8, 30))
+    deck_stats.add_card_stats(CardStats(second, total_reviews=4, correct_reviews=3))
+    deck_stats.add_card_stats(loaded)
+    deck_stats.save(backend.stats)
+    restored = DeckStats.load(deck.id, backend.stats)
+    assert (restored.total_cards, restored.last_studied) == (2, datetime(2030, 3, 1, 8, 30))
+    assert sorted(restored.cards_stats) == sorted([first, second]) and third not in restored.cards_stats
+    assert restored.cards_stats[first].review_history == loaded.review_history
+    assert DeckStats.load(10_000, backend.stats).total_cards == 0
\ No newline at end of file
@@ -0,0 +1,67 @@
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional
+
+from PIL import ImageTk
+
+# Tk keeps photo images as 32-bit RGBA
+BYTES_PER_PIXEL = 4
+
+
+class PhotoImageCache:
+    """LRU cache of Tk photo images bounded by their pixel memory
+
+    Keeps converted images alive between redisplays so flipping a card or
+    revisiting it reuses the existing PhotoImage instead of rendering and
+    converting again. Entries are evicted least recently used first once
+    the total pixel bytes exceed max_bytes.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def get(self, key: Hashable) -> Optional[ImageTk.PhotoImage]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key: Hashable, image: ImageTk.PhotoImage) -> None:
+        size = image.width() * image.height() * BYTES_PER_PIXEL
+        if key in self._entries:
+            self.current_bytes -= self._entries.pop(key)[1]
+        self._entries[key] = (image, size)
+        self.current_bytes += size
+        self._evict()
+
+    def get_or_create(self, key: Hashable,
+                      factory: Callable[[], Optional[ImageTk.PhotoImage]]) -> Optional[ImageTk.PhotoImage]:
+        """Return the cached image for key, creating it with factory on a miss"""
+        image = self.get(key)
+        if image is None:
+            image = factory()
+            if image is not None:
+                self.put(key, image)
+        return image
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.current_bytes = 0
+
+    def _evict(self) -> None:
+        # Never evict the entry just inserted, even if it alone exceeds the budget
+        while self.current_bytes > self.max_bytes and len(self._entries) > 1:
+            _, (_, size) = self._entries.popitem(last=False)
+            self.current_bytes -= size
@@ -1,12 +1,72 @@
+import argparse
+import io
 import os
+import shutil
+import statistics
 import tempfile
+import time
+from abc import ABC, abstractmethod
 from PIL import Image
 import subprocess
-from typing import Optional
+from typing import Dict, Iterable, List, Optional
+
+from matplotlib import mathtext
+from matplotlib.font_manager import FontProperties
+
+
+class RenderEngine(ABC):
+    """Interface for turning a math expression into a PIL image"""
+    name = "base"
+
+    def available(self) -> bool:
+        """Whether the engine can run on this machine"""
+        return True
+
+    def supports(self, latex_str: str) -> bool:
+        """Cheap pre-check of whether the engine may render this expression
+
+        Engines that can only tell by trying leave this True and return None
+        from render instead.
+        """
+        return True
+
+    @abstractmethod
+    def render(self, latex_str: str) -> Optional[Image.Image]:
+        """Render the expression, or None if the engine cannot"""
+
+
+class MathTextEngine(RenderEngine):
+    """In-process rendering with matplotlib's mathtext
+
+    Handles the TeX math subset mathtext implements (fractions, roots,
+    sub/superscripts, Greek, most operators and accents) in milliseconds.
+    Environments, \\text and other constructs it cannot parse make render
+    return None, so the caller can fall back to pdflatex; the expression is
+    parsed only once.
+    """
+    name = "mathtext"
+
+    def __init__(self, dpi: int = 200, fontsize: int = 14):
+        self.dpi = dpi
+        self.fontsize = fontsize
+
+    def render(self, latex_str: str) -> Optional[Image.Image]:
+        buffer = io.BytesIO()
+        try:
+            mathtext.math_to_image(f"${latex_str}$", buffer, dpi=self.dpi, format="png",
+                                   prop=FontProperties(size=self.fontsize))
+        except ValueError:
+            return None
+        buffer.seek(0)
+        img = Image.open(buffer)
+        img.load()
+        return img
+
+
+class PdfLatexEngine(RenderEngine):
+    """Full LaTeX via pdflatex and ImageMagick, one subprocess pair per expression"""
+    name = "pdflatex"
 
-def render_latex(latex_str: str) -> Optional[Image.Image]:
-    """Render LaTeX expression to PIL Image using pdflatex"""
-    
     # LaTeX document template
     doc_template = r"""
     \documentclass[12pt]{article}
@@ -14,47 +74,92 @@ def render_latex(latex_str: str) -> Optional[Image.Image]:
     \usepackage{amssymb}
     \pagestyle{empty}
     \begin{document}
-    %s
+    \[ %s \]
     \end{document}
     """
-    
-    try:
-        with tempfile.TemporaryDirectory() as tmpdir:
-            # Create LaTeX file
-            tex_file = os.path.join(tmpdir, "expr.tex")
-            with open(tex_file, "w") as f:
-                f.write(doc_template % latex_str)
-                
-            # Run pdflatex
-            result = subprocess.run(
-                ["pdflatex", "-output-directory", tmpdir, tex_file],
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL,
-                check=True
-            )
-            
-            # Convert PDF to PNG
-            pdf_file = os.path.join(tmpdir, "expr.pdf")
-            png_file = os.path.join(tmpdir, "expr.png")
-            
-            result = subprocess.run(
-                ["convert", "-density", "300", pdf_file, "-quality", "90", png_file],
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL,
-                check=True
-            )
-            
-            # Load and return image
-            return Image.open(png_file)
-    except (subprocess.CalledProcessError, OSError) as e:
-        print(f"Error rendering LaTeX: {e}")
-        return None
+
+    def available(self) -> bool:
+        return bool(shutil.which("pdflatex") and shutil.which("convert"))
+
+    def render(self, latex_str: str) -> Optional[Image.Image]:
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                # Create LaTeX file
+                tex_file = os.path.join(tmpdir, "expr.tex")
+                with open(tex_file, "w") as f:
+                    f.write(self.doc_template % latex_str)
+
+                # Run pdflatex
+                subprocess.run(
+                    ["pdflatex", "-interaction=nonstopmode", "-output-directory", tmpdir, tex_file],
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                    check=True
+                )
+
+                # Convert PDF to PNG
+                pdf_file = os.path.join(tmpdir, "expr.pdf")
+                png_file = os.path.join(tmpdir, "expr.png")
+
+                subprocess.run(
+                    ["convert", "-density", "300", pdf_file, "-quality", "90", png_file],
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                    check=True
+                )
+
+                # Load and return image before the temporary directory is removed
+                img = Image.open(png_file)
+                img.load()
+                return img
+        except (subprocess.CalledProcessError, OSError) as e:
+            print(f"Error rendering LaTeX: {e}")
+            return None
+
+
+ENGINES: Dict[str, RenderEngine] = {
+    MathTextEngine.name: MathTextEngine(),
+    PdfLatexEngine.name: PdfLatexEngine(),
+}
+
+# Engines tried in order; the first that supports an expression renders it
+default_engines: List[str] = [MathTextEngine.name, PdfLatexEngine.name]
+
+
+def register_engine(engine: RenderEngine, first: bool = False) -> None:
+    """Add an engine to the registry and the default fallback chain"""
+    ENGINES[engine.name] = engine
+    if engine.name in default_engines:
+        default_engines.remove(engine.name)
+    if first:
+        default_engines.insert(0, engine.name)
+    else:
+        default_engines.append(engine.name)
+
+
+def render_latex(latex_str: str, engine: Optional[str] = None) -> Optional[Image.Image]:
+    """Render LaTeX expression to PIL Image
+
+    With no engine given, tries each default engine in turn until one
+    returns an image: mathtext for anything it can parse, pdflatex for the
+    rest.
+    """
+    names = [engine] if engine else default_engines
+    for name in names:
+        candidate = ENGINES[name]
+        if not candidate.available() or not candidate.supports(latex_str):
+            continue
+        img = candidate.render(latex_str)
+        if img is not None:
+            return img
+    return None
+
 
 def setup_latex() -> bool:
     """Check if LaTeX is installed"""
     try:
         subprocess.run(
-            ["pdflatex", "--version"], 
+            ["pdflatex", "--version"],
             stdout=subprocess.DEVNULL,
             stderr=subprocess.DEVNULL,
             check=True
@@ -66,9 +171,97 @@ def setup_latex() -> bool:
             check=True
         )
         return True
-    except subprocess.CalledProcessError:
+    except (subprocess.CalledProcessError, OSError):
         print("Error: pdflatex or ImageMagick not found.")
         print("Please install:")
         print("- TeX Live or MiKTeX for LaTeX support")
         print("- ImageMagick for image conversion")
-        return False
\ No newline at end of file
+        return False
+
+
+# Expressions typical of card content, used when no corpus file is given
+SAMPLE_EXPRESSIONS = [
+    r"x^2 + y^2 = z^2",
+    r"\frac{a}{b} + \frac{c}{d}",
+    r"\sqrt{2}",
+    r"e^{i\pi} + 1 = 0",
+    r"\int_0^\infty e^{-x^2} dx = \frac{\sqrt{\pi}}{2}",
+    r"\sum_{n=1}^{\infty} \frac{1}{n^2} = \frac{\pi^2}{6}",
+    r"\lim_{x \to 0} \frac{\sin x}{x} = 1",
+    r"\nabla \cdot \mathbf{E} = \frac{\rho}{\epsilon_0}",
+    r"\alpha \beta \gamma \delta",
+    r"H_2O",
+    r"\begin{pmatrix} a & b \\ c & d \end{pmatrix}",
+    r"f(x) = \begin{cases} 1 & x > 0 \\ 0 & x \leq 0 \end{cases}",
+]
+
+
+def benchmark_engines(expressions: Iterable[str], engines: Optional[List[str]] = None,
+                      repeat: int = 3) -> Dict[str, Dict]:
+    """Time each engine on the expressions it supports
+
+    An expression counts as supported when the engine's first render of it
+    succeeds; a later repeat returning None counts as a failure. Returns per
+    engine: how many expressions it supports, and the median and worst
+    render latency in milliseconds over those expressions.
+    """
+    expressions = list(expressions)
+    results = {}
+    for name in engines or list(ENGINES):
+        engine = ENGINES[name]
+        if not engine.available():
+            results[name] = {"available": False}
+            continue
+        timings = []
+        supported = failures = 0
+        for expression in expressions:
+            if not engine.supports(expression):
+                continue
+            best = None
+            for attempt in range(repeat):
+                start = time.perf_counter()
+                img = engine.render(expression)
+                elapsed = time.perf_counter() - start
+                if img is None:
+                    if attempt:
+                        failures += 1
+                    break
+                best = elapsed if best is None else min(best, elapsed)
+            if best is not None:
+                supported += 1
+                timings.append(best * 1000)
+        results[name] = {
+            "available": True,
+            "supported": supported,
+            "total": len(expressions),
+            "failures": failures,
+            "median_ms": statistics.median(timings) if timings else None,
+            "max_ms": max(timings) if timings else None,
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare LaTeX rendering engines")
+    parser.add_argument("corpus", nargs="?",
+                        help="file with one expression per line (default: built-in samples)")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    expressions = SAMPLE_EXPRESSIONS
+    if args.corpus:
+        with open(args.corpus) as f:
+            expressions = [line.strip() for line in f if line.strip()]
+
+    for name, result in benchmark_engines(expressions, repeat=args.repeat).items():
+        if not result["available"]:
+            print(f"{name:10s} not available")
+            continue
+        median = f"{result['median_ms']:.1f}" if result["median_ms"] is not None else "-"
+        worst = f"{result['max_ms']:.1f}" if result["max_ms"] is not None else "-"
+        print(f"{name:10s} supports {result['supported']}/{result['total']}  "
+              f"median {median} ms  max {worst} ms  failures {result['failures']}")
+
+
+if __name__ == "__main__":
+    main()
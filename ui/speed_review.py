@@ -0,0 +1,149 @@
+import time
+from collections import deque
+from typing import Deque, List, Optional, Tuple, TYPE_CHECKING
+
+from model.flashcard import Flashcard
+from model.study_modes import StudyMode
+
+if TYPE_CHECKING:
+    from ui.ui import FlashcardUI
+
+# Cards drawn from the scheduler per refill
+QUEUE_SIZE = 200
+# Answers buffered before they are handed to the scheduler
+RECORD_BATCH = 25
+# Minimum time between two statistics refreshes
+STATS_INTERVAL_MS = 1000
+
+
+class SpeedReview:
+    """Keyboard-driven review from a precomputed queue
+
+    Each answer only advances the queue and redraws the card: there is no
+    flip animation, answers are recorded in batches, and the statistics
+    panel is refreshed at most once per STATS_INTERVAL_MS. The queue is
+    refilled from the UI's review batch once it runs dry, after the buffered
+    answers have been recorded so their cards are reprioritized.
+
+    Keys: Space or Return flips, Right or 1 is correct, Left or 2 is
+    incorrect, Escape leaves speed review.
+    """
+
+    def __init__(self, ui: 'FlashcardUI', queue_size: int = QUEUE_SIZE,
+                 record_batch: int = RECORD_BATCH):
+        self.ui = ui
+        self.queue_size = queue_size
+        self.record_batch = record_batch
+        self.active = False
+        self.queue: Deque[Flashcard] = deque()
+        self.pending: List[Tuple[Flashcard, bool]] = []
+        # Mode the queue was drawn for; buffered answers are recorded under it
+        self.mode = StudyMode.NORMAL
+        self._stats_job: Optional[str] = None
+        self._stats_shown_at = 0.0
+        self.bindings = {
+            '<space>': self.flip,
+            '<Return>': self.flip,
+            '<Right>': lambda: self.answer(True),
+            '<Key-1>': lambda: self.answer(True),
+            '<Left>': lambda: self.answer(False),
+            '<Key-2>': lambda: self.answer(False),
+            '<Escape>': self.stop,
+        }
+
+    @staticmethod
+    def _handler(action):
+        def handle(event):
+            action()
+            # Keep the key from reaching the card text or other widgets
+            return 'break'
+        return handle
+
+    def start(self) -> None:
+        if self.active:
+            return
+        self.active = True
+        for sequence, action in self.bindings.items():
+            handler = self._handler(action)
+            # The card text handles its own keys before the window sees them
+            self.ui.card_content.bind(sequence, handler)
+            self.ui.bind(sequence, handler)
+        self.ui.card_content.focus_set()
+        self.restart()
+
+    def stop(self) -> None:
+        if not self.active:
+            return
+        self.active = False
+        for sequence in self.bindings:
+            self.ui.card_content.unbind(sequence)
+            self.ui.unbind(sequence)
+        self.queue.clear()
+        self.flush()
+        if self._stats_job is not None:
+            self.ui.after_cancel(self._stats_job)
+            self._stats_job = None
+        self.ui.speed_var.set(False)
+        self.ui.show_next_card()
+        self.ui.update_stats()
+
+    def restart(self) -> None:
+        """Drop the queue and draw a fresh one, e.g. after a deck or mode change"""
+        self.flush()
+        self.queue.clear()
+        self.mode = StudyMode(self.ui.mode_var.get())
+        self.advance()
+
+    def flush(self) -> None:
+        """Record buffered answers with the scheduler"""
+        if self.pending:
+            pending, self.pending = self.pending, []
+            self.ui.record_answers(pending, self.mode)
+
+    def _refill(self) -> None:
+        self.flush()
+        self.queue.extend(self.ui.review_batch(self.mode, self.queue_size))
+
+    def advance(self) -> None:
+        """Show the next queued card"""
+        if not self.queue:
+            self._refill()
+        ui = self.ui
+        ui.is_card_flipped = False
+        if self.queue:
+            ui.current_card = self.queue.popleft()
+            ui.update_card_content(ui.current_card.front)
+        else:
+            ui.current_card = None
+            ui.card_content.delete('1.0', 'end')
+            ui.card_content.insert('1.0', "No more cards due for review!")
+
+    def flip(self) -> None:
+        card = self.ui.current_card
+        if card is None:
+            return
+        self.ui.is_card_flipped = not self.ui.is_card_flipped
+        self.ui.update_card_content(card.back if self.ui.is_card_flipped else card.front)
+
+    def answer(self, correct: bool) -> None:
+        card = self.ui.current_card
+        if card is None:
+            return
+        self.pending.append((card, correct))
+        if len(self.pending) >= self.record_batch:
+            self.flush()
+        self.advance()
+        self.request_stats()
+
+    def request_stats(self) -> None:
+        """Refresh the statistics panel now, or once the interval since the last refresh has passed"""
+        if self._stats_job is not None:
+            return
+        wait_ms = STATS_INTERVAL_MS - (time.monotonic() - self._stats_shown_at) * 1000
+        self._stats_job = self.ui.after(max(0, int(wait_ms)), self._show_stats)
+
+    def _show_stats(self) -> None:
+        self._stats_job = None
+        self._stats_shown_at = time.monotonic()
+        self.flush()
+        self.ui.update_stats()
\ No newline at end of file
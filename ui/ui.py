@@ -7,6 +7,7 @@ from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from PIL import Image, ImageTk
 import sys
 import os
+from datetime import datetime
 from typing import Optional, Dict, List
 import math
 
@@ -14,11 +15,18 @@ import math
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from ui.latex2png import render_latex, setup_latex
+from ui.image_cache import PhotoImageCache
+from ui.speed_review import SpeedReview
+from ui.virtual_list import KeysetPager, VirtualList
+from data.storage import DeckStore, SessionStore, StorageBackend
 from model.deck import Deck
 from model.flashcard import Flashcard
 from model.study_session_stats import StudySession
 from repetition.repetition_logic import RepetitionLogic, StudyMode
 
+# Most overdue cards of a stored deck considered when picking the next card
+DUE_CANDIDATES = 50
+
 class FlashcardUI(tk.Tk):
     def __init__(self):
         super().__init__()
@@ -27,7 +35,8 @@ class FlashcardUI(tk.Tk):
         if not setup_latex():
             messagebox.showerror(
                 "Setup Error",
-                "LaTeX or ImageMagick not found. Some features will be disabled."
+                "LaTeX or ImageMagick not found. Expressions matplotlib's mathtext "
+                "cannot render will be shown as plain text."
             )
         
         self.title("Flashcards")
@@ -39,11 +48,20 @@ class FlashcardUI(tk.Tk):
         self.configure_styles()
         
         # State
+        self.deck_repo: Optional[DeckStore] = None
+        self.session_repo: Optional[SessionStore] = None
+        # A deck held in memory, or the id of one studied straight from storage
         self.current_deck: Optional[Deck] = None
+        self.current_deck_id: Optional[int] = None
+        # Stored deck the running session belongs to, if any
+        self.session_deck_id: Optional[int] = None
         self.current_card: Optional[Flashcard] = None
         self.is_card_flipped = False
         self.repetition_logic = RepetitionLogic()
         self.study_mode = StudyMode.NORMAL
+        self.image_scale = 1.0
+        self.image_cache = PhotoImageCache()
+        self.speed_review = SpeedReview(self)
         
         self.setup_ui()
         
@@ -87,9 +105,23 @@ class FlashcardUI(tk.Tk):
         
         # Deck selection
         ttk.Label(self.sidebar, text="Decks").pack(pady=10)
-        self.deck_list = ttk.Treeview(self.sidebar, height=10)
+        self.deck_list = VirtualList(
+            self.sidebar,
+            format_row=lambda row: row['name'],
+            visible_rows=8,
+            on_select=self.on_deck_selected
+        )
         self.deck_list.pack(fill=tk.X, padx=5)
-        self.deck_list.bind('<<TreeviewSelect>>', self.on_deck_selected)
+        ttk.Button(self.sidebar, text="Refresh", command=self.refresh_decks).pack(pady=2)
+        
+        # Card browser
+        ttk.Label(self.sidebar, text="Cards").pack(pady=10)
+        self.card_list = VirtualList(
+            self.sidebar,
+            format_row=lambda row: f"{row['front'][:40]}  ({row['confidence']})",
+            visible_rows=10
+        )
+        self.card_list.pack(fill=tk.X, padx=5)
         
         # Stats section
         ttk.Label(self.sidebar, text="Statistics").pack(pady=10)
@@ -108,6 +140,15 @@ class FlashcardUI(tk.Tk):
                 command=self.on_mode_changed
             ).pack()
             
+        # Keyboard-driven review without animation
+        self.speed_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            self.sidebar,
+            text="Speed Review",
+            variable=self.speed_var,
+            command=self.on_speed_review_toggled
+        ).pack(pady=10)
+            
     def setup_flashcard_area(self):
         """Setup flashcard display area"""
         self.card_frame = ttk.Frame(
@@ -150,6 +191,9 @@ class FlashcardUI(tk.Tk):
         
     def flip_card(self, event=None):
         """Animate card flip"""
+        if self.speed_review.active:
+            self.speed_review.flip()
+            return
         if not self.current_card:
             return
             
@@ -173,18 +217,38 @@ class FlashcardUI(tk.Tk):
         """Update card content with LaTeX support"""
         self.card_content.delete('1.0', tk.END)
         
+        # Keep references to every image shown on the card
+        self.card_content.images = []
+        
         # Parse content for LaTeX
         parts = self.parse_latex(content)
         for part in parts:
             if part.startswith('$$'):
                 # Render LaTeX
                 latex = part[2:-2]
-                img = latex2png.render_latex(latex)
+                img = self.image_cache.get_or_create(
+                    (latex, self.image_scale),
+                    lambda: self.render_photo_image(latex)
+                )
+                if img is None:
+                    self.card_content.insert(tk.END, part)
+                    continue
                 self.card_content.image_create(tk.END, image=img)
-                self.card_content.image = img  # Keep reference
+                self.card_content.images.append(img)
             else:
                 self.card_content.insert(tk.END, part)
                 
+    def render_photo_image(self, latex: str) -> Optional[ImageTk.PhotoImage]:
+        """Render a LaTeX expression and convert it for display"""
+        img = render_latex(latex)
+        if img is None:
+            return None
+        if self.image_scale != 1.0:
+            size = (max(1, int(img.width * self.image_scale)),
+                    max(1, int(img.height * self.image_scale)))
+            img = img.resize(size, Image.LANCZOS)
+        return ImageTk.PhotoImage(img)
+                
     def parse_latex(self, content: str) -> List[str]:
         """Parse content into text and LaTeX parts"""
         parts = []
@@ -216,15 +280,14 @@ class FlashcardUI(tk.Tk):
         
     def handle_response(self, correct: bool):
         """Handle user response to current card"""
+        if self.speed_review.active:
+            self.speed_review.answer(correct)
+            return
         if not self.current_card:
             return
             
         # Update repetition logic
-        next_interval = self.repetition_logic.update_review(
-            self.current_card,
-            correct,
-            StudyMode(self.mode_var.get())
-        )
+        self.record_answers([(self.current_card, correct)], StudyMode(self.mode_var.get()))
         
         # Show next card
         self.show_next_card()
@@ -232,16 +295,34 @@ class FlashcardUI(tk.Tk):
         # Update stats
         self.update_stats()
         
+    def has_deck(self) -> bool:
+        return self.current_deck is not None or self.current_deck_id is not None
+
+    def review_batch(self, mode: StudyMode, size: int) -> List[Flashcard]:
+        """Next cards to study, best first
+
+        A stored deck is read a page of due cards at a time instead of
+        being loaded whole.
+        """
+        if self.current_deck_id is not None:
+            return self.repetition_logic.get_review_batch_from_repository(
+                self.deck_repo.card_repo, mode, size, self.current_deck_id, DUE_CANDIDATES)
+        if self.current_deck is not None:
+            return self.repetition_logic.get_review_batch(self.current_deck, mode, size)
+        return []
+
+    def record_answers(self, answers: List[tuple], mode: StudyMode) -> None:
+        """Apply (card, correct) answers and store the new schedules of stored cards"""
+        self.repetition_logic.record_reviews(answers, mode)
+        if self.current_deck_id is not None:
+            self.deck_repo.card_repo.update_schedules(card for card, _ in answers)
+
     def show_next_card(self):
         """Show next due card"""
-        if not self.current_deck:
+        if not self.has_deck():
             return
             
-        due_cards = self.repetition_logic.get_due_cards(
-            self.current_deck,
-            StudyMode(self.mode_var.get()),
-            limit=1
-        )
+        due_cards = self.review_batch(StudyMode(self.mode_var.get()), 1)
         
         if due_cards:
             self.current_card = due_cards[0]
@@ -253,10 +334,22 @@ class FlashcardUI(tk.Tk):
             
     def update_stats(self):
         """Update statistics display"""
-        if not self.current_deck:
+        if not self.has_deck():
             return
             
-        stats = self.current_deck.get_stats()
+        if self.current_deck_id is not None:
+            # Counted by the database, without loading the deck
+            card_repo = self.deck_repo.card_repo
+            deck_text = (
+                f"Total Cards: {card_repo.count_cards(self.current_deck_id)}\n"
+                f"Due Now: {card_repo.count_due_cards(self.current_deck_id)}\n"
+            )
+        else:
+            stats = self.current_deck.get_stats()
+            deck_text = (
+                f"Total Cards: {stats['total_cards']}\n"
+                f"Average Confidence: {stats['average_confidence']:.1f}\n"
+            )
         study_patterns = self.repetition_logic.get_study_patterns()
         
         # Clear previous stats
@@ -265,8 +358,7 @@ class FlashcardUI(tk.Tk):
             
         # Create stats display
         stats_text = (
-            f"Total Cards: {stats['total_cards']}\n"
-            f"Average Confidence: {stats['average_confidence']:.1f}\n"
+            f"{deck_text}"
             f"Session Accuracy: {study_patterns.get('average_accuracy', 0):.1%}\n"
             f"Cards Reviewed: {study_patterns.get('total_cards_reviewed', 0)}"
         )
@@ -280,10 +372,16 @@ class FlashcardUI(tk.Tk):
         """Update progress chart in sidebar"""
         fig, ax = plt.subplots(figsize=(3, 2))
         
-        # Get study session data
-        sessions = self.repetition_logic.session_history
-        dates = [s.stats.start_time for s in sessions]
-        accuracies = [s.stats.accuracy for s in sessions]
+        # Get study session data: daily totals from the database when the deck
+        # is stored there, otherwise this run's sessions
+        if self.session_repo and self.current_deck_id is not None:
+            buckets = self.session_repo.aggregate_sessions('day', deck_id=self.current_deck_id)
+            dates = [datetime.fromisoformat(row['bucket']) for row in buckets]
+            accuracies = [row['accuracy'] or 0.0 for row in buckets]
+        else:
+            sessions = self.repetition_logic.session_history
+            dates = [s.stats.start_time for s in sessions]
+            accuracies = [s.stats.accuracy for s in sessions]
         
         if dates:
             ax.plot(dates, accuracies, marker='o')
@@ -298,27 +396,89 @@ class FlashcardUI(tk.Tk):
             canvas.draw()
             canvas.get_tk_widget().pack(fill=tk.X, pady=10)
             
-    def on_deck_selected(self, event):
-        """Handle deck selection"""
-        selection = self.deck_list.selection()
-        if not selection:
-            return
+        # The canvas keeps the figure; pyplot need not track it
+        plt.close(fig)
             
-        deck_id = self.deck_list.item(selection[0])['values'][0]
-        self.current_deck = self.load_deck(deck_id)
-        self.show_next_card()
+    def attach_storage(self, storage: StorageBackend):
+        """Browse decks kept by a storage backend"""
+        self.deck_repo = storage.decks
+        self.session_repo = storage.sessions
+        self.refresh_decks()
+
+    def refresh_decks(self):
+        """Re-count the stored decks and the selected deck's cards, e.g. after an import"""
+        if self.deck_repo is None:
+            return
+        first = self.deck_list.first
+        self.deck_list.set_pager(KeysetPager(
+            self.deck_repo.list_decks_after,
+            self.deck_repo.deck_id_before,
+            self.deck_repo.count_decks()
+        ))
+        self.deck_list.scroll_to(first)
+        if self.current_deck_id is not None:
+            first = self.card_list.first
+            self.show_card_list(self.current_deck_id)
+            self.card_list.scroll_to(first)
+            self.update_stats()
+
+    def show_card_list(self, deck_id: int):
+        card_repo = self.deck_repo.card_repo
+        self.card_list.set_pager(KeysetPager(
+            lambda after, limit: card_repo.list_cards_after(deck_id, after, limit),
+            lambda offset: card_repo.card_id_before(deck_id, offset),
+            card_repo.count_cards(deck_id)
+        ))
+        
+    def begin_session(self):
+        """Start a study session for the current deck and mode"""
+        self.repetition_logic.start_session(StudyMode(self.mode_var.get()))
+        self.session_deck_id = self.current_deck_id
+
+    def finish_session(self):
+        """End the running session and store it with its deck if anything was answered"""
+        # Answers still buffered belong to this session
+        self.speed_review.flush()
+        session = self.repetition_logic.current_session
+        if session is None:
+            return
+        self.repetition_logic.end_session()
+        if (self.session_repo and self.session_deck_id is not None
+                and session.stats.total_answers):
+            self.session_repo.save_session(session, self.session_deck_id)
+
+    def on_deck_selected(self, row):
+        """Handle deck selection; the deck is studied from storage, never loaded whole"""
+        self.finish_session()
+        self.current_deck = None
+        self.current_deck_id = row['id']
+        self.begin_session()
+        self.show_card_list(self.current_deck_id)
+        if self.speed_review.active:
+            self.speed_review.restart()
+        else:
+            self.show_next_card()
         self.update_stats()
         
     def on_mode_changed(self):
         """Handle study mode change"""
         self.study_mode = StudyMode(self.mode_var.get())
-        if self.current_deck:
+        if self.has_deck():
+            # A session covers one mode
+            self.finish_session()
+            self.begin_session()
+        if self.speed_review.active:
+            self.speed_review.restart()
+        elif self.has_deck():
             self.show_next_card()
             
-    def load_deck(self, deck_id: int) -> Deck:
-        """Load deck from repository"""
-        # Implementation depends on your data access layer
-        pass
+    def on_speed_review_toggled(self):
+        """Enter or leave speed review"""
+        if self.speed_var.get():
+            self.speed_review.start()
+        else:
+            self.speed_review.stop()
+
 
 if __name__ == "__main__":
     app = FlashcardUI()
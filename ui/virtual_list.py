@@ -0,0 +1,153 @@
+import tkinter as tk
+from tkinter import ttk
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+
+class KeysetPager:
+    """Fixed-size pages of an ordered result set, fetched by keyset
+
+    fetch_after(key, limit) returns up to `limit` rows whose first column
+    (the key) is greater than `key` (None = from the start). Walking forward
+    page by page only ever seeks on the key. Jumping straight to a far page
+    asks key_before(offset) for the key of the row preceding it, which an
+    index-only scan can answer without reading the rows themselves.
+
+    At most max_pages pages are held; the rest are dropped least recently
+    used first, so memory does not depend on the size of the result set.
+    """
+
+    def __init__(self, fetch_after: Callable[[Optional[Any], int], Sequence[Sequence]],
+                 key_before: Callable[[int], Optional[Any]], count: int,
+                 page_size: int = 100, max_pages: int = 8):
+        self.fetch_after = fetch_after
+        self.key_before = key_before
+        self.count = count
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self._pages: "OrderedDict[int, List[Sequence]]" = OrderedDict()
+        self._boundaries: Dict[int, Any] = {0: None}  # page -> key of the row before it
+
+    def _page(self, number: int) -> List[Sequence]:
+        page = self._pages.get(number)
+        if page is not None:
+            self._pages.move_to_end(number)
+            return page
+        if number in self._boundaries:
+            after = self._boundaries[number]
+        else:
+            after = self.key_before(number * self.page_size)
+        page = list(self.fetch_after(after, self.page_size))
+        if page:
+            self._boundaries[number + 1] = page[-1][0]
+        self._pages[number] = page
+        while len(self._pages) > self.max_pages:
+            self._pages.popitem(last=False)
+        return page
+
+    def rows(self, start: int, stop: int) -> List[Sequence]:
+        """Rows in [start, stop), loading the pages they fall on"""
+        stop = min(stop, self.count)
+        rows = []
+        position = max(0, start)
+        while position < stop:
+            number, offset = divmod(position, self.page_size)
+            page = self._page(number)
+            if offset >= len(page):
+                break
+            chunk = page[offset:offset + (stop - position)]
+            rows.extend(chunk)
+            position += len(chunk)
+        return rows
+
+
+class VirtualList(ttk.Frame):
+    """Scrollable list that only renders the rows currently visible
+
+    The listbox always holds `visible_rows` items; scrolling re-fills it
+    from a KeysetPager, so the widget cost is the same for ten rows or a
+    million.
+    """
+
+    def __init__(self, master, format_row: Callable[[Sequence], str], visible_rows: int = 10,
+                 on_select: Optional[Callable[[Sequence], None]] = None, **kwargs):
+        super().__init__(master, **kwargs)
+        self.format_row = format_row
+        self.visible_rows = visible_rows
+        self.on_select = on_select
+        self.pager: Optional[KeysetPager] = None
+        self.first = 0
+        self._shown: List[Sequence] = []
+
+        self.listbox = tk.Listbox(self, height=visible_rows, activestyle='none',
+                                  exportselection=False)
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.yview)
+        self.listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.listbox.bind('<<ListboxSelect>>', self._on_listbox_select)
+        self.listbox.bind('<MouseWheel>', self._on_mousewheel)
+        self.listbox.bind('<Button-4>', lambda e: self.scroll(-3))
+        self.listbox.bind('<Button-5>', lambda e: self.scroll(3))
+        self.listbox.bind('<Up>', lambda e: self._move_selection(-1))
+        self.listbox.bind('<Down>', lambda e: self._move_selection(1))
+
+    def set_pager(self, pager: Optional[KeysetPager]) -> None:
+        self.pager = pager
+        self.first = 0
+        self.refresh()
+
+    def refresh(self) -> None:
+        """Re-render the visible window"""
+        self._shown = self.pager.rows(self.first, self.first + self.visible_rows) if self.pager else []
+        self.listbox.delete(0, tk.END)
+        for row in self._shown:
+            self.listbox.insert(tk.END, self.format_row(row))
+        total = self.pager.count if self.pager else 0
+        if total:
+            self.scrollbar.set(self.first / total, min(1.0, (self.first + self.visible_rows) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def scroll(self, rows: int) -> None:
+        self.scroll_to(self.first + rows)
+
+    def scroll_to(self, first: int) -> None:
+        total = self.pager.count if self.pager else 0
+        first = max(0, min(first, total - self.visible_rows))
+        if first != self.first:
+            self.first = first
+            self.refresh()
+
+    def yview(self, *args) -> None:
+        """Scrollbar protocol: ('moveto', fraction) or ('scroll', n, 'units' | 'pages')"""
+        if not self.pager:
+            return
+        if args[0] == 'moveto':
+            self.scroll_to(int(float(args[1]) * self.pager.count))
+        elif args[0] == 'scroll':
+            step = self.visible_rows if args[2] == 'pages' else 1
+            self.scroll(int(args[1]) * step)
+
+    def _on_mousewheel(self, event) -> str:
+        self.scroll(-3 if event.delta > 0 else 3)
+        return 'break'
+
+    def _move_selection(self, delta: int) -> str:
+        selection = self.listbox.curselection()
+        index = (selection[0] if selection else -1) + delta
+        if index < 0:
+            self.scroll(-1)
+            index = 0
+        elif index >= len(self._shown):
+            self.scroll(1)
+            index = len(self._shown) - 1
+        self.listbox.selection_clear(0, tk.END)
+        self.listbox.selection_set(index)
+        self._on_listbox_select()
+        return 'break'
+
+    def _on_listbox_select(self, event=None) -> None:
+        selection = self.listbox.curselection()
+        if selection and self.on_select and selection[0] < len(self._shown):
+            self.on_select(self._shown[selection[0]])